@@ -1,9 +1,21 @@
 # Analytics/api/app.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .router import router as analytics_router
 
-app = FastAPI(title="AlphaFusion Analytics API", version="1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keeps the /technical snapshot fresh (see technical/precompute.py); with
+    # several workers only the one that takes the snapshot lock scans
+    from Analytics.services.technicals_service import start_precompute, stop_precompute
+    from config import PRECOMPUTE_ON_STARTUP
+    if PRECOMPUTE_ON_STARTUP:
+        start_precompute()
+    yield
+    stop_precompute()
+
+app = FastAPI(title="AlphaFusion Analytics API", version="1.0", lifespan=lifespan)
 
 # allow your vite dev server (change if hosting elsewhere)
 origins = ["http://localhost:5173", "http://127.0.0.1:5173"]
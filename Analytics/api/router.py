@@ -31,14 +31,17 @@ def fundamental(ticker: str, index: Optional[str] = None):
         from Analytics.fundamental.stock_analyzer.fetcher import fetch_financial_data
         from Analytics.fundamental.stock_analyzer.scoring import score_fundamentals, recommendation_from_score
         from Analytics.fundamental.stock_analyzer.analysis import FundamentalAnalyzer
+        from Analytics.services.singleflight import UPSTREAM
+        from Analytics.services.upstream import HEDGER
 
-        # Use fetcher directly to get the latest live data
-        series = fetch_financial_data(ticker)
+        # Use fetcher directly to get the latest live data; concurrent requests for the same ticker share one
+        # fetch, which is hedged after the p95 latency and bounded by a deadline
+        series = UPSTREAM.do(("financials", ticker.upper()), HEDGER.call, fetch_financial_data, ticker)
         if series is None:
             raise HTTPException(status_code=404, detail=f"Could not fetch live data for {ticker}")
 
-        # Compute metrics quickly using the same logic as your class (we can re-use class)
-        fa = FundamentalAnalyzer(ticker)  # this will call fetcher internally too; we could pass series if you add that helper
+        # Compute metrics quickly using the same logic as your class (reusing the fetched series)
+        fa = FundamentalAnalyzer(ticker, data=series)
         metrics = fa.calculate_all_metrics()
 
         scores = score_fundamentals(metrics)
@@ -51,6 +54,8 @@ def fundamental(ticker: str, index: Optional[str] = None):
 
     except HTTPException:
         raise
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -60,33 +65,39 @@ def fundamental(ticker: str, index: Optional[str] = None):
 @router.get("/technical")
 def technical(ticker: str, period_days: int = 90):
     """
-    Real-time technical: uses Analytics/technical/* to fetch recent price series and compute indicators.
-    Expected functions in your technical folder:
-      - data_fetch.get_price_series(ticker, days) -> pandas.DataFrame or dict
-      - indicators.get_rsi(series, window=14)
-      - indicators.get_macd(series)
+    Real-time technical: cached daily price series -> Analytics/technical indicators.
+    Prices come from the in-process TTL cache, so repeat hits within a bar (or
+    while the market is closed) do not go back to Yahoo.
     """
     try:
-        # Lazy import
-        from Analytics.technical import data_fetch, indicators, signals
-
-        # fetch price series (OHLC) for the requested days
-        price_df = data_fetch.get_price_series(ticker, days=period_days)
-        if price_df is None:
-            raise HTTPException(status_code=404, detail=f"No price data for {ticker}")
-
-        # Calculate indicators (assumes functions exist)
-        rsi_series = indicators.get_rsi(price_df["close"])
-        macd_res = indicators.get_macd(price_df["close"])
-        buy_sell = signals.generate_signals(price_df, macd_res) if hasattr(signals, "generate_signals") else {}
+        # Lazy import (the service module also puts technical/ on sys.path)
+        from Analytics.services.technicals_service import get_price_history, snapshot_series
+        from indicators import compute_indicators
+        from store import window
+
+        # Universe tickers are served from the precomputed snapshot
+        computed = snapshot_series(ticker, period_days)
+        if computed is None:
+            # fetch a full year so long-window indicators are warmed up, then report the requested days
+            try:
+                history = get_price_history(ticker, days=max(period_days, 365))
+            except RuntimeError:
+                raise HTTPException(status_code=404, detail=f"No price data for {ticker}")
+
+            # Only RSI and MACD are reported, so only their graph nodes run
+            computed = compute_indicators(history, columns=["RSI", "MACD", "MACD_SIGNAL", "MACD_HIST"])
+        recent = window(computed, f"{period_days}d")
 
         # Convert to serializable objects
         sample = {
             "ticker": ticker.upper(),
-            "latest_close": float(price_df["close"].iloc[-1]),
-            "rsi_latest": float(rsi_series.iloc[-1]) if hasattr(rsi_series, "iloc") else rsi_series,
-            "macd": {k: v.tolist() if hasattr(v, "tolist") else v for k, v in macd_res.items()},
-            "signals": buy_sell
+            "latest_close": float(computed["Close"].iloc[-1]),
+            "rsi_latest": float(computed["RSI"].iloc[-1]),
+            "macd": {
+                "macd": recent["MACD"].tolist(),
+                "signal": recent["MACD_SIGNAL"].tolist(),
+                "histogram": recent["MACD_HIST"].tolist(),
+            },
         }
         return sample
 
@@ -95,6 +106,63 @@ def technical(ticker: str, period_days: int = 90):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/technical/chart")
+def technical_chart(ticker: str, points: Optional[int] = None, layout: Optional[str] = None):
+    """
+    1D/1M/6M/1Y price chart, downsampled server-side to at most `points` per
+    timeframe (default CHART_POINT_BUDGET). layout: "columns" or "rows".
+    """
+    if points is not None and points < 3:
+        raise HTTPException(status_code=400, detail="points must be at least 3")
+    if layout not in (None, "columns", "rows"):
+        raise HTTPException(status_code=400, detail="layout must be 'columns' or 'rows'")
+    try:
+        from Analytics.services.technicals_service import get_chart_data
+        chart = get_chart_data(ticker, points=points, layout=layout)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if chart is None:
+        raise HTTPException(status_code=404, detail=f"No price data for {ticker}")
+    return chart
+
+@router.get("/technical/snapshot")
+def technical_snapshot(ticker: Optional[str] = None):
+    """The precomputed universe scan: version and age, plus a ticker's score, signal, stop and features."""
+    from Analytics.services.technicals_service import get_snapshot
+    info = get_snapshot(ticker)
+    if info is None:
+        raise HTTPException(status_code=404, detail="No technical snapshot yet.")
+    if ticker and info["record"] is None:
+        raise HTTPException(status_code=404, detail=f"Ticker {ticker} is not in the precomputed universe")
+    return info
+
+@router.get("/technical/anomalies")
+def technical_anomalies(top: Optional[int] = None, threshold: Optional[float] = None, tickers: Optional[str] = None):
+    """
+    Universe surveillance: the `top` tickers (default ANOMALY_TOP) by current
+    return/volume z-score (default: the precomputed universe, or a comma-separated `tickers` list),
+    flagged above `threshold` (default ANOMALY_Z_THRESHOLD). Rebuilt once per bar.
+    """
+    if top is not None and top < 1:
+        raise HTTPException(status_code=400, detail="top must be at least 1")
+    try:
+        from Analytics.services.technicals_service import get_anomalies
+        from config import ANOMALY_TOP, ANOMALY_Z_THRESHOLD
+        universe = [t.strip().upper() for t in tickers.split(",") if t.strip()] if tickers else None
+        return get_anomalies(top or ANOMALY_TOP, ANOMALY_Z_THRESHOLD if threshold is None else threshold, universe)
+    except RuntimeError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/technical/cache")
+def technical_cache_stats():
+    """Hit/miss/eviction counters for the in-process price cache, plus request coalescing and hedging counters."""
+    from Analytics.services.technicals_service import get_cache_stats
+    from Analytics.services.upstream import HEDGER
+    from Analytics.services.singleflight import UPSTREAM
+    return {"price_cache": get_cache_stats(), "single_flight": UPSTREAM.stats(), "hedging": HEDGER.stats()}
+
 # -------------------------
 # 3) SENTIMENT endpoints (cached)
 # -------------------------
@@ -17,9 +17,10 @@ def safe_div(a, b):
 
 # ---------- Metric calculator ----------
 class FundamentalAnalyzer:
-    def __init__(self, ticker):
+    def __init__(self, ticker, data=None):
+        # `data` lets a caller that already fetched the financials skip a second download
         self.ticker = ticker.upper()
-        self.data = fetch_financial_data(self.ticker)
+        self.data = data if data is not None else fetch_financial_data(self.ticker)
         if self.data is None:
             raise ValueError(f"Could not retrieve financial data for {ticker}")
 
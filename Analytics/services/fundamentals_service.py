@@ -1,8 +1,14 @@
 import yfinance as yf
+from .singleflight import UPSTREAM
+from .upstream import HEDGER
+
+def _fetch_info(symbol: str):
+    return yf.Ticker(symbol).info
 
 def get_fundamentals(symbol: str):
-    stock = yf.Ticker(symbol)
-    info = stock.info
+    # Shared with any concurrent request for the same symbol (e.g. combined + fundamentals),
+    # hedged and deadline-bounded like every upstream call
+    info = UPSTREAM.do(("info", symbol), HEDGER.call, _fetch_info, symbol)
     return {
         "symbol": symbol,
         "company": info.get("longName"),
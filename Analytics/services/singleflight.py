@@ -0,0 +1,62 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one upstream call.
+
+    The first caller for a key runs the function; anyone asking for the same key
+    while it is in flight waits and receives the same result, or the same
+    exception. Nothing is cached: once the call finishes the next caller starts
+    a fresh one (caching is the TTL cache's job).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn(*args, **kwargs)
+                return call.result
+            except BaseException as e:
+                # Whatever ends the leader's call (cancellation and interrupts included) reaches
+                # the waiters too, instead of them waking up to a None result
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "calls": self.calls, "coalesced": self.coalesced}
+
+
+# One instance for every endpoint, so technical/fundamental/combined requests coalesce together
+UPSTREAM = SingleFlight()
@@ -1,20 +1,129 @@
-import yfinance as yf
-import pandas as pd
+# First: puts technical/ (a script folder with flat imports) on sys.path for the imports below
+from .upstream import HEDGER
+
+from anomaly import scan_universe
+from config import SNAPSHOT_PATH
+from data_fetch import adjust_prices, cached_history, PRICE_CACHE
+from precompute import Precomputer, SnapshotBuffer, SERIES_DAYS, writer_lock
+from store import window
+from utils import prepare_chart_data
+from .singleflight import UPSTREAM
+
+# Latest precomputed universe scan: filled by this process's Precomputer when
+# it runs one, else picked up from SNAPSHOT_PATH (written by the worker holding
+# its lock, or by `python precompute.py`)
+SNAPSHOTS = SnapshotBuffer(SNAPSHOT_PATH)
+_precomputer = None
+_writer_lock = None
+
+def _history(symbol: str, interval: str, period: str):
+    # Concurrent misses for the same dataset wait on one download instead of racing
+    return UPSTREAM.do(("history", symbol, interval, period), cached_history, symbol, interval, period)
 
 def get_technical_data(symbol: str):
-    stock = yf.Ticker(symbol)
-    data = stock.history(period="1mo")
-    
+    # Daily 1y is the same dataset the scoring pipeline uses off-hours, so both share a cache entry
+    try:
+        history = _history(symbol, "1d", "1y")
+    except RuntimeError:
+        return {"error": f"No data found for {symbol}"}
+
+    # Adjusted prices, as the Ticker.history call this endpoint used to make returned them
+    data = adjust_prices(window(history, "1mo"))
     if data.empty:
         return {"error": f"No data found for {symbol}"}
-    
+
     latest_close = data["Close"].iloc[-1]
     ma_20 = data["Close"].rolling(window=20).mean().iloc[-1]
     rsi = 100 - (100 / (1 + (data["Close"].pct_change().dropna().mean() / data["Close"].pct_change().dropna().std())))
-    
+
     return {
         "symbol": symbol,
         "latest_close": round(latest_close, 2),
         "moving_average_20": round(ma_20, 2),
         "rsi": round(rsi, 2)
     }
+
+def get_price_history(symbol: str, days: int = 90):
+    """Cached daily OHLCV for the last `days` calendar days."""
+    period = "1y" if days <= 365 else "max"
+    return window(_history(symbol, "1d", period), f"{days}d")
+
+def get_chart_data(symbol: str, points=None, layout=None):
+    """
+    1D/1M/6M/1Y chart payload (see utils.prepare_chart_data) from cached 5m
+    and daily history. `points` caps every timeframe (default: CHART_POINT_BUDGET).
+    """
+    try:
+        intraday = _history(symbol, "5m", "1d")
+    except RuntimeError:
+        intraday = None
+    try:
+        daily = _history(symbol, "1d", "1y")
+    except RuntimeError:
+        daily = None
+    if intraday is None and daily is None:
+        return None
+    kwargs = {"layout": layout} if layout else {}
+    if points is not None:
+        kwargs["budget"] = points
+    return prepare_chart_data(symbol.upper(), intraday, daily, **kwargs)
+
+def get_anomalies(top: int, threshold: float, tickers=None):
+    """
+    The `top` tickers of the cached universe anomaly scan (see anomaly.scan_universe),
+    flagged against `threshold`. Concurrent rebuilds of the same universe share one scan.
+    """
+    key = tuple(tickers) if tickers else None
+    scan = UPSTREAM.do(("anomalies", key), scan_universe, tickers)
+    ranked = [dict(record, anomaly=record["z"] > threshold) for record in scan["ranked"][:top]]
+    meta = {k: v for k, v in scan.items() if k != "ranked"}
+    meta.update(threshold=threshold, flagged=sum(record["z"] > threshold for record in scan["ranked"]))
+    return dict(meta, anomalies=ranked)
+
+def get_cache_stats():
+    return PRICE_CACHE.stats()
+
+def start_precompute():
+    """
+    Starts the background universe scan in the one process that gets the
+    snapshot writer lock (see precompute.writer_lock); returns its
+    Precomputer, or None in every other worker, which only reads the
+    snapshots from SNAPSHOT_PATH.
+    """
+    global _precomputer, _writer_lock
+    if _precomputer is None:
+        _writer_lock = _writer_lock or writer_lock(SNAPSHOT_PATH)
+        if _writer_lock is None:
+            return None
+        _precomputer = Precomputer(SNAPSHOTS)
+        _precomputer.start()
+    return _precomputer
+
+def stop_precompute():
+    """Stops this process's universe scan, if it runs one, and releases the writer lock."""
+    global _precomputer, _writer_lock
+    if _precomputer is not None:
+        _precomputer.stop()
+        _precomputer = None
+    if _writer_lock is not None:
+        _writer_lock.close()
+        _writer_lock = None
+
+def snapshot_series(symbol: str, days: int):
+    """Precomputed daily Close/RSI/MACD for `symbol`, or None when it is not in the snapshot (or too short)."""
+    snapshot = SNAPSHOTS.current()
+    if snapshot is None or days > SERIES_DAYS:
+        return None
+    return snapshot.series.get(symbol.upper())
+
+def get_snapshot(symbol: str = None):
+    """Snapshot metadata, plus one ticker's precomputed record when `symbol` is given."""
+    snapshot = SNAPSHOTS.current()
+    if snapshot is None:
+        return None
+    info = {"snapshot": snapshot.meta()}
+    if _precomputer is not None:
+        info["snapshot"].update({"failures": _precomputer.failures, "last_error": _precomputer.last_error})
+    if symbol is not None:
+        info["record"] = snapshot.records.get(symbol.upper())
+    return info
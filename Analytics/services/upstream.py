@@ -0,0 +1,10 @@
+import sys
+from pathlib import Path
+
+# technical/ is written as a script folder (flat `from config import ...` imports); importing this
+# module puts it on sys.path but loads only the hedger and its config, not the data stack
+TECHNICAL_DIR = Path(__file__).resolve().parent.parent / "technical"
+if str(TECHNICAL_DIR) not in sys.path:
+    sys.path.insert(0, str(TECHNICAL_DIR))
+
+from hedge import HEDGER, UpstreamTimeout
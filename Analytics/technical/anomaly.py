@@ -0,0 +1,123 @@
+import time
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+from config import (ANOMALY_CACHE_SIZE, ANOMALY_UNIVERSE, ANOMALY_Z_THRESHOLD, MARKET_TIMEZONE, NIFTY_100_TICKERS,
+                    SENSEX_30_TICKERS)
+from cache import TTLCache
+from data_fetch import pull_history_batch
+from evaluation import analysis_frame, select_data_mode
+from lookback import plan_period, required_bars
+from indicator_engine import evaluate
+from utils import next_bar_boundary
+
+# The only indicators a scan computes
+ANOMALY_COLUMNS = ["RET", "RET_Z", "VOL_Z"]
+
+# Ranked scans keyed by (universe, interval, period), kept until the next bar
+ANOMALY_CACHE = TTLCache(maxsize=ANOMALY_CACHE_SIZE)
+
+
+def _tail_arrays(frames, lookback):
+    """
+    (tickers, close, volume, bar_time): each ticker's last `lookback` bars as
+    one column of two (lookback, N) arrays, bottom-aligned so row -1 is every
+    ticker's latest bar; shorter histories are NaN-padded at the top (the
+    engine's warm-up convention).
+    """
+    tickers = [t for t, df in frames.items() if df is not None and not df.empty]
+    close = np.full((lookback, len(tickers)), np.nan)
+    volume = np.full((lookback, len(tickers)), np.nan)
+    bar_time = []
+    for j, ticker in enumerate(tickers):
+        tail = frames[ticker].iloc[-lookback:]
+        close[lookback - len(tail):, j] = tail["Close"].to_numpy(dtype=np.float64)
+        volume[lookback - len(tail):, j] = tail["Volume"].to_numpy(dtype=np.float64)
+        bar_time.append(tail.index[-1])
+    return tickers, close, volume, bar_time
+
+
+def rank_anomalies(frames, threshold=ANOMALY_Z_THRESHOLD):
+    """
+    Return and volume z-scores of every ticker's last bar, computed for the
+    whole universe in one pass of the RET/RET_Z/VOL_Z engine nodes over the
+    bars those z-scores read (their windows are exact, see tail.min_lookback),
+    ranked by the larger |z|. Returns a DataFrame indexed by ticker with
+    bar_time, close, volume, ret, ret_z, vol_z, z and anomaly, the
+    recommend_signal test (either |z| above `threshold`).
+    """
+    tickers, close, volume, bar_time = _tail_arrays(frames, required_bars(ANOMALY_COLUMNS))
+    if not tickers:
+        raise RuntimeError("No data to scan.")
+    values = evaluate(ANOMALY_COLUMNS, {"Close": close, "Volume": volume})
+    ret, ret_z, vol_z = (values[c][-1] for c in ANOMALY_COLUMNS)
+
+    result = pd.DataFrame({
+        "bar_time": bar_time,
+        "close": close[-1],
+        "volume": volume[-1],
+        "ret": ret,
+        "ret_z": ret_z,
+        "vol_z": vol_z,
+        "z": np.maximum(np.abs(ret_z), np.abs(vol_z)),
+    }, index=pd.Index(tickers, name="ticker"))
+    result["anomaly"] = result["z"] > threshold
+    return result.sort_values("z", ascending=False, kind="stable")
+
+
+def _records(ranked):
+    """JSON-ready rows of a rank_anomalies result, in rank order."""
+    out = ranked.reset_index()
+    out["bar_time"] = out["bar_time"].astype(str)
+    return out.to_dict("records")
+
+
+def scan_universe(tickers=None, mode=None):
+    """
+    The ranked anomaly scan of `tickers` (default ANOMALY_UNIVERSE) on the
+    current data mode's bars (1m while the market is open, daily otherwise),
+    served from ANOMALY_CACHE until the next bar can change it. A rebuild is
+    one batched download over the few bars the z-scores need (the OHLCV store
+    tops up only the new ones) and one array computation for the universe.
+    Returns {"interval", "period", "data_mode", "bar_time", "built_at",
+    "elapsed", "scanned", "errors", "threshold", "flagged", "ranked"}.
+    """
+    tickers = list(dict.fromkeys(tickers or ANOMALY_UNIVERSE or NIFTY_100_TICKERS + SENSEX_30_TICKERS))
+    mode = mode or select_data_mode()
+    _, interval, _, data_mode = mode
+    period = plan_period(interval, required_bars(ANOMALY_COLUMNS))
+    key = (tuple(tickers), interval, period)
+    scan = ANOMALY_CACHE.get(key)
+    if scan is not None:
+        return scan
+
+    start = time.perf_counter()
+    frames, errors = pull_history_batch(tickers, interval, period, min_bars=0)
+    if not frames:
+        raise RuntimeError("No data returned for any ticker of the universe.")
+    ranked = rank_anomalies({t: analysis_frame(df, mode) for t, df in frames.items()})
+    scan = {
+        "interval": interval,
+        "period": period,
+        "data_mode": data_mode,
+        "bar_time": str(ranked["bar_time"].max()),
+        "built_at": dt.datetime.now(MARKET_TIMEZONE).isoformat(),
+        "elapsed": time.perf_counter() - start,
+        "scanned": len(ranked),
+        "errors": errors,
+        "threshold": ANOMALY_Z_THRESHOLD,
+        "flagged": int(ranked["anomaly"].sum()),
+        "ranked": _records(ranked),
+    }
+    ANOMALY_CACHE.set(key, scan, next_bar_boundary(interval).timestamp())
+    return scan
+
+
+if __name__ == "__main__":
+    scan = scan_universe()
+    print(f"{scan['scanned']} tickers on {scan['interval']} bars ({scan['data_mode']}), last bar {scan['bar_time']}, "
+          f"{scan['flagged']} flagged, {scan['elapsed']:.2f}s")
+    for record in scan["ranked"][:20]:
+        flag = "ANOMALY" if record["anomaly"] else ""
+        print(f"  {record['ticker']:<16} ret_z {record['ret_z']:>+6.2f}  vol_z {record['vol_z']:>+6.2f}  {flag}")
@@ -0,0 +1,197 @@
+# Walk-forward backtest of the technical signal pipeline.
+# Run from this folder:  python backtest.py   (NIFTY 100, daily, BACKTEST_PERIOD)
+
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from config import BACKTEST_COST_BPS, BACKTEST_PERIOD, MIN_HISTORY_BARS, NIFTY_100_TICKERS
+from data_fetch import pull_history_batch
+from indicators import compute_indicators
+from history import score_history
+from signals import SIGNAL_CODES
+
+EXITS = {SIGNAL_CODES["EXIT"]: "EXIT", SIGNAL_CODES["EXIT_ANOMALY"]: "EXIT_ANOMALY"}
+PERIODS_PER_YEAR = {"1d": 252, "1wk": 52, "1mo": 12}
+
+
+def simulate(df, scored, cost_bps=BACKTEST_COST_BPS, warmup=MIN_HISTORY_BARS, entry_signals=("BUY",)):
+    """
+    Replays one ticker's signals, long-only, with no lookahead: the signal and
+    smart stop computed on bar t's close are acted on from bar t+1.
+      - BUY (or any of `entry_signals`) while flat: enter at the next open,
+        stop at that bar's smart stop.
+      - EXIT / EXIT_ANOMALY while long: sell at the next open.
+      - Any other signal while long: the stop ratchets up to the new smart stop
+        (3/2/1 ATR for BUY/HOLD/TIGHTEN_STOP, see signals.smart_stop).
+      - The stop fills at the open if the bar gaps below it, else at the stop.
+    No entries before `warmup` bars (SMA200 needs them). Costs are charged
+    per side. Returns (per-bar strategy returns, per-bar 0/1 market exposure,
+    list of trade dicts).
+    """
+    open_ = df["Open"].to_numpy(dtype=np.float64).tolist()
+    low = df["Low"].to_numpy(dtype=np.float64).tolist()
+    close = df["Close"].to_numpy(dtype=np.float64).tolist()
+    codes = scored["signal_code"].to_numpy().tolist()
+    stops = scored["stop"].to_numpy(dtype=np.float64).tolist()
+    index = df.index
+    cost = cost_bps / 1e4
+    entries = {SIGNAL_CODES[s] for s in entry_signals}
+
+    returns = np.zeros(len(close))
+    position = np.zeros(len(close), dtype=np.int8)
+    trades = []
+    in_position, stop, entry, entry_at = False, 0.0, 0.0, None
+
+    for t in range(1, len(close)):
+        signal, prev_close = codes[t - 1], close[t - 1]
+        position[t] = in_position or (signal in entries and t - 1 >= warmup)
+
+        if not in_position:
+            if signal not in entries or t - 1 < warmup:
+                continue
+            in_position, entry, entry_at, stop = True, open_[t], index[t], stops[t - 1]
+            base, r = entry, -cost
+        elif signal in EXITS:
+            exit_price = open_[t]
+            returns[t] = exit_price / prev_close - 1.0 - cost
+            trades.append(_trade(entry_at, index[t], entry, exit_price, EXITS[signal]))
+            in_position = False
+            continue
+        else:
+            stop = max(stop, stops[t - 1])
+            base, r = prev_close, 0.0
+
+        if low[t] <= stop:
+            exit_price = min(open_[t], stop)
+            returns[t] = exit_price / base - 1.0 + r - cost
+            trades.append(_trade(entry_at, index[t], entry, exit_price, "STOP"))
+            in_position = False
+        else:
+            returns[t] = close[t] / base - 1.0 + r
+
+    if in_position:
+        trades.append(_trade(entry_at, None, entry, close[-1], "OPEN"))
+    return returns, position, trades
+
+
+def _trade(entry_at, exit_at, entry, exit_price, reason):
+    return {"entry_time": entry_at, "exit_time": exit_at, "entry": entry, "exit": exit_price,
+            "return": exit_price / entry - 1.0, "reason": reason}
+
+
+def performance(returns, periods_per_year=252):
+    """Total return, CAGR, max drawdown and annualised Sharpe of a per-bar return series."""
+    returns = np.asarray(returns, dtype=np.float64)
+    if len(returns) == 0:
+        return {"total_return": 0.0, "cagr": 0.0, "max_drawdown": 0.0, "sharpe": 0.0}
+    equity = np.cumprod(1.0 + returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    years = len(returns) / periods_per_year
+    std = returns.std()
+    return {
+        "total_return": float(equity[-1] - 1.0),
+        "cagr": float(equity[-1] ** (1.0 / years) - 1.0) if years > 0 and equity[-1] > 0 else 0.0,
+        "max_drawdown": float(drawdown.min()),
+        "sharpe": float(returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0,
+    }
+
+
+def backtest_ticker(df, interval="1d", cost_bps=BACKTEST_COST_BPS, entry_signals=("BUY",)):
+    """
+    Backtests one OHLCV frame. Returns (per-bar return Series, summary dict);
+    the summary has the performance figures, trade statistics, buy-and-hold
+    for comparison and, per signal class, how often it fired and the mean
+    next-bar return after it.
+    """
+    df = df.sort_index()
+    scored = score_history(compute_indicators(df))
+    returns, position, trades = simulate(df, scored, cost_bps, entry_signals=entry_signals)
+    periods = PERIODS_PER_YEAR.get(interval, 252)
+
+    closed = [tr for tr in trades if tr["reason"] != "OPEN"]
+    next_return = df["Close"].pct_change().shift(-1)
+    by_signal = scored.assign(next_return=next_return).groupby("signal")["next_return"].agg(["size", "mean"])
+
+    summary = performance(returns, periods)
+    summary.update({
+        "bars": len(df),
+        "trades": len(closed),
+        "win_rate": float(np.mean([tr["return"] > 0 for tr in closed])) if closed else 0.0,
+        "exposure": float(position.mean()),
+        "exit_reasons": pd.Series([tr["reason"] for tr in trades], dtype=object).value_counts().to_dict(),
+        "buy_and_hold": performance(df["Close"].pct_change().fillna(0.0).to_numpy(), periods),
+        "signals": {s: {"bars": int(row["size"]), "mean_next_return": float(np.nan_to_num(row["mean"]))}
+                    for s, row in by_signal.iterrows()},
+    })
+    return pd.Series(returns, index=df.index), summary
+
+
+def _backtest_task(args):
+    ticker, df, interval, cost_bps, entry_signals = args
+    try:
+        returns, summary = backtest_ticker(df, interval, cost_bps, entry_signals)
+        return ticker, returns, summary, None
+    except Exception as e:
+        return ticker, None, None, str(e)
+
+
+def run_backtest(tickers, interval="1d", period=BACKTEST_PERIOD, frames=None,
+                 processes=None, cost_bps=BACKTEST_COST_BPS, entry_signals=("BUY",)):
+    """
+    Backtests every ticker (in a process pool; processes=1 runs in-process)
+    and an equal-weight index of them: each bar, the index return is the mean
+    strategy return of the tickers listed on that bar.
+    Prices come from the local store via pull_history_batch unless `frames`
+    ({ticker: DataFrame}) is given.
+    Returns {"tickers": {ticker: summary}, "index": summary, "errors": {ticker: message}}.
+    """
+    errors = {}
+    if frames is None:
+        frames, errors = pull_history_batch(tickers, interval, period)
+    tasks = [(t, frames[t], interval, cost_bps, entry_signals) for t in dict.fromkeys(tickers) if t in frames]
+
+    if processes == 1 or len(tasks) <= 1:
+        results = list(map(_backtest_task, tasks))
+    else:
+        workers = processes or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_backtest_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+    summaries, returns = {}, {}
+    for ticker, ticker_returns, summary, error in results:
+        if error is not None:
+            errors[ticker] = error
+        else:
+            summaries[ticker], returns[ticker] = summary, ticker_returns
+
+    index_summary = {}
+    if returns:
+        # NaN before a listing / after a delisting, so those tickers drop out of the mean
+        panel = pd.DataFrame(returns).sort_index()
+        index_summary = performance(panel.mean(axis=1, skipna=True).to_numpy(), PERIODS_PER_YEAR.get(interval, 252))
+        index_summary["tickers"] = len(returns)
+    return {"tickers": summaries, "index": index_summary, "errors": errors}
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    report = run_backtest(NIFTY_100_TICKERS)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'ticker':<16} {'return':>9} {'CAGR':>8} {'max DD':>8} {'trades':>7} {'win':>6} {'B&H':>9}")
+    print("-" * 70)
+    for ticker, s in sorted(report["tickers"].items(), key=lambda kv: -kv[1]["total_return"]):
+        print(f"{ticker:<16} {s['total_return']:>+9.1%} {s['cagr']:>+8.1%} {s['max_drawdown']:>8.1%} "
+              f"{s['trades']:>7} {s['win_rate']:>6.0%} {s['buy_and_hold']['total_return']:>+9.1%}")
+    for ticker, error in report["errors"].items():
+        print(f"{ticker:<16} error: {error}")
+
+    idx = report["index"]
+    if idx:
+        print("-" * 70)
+        print(f"{'INDEX (EW)':<16} {idx['total_return']:>+9.1%} {idx['cagr']:>+8.1%} {idx['max_drawdown']:>8.1%}"
+              f"   sharpe {idx['sharpe']:.2f}, {idx['tickers']} tickers")
+    print(f"\nBacktest finished in {elapsed:.1f}s")
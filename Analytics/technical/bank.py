@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+
+from indicator_engine import (_as2d, _first_valid, _prefix_sums, _recurrence, _shift, _window_reduce,
+                              _window_sums, _zscore_windows, true_range)
+
+# A research grid of ~30 variants
+DEFAULT_BANK = {
+    "SMA": [10, 20, 50, 100, 200],
+    "EMA": [9, 12, 21, 26, 50, 100, 200],
+    "RSI": [7, 14, 21],
+    "ATR": [7, 14, 21],
+    "BBANDS": {"length": [20], "std": [1.5, 2.0, 2.5]},
+    "ZSCORE": [20, 60, 120],
+    "VOL_Z": [20, 60],
+}
+
+
+# --- Stacked kernels: one pass for every length ---
+
+def _ema_many(x, lengths):
+    """ema(x, n) for every n in `lengths` as columns of one recurrence pass."""
+    x = np.asarray(x, dtype=np.float64)
+    T = len(x)
+    lengths = np.asarray(lengths)
+    alpha = 2.0 / (lengths + 1)
+    first = int(_first_valid(x[:, None])[0])
+    seed_row = first + lengths - 1
+    cols = np.arange(len(lengths))
+    has_seed = seed_row < T
+
+    csum = np.zeros(T + 1)
+    np.cumsum(np.nan_to_num(x), out=csum[1:])
+    seed = (csum[np.minimum(seed_row + 1, T)] - csum[min(first, T)]) / lengths
+
+    rows = np.arange(T)[:, None]
+    u = np.where(rows > seed_row, alpha * np.nan_to_num(x)[:, None], 0.0)
+    u[np.minimum(seed_row, T - 1)[has_seed], cols[has_seed]] = seed[has_seed]
+    out = _recurrence(u, 1.0 - alpha)
+    out[rows < seed_row] = np.nan
+    return out
+
+
+def _rma_many(x2, lengths):
+    """
+    rma (Wilder, ewm alpha=1/n, min_periods=n) of each column of `x2` for every
+    n in `lengths`; column j*len(lengths)+i is input column j at lengths[i].
+    """
+    x2 = _as2d(x2)
+    lengths = np.asarray(lengths)
+    tiled = np.repeat(x2, len(lengths), axis=1)
+    n = np.tile(lengths, x2.shape[1])
+    valid = ~np.isnan(tiled)
+    num = _recurrence(np.where(valid, tiled, 0.0), 1.0 - 1.0 / n)
+
+    # The weight total only depends on the NaN pattern: inputs that share one
+    # (RSI gains and losses) share it
+    mask = ~np.isnan(x2)
+    if (mask == mask[:, :1]).all():
+        seen = np.repeat(mask[:, :1], len(lengths), axis=1)
+        den = np.tile(_recurrence(seen.astype(np.float64), 1.0 - 1.0 / lengths), x2.shape[1])
+        seen = np.tile(np.cumsum(seen, axis=0), x2.shape[1])
+    else:
+        den = _recurrence(valid.astype(np.float64), 1.0 - 1.0 / n)
+        seen = np.cumsum(valid, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = num / den
+    out[seen < n] = np.nan
+    return out
+
+
+# --- Bank ---
+
+def bank_columns(grid):
+    """Output column names for `grid`, in the order compute_bank writes them."""
+    columns = []
+    for n in grid.get("SMA", []):
+        columns.append(f"SMA_{n}")
+    for n in grid.get("EMA", []):
+        columns.append(f"EMA_{n}")
+    for n in grid.get("RSI", []):
+        columns.append(f"RSI_{n}")
+    for n in grid.get("ATR", []):
+        columns.append(f"ATR_{n}")
+    bb = grid.get("BBANDS", {})
+    for n in bb.get("length", []):
+        columns.append(f"BBM_{n}")
+        for k in bb.get("std", []):
+            columns += [f"BBL_{n}_{float(k)}", f"BBU_{n}_{float(k)}"]
+    for n in grid.get("ZSCORE", []):
+        columns.append(f"ZSCORE_{n}")
+    for n in grid.get("VOL_Z", []):
+        columns.append(f"VOL_Z_{n}")
+    return columns
+
+
+def compute_bank(high, low, close, volume, grid=None):
+    """
+    Every variant in `grid` ({indicator: [lengths]}, BBANDS: {"length": [...],
+    "std": [...]}) for one ticker's 1-D arrays, as a (len(columns), T) float64
+    block plus its column names. Variants share their work: one prefix-sum pass
+    serves every SMA/Bollinger mid/z-score length, all EMA lengths run as the
+    columns of a single recurrence, RSI gains/losses and ATR true ranges are
+    built once and smoothed for all lengths in one pass each, and each Bollinger
+    length computes its rolling std once for all std multipliers. Volume
+    z-scores (VOL_Z) share one prefix-sum pass over volume the same way.
+    Values match the single-variant engine functions (to rounding for the
+    stacked EMA/Wilder passes).
+    """
+    grid = DEFAULT_BANK if grid is None else grid
+    close = np.asarray(close, dtype=np.float64)
+    columns = bank_columns(grid)
+    block = np.empty((len(columns), len(close)))
+    row = iter(range(len(columns)))
+
+    c2 = close[:, None]
+    prefix = _prefix_sums(c2)
+    for n in grid.get("SMA", []):
+        block[next(row)] = _window_sums(prefix, n)[0][:, 0] / n
+
+    if grid.get("EMA"):
+        for values in _ema_many(close, grid["EMA"]).T:
+            block[next(row)] = values
+
+    if grid.get("RSI"):
+        lengths = grid["RSI"]
+        diff = c2 - _shift(c2)
+        gain = np.where(diff > 0, diff, 0.0)
+        loss = np.where(diff < 0, diff, 0.0)
+        gain[np.isnan(diff)] = np.nan
+        loss[np.isnan(diff)] = np.nan
+        smoothed = _rma_many(np.hstack([gain, loss]), lengths)
+        avg_gain, avg_loss = smoothed[:, :len(lengths)], smoothed[:, len(lengths):]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rsi = 100.0 * avg_gain / (avg_gain + np.abs(avg_loss))
+        for values in rsi.T:
+            block[next(row)] = values
+
+    if grid.get("ATR"):
+        for values in _rma_many(true_range(high, low, close), grid["ATR"]).T:
+            block[next(row)] = values
+
+    bb = grid.get("BBANDS", {})
+    for n in bb.get("length", []):
+        mid = _window_sums(prefix, n)[0][:, 0] / n
+        dev = _window_reduce(c2, n, lambda w: w.std(axis=-1, ddof=0))[:, 0]
+        block[next(row)] = mid
+        for k in bb.get("std", []):
+            block[next(row)] = mid - k * dev
+            block[next(row)] = mid + k * dev
+
+    if grid.get("ZSCORE"):
+        sq_prefix = _prefix_sums(c2 * c2)
+        for n in grid["ZSCORE"]:
+            min_periods = min(10, n)
+            z = _zscore_windows(c2, _window_sums(prefix, n, min_periods), _window_sums(sq_prefix, n, min_periods))
+            block[next(row)] = z[:, 0]
+
+    if grid.get("VOL_Z"):
+        v2 = np.asarray(volume, dtype=np.float64)[:, None]
+        v_prefix, v_sq_prefix = _prefix_sums(v2), _prefix_sums(v2 * v2)
+        for n in grid["VOL_Z"]:
+            min_periods = min(10, n)
+            z = _zscore_windows(v2, _window_sums(v_prefix, n, min_periods), _window_sums(v_sq_prefix, n, min_periods))
+            block[next(row)] = z[:, 0]
+
+    return block, columns
+
+
+def indicator_bank(df, grid=None):
+    """compute_bank on an OHLCV DataFrame; returns a DataFrame view of the block on df's index."""
+    df = df.sort_index()
+    block, columns = compute_bank(
+        df["High"].to_numpy(dtype=np.float64),
+        df["Low"].to_numpy(dtype=np.float64),
+        df["Close"].to_numpy(dtype=np.float64),
+        df["Volume"].to_numpy(dtype=np.float64),
+        grid,
+    )
+    return pd.DataFrame(block.T, index=df.index, columns=columns, copy=False)
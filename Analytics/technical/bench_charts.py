@@ -0,0 +1,85 @@
+# Benchmark + equivalence check: vectorized chart payloads vs the old iterrows builder,
+# plus downsampled (LTTB / min-max, 500 points per timeframe) payloads.
+# Run from this folder:  python bench_charts.py
+
+import json
+import time
+import numpy as np
+import pandas as pd
+from config import MARKET_TIMEZONE
+from utils import prepare_chart_data
+
+# (label, 1m bars, daily bars): a 1-day intraday chart, then multi-day 1m series
+CASES = [
+    ("1d 1m + 1y daily", 375, 250),
+    ("7d 1m + 1y daily", 7 * 375, 250),
+    ("30d 1m + 5y daily", 30 * 375, 1250),
+]
+
+def synthetic_close(n, freq, seed=7):
+    """Random-walk closes on an IST index ending today."""
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    end = pd.Timestamp.now(tz=MARKET_TIMEZONE).normalize() + pd.Timedelta(hours=15, minutes=29)
+    index = pd.date_range(end=end, periods=n, freq=freq)
+    return pd.DataFrame({"Close": close}, index=index)
+
+def _last_months(df, months):
+    # DataFrame.last('<n>M'), which pandas 3 removed
+    start = df.index[-1] - pd.offsets.MonthEnd(months)
+    return df.iloc[df.index.searchsorted(start, side="right"):]
+
+def legacy_chart_data(df_1d_intraday, df_1y_daily):
+    """The pre-vectorization builder: one iterrows pass and dict per point, per timeframe."""
+    chart_data = {}
+    data_1d = []
+    for index, row in df_1d_intraday.dropna(subset=["Close"]).iterrows():
+        data_1d.append({"date": index.isoformat(), "price": row['Close']})
+    chart_data['1D'] = data_1d
+
+    df_1y = df_1y_daily.dropna(subset=["Close"])
+    for key, frame in (("1M", _last_months(df_1y, 1)), ("6M", _last_months(df_1y, 6)), ("1Y", df_1y)):
+        data = []
+        for index, row in frame.iterrows():
+            data.append({"date": index.isoformat(), "price": row['Close']})
+        chart_data[key] = data
+    return chart_data
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+if __name__ == "__main__":
+    print(f"{'case':<20} {'builder':<11} {'build ms':>9} {'json ms':>8} {'payload KB':>11}")
+    print("-" * 63)
+    for label, intraday_bars, daily_bars in CASES:
+        intraday = synthetic_close(intraday_bars, "min")
+        daily = synthetic_close(daily_bars, "B", seed=11)
+
+        builders = {
+            "iterrows": lambda: legacy_chart_data(intraday, daily),
+            "rows": lambda: prepare_chart_data("BENCH", intraday, daily, layout="rows", budget=None),
+            "columns": lambda: prepare_chart_data("BENCH", intraday, daily, layout="columns", budget=None),
+            # Cold: a fresh ticker name per call, so the downsampled series cache never hits
+            "lttb 500": lambda: prepare_chart_data(f"BENCH{time.perf_counter_ns()}", intraday, daily, budget=500),
+            "minmax 500": lambda: prepare_chart_data(f"BENCH{time.perf_counter_ns()}", intraday, daily,
+                                                     budget=500, method="minmax"),
+            "cached": lambda: prepare_chart_data("BENCH", intraday, daily, budget=500),
+        }
+        outputs = {}
+        for name, build in builders.items():
+            build_s, payload = timed(build)
+            json_s, text = timed(lambda: json.dumps(payload))
+            outputs[name] = payload
+            print(f"{label:<20} {name:<11} {build_s * 1e3:>9.2f} {json_s * 1e3:>8.2f} {len(text) / 1024:>11.1f}")
+
+        assert outputs["rows"] == outputs["iterrows"], "rows layout differs from the legacy payload"
+        columns = outputs["columns"]
+        for key, points in outputs["rows"].items():
+            assert columns[key]["price"] == [p["price"] for p in points]
+            assert columns[key]["t"] == [int(pd.Timestamp(p["date"]).timestamp()) for p in points]
+        print("-" * 63)
@@ -0,0 +1,86 @@
+# Planned intraday fetches at awkward times of day: a stub upstream that answers '<n>d' the way Yahoo does
+# (the last n sessions that have opened, with bars only up to "now") checks that the period
+# lookback.plan_period picks downloads enough 1m bars in ONE call, cold and through the OHLCV store.
+# Run from this folder:  python bench_fetch_plan.py
+
+import datetime as dt
+import tempfile
+import numpy as np
+import pandas as pd
+from anomaly import ANOMALY_COLUMNS
+from config import MARKET_TIMEZONE
+from data_fetch import pull_history_batch
+from lookback import plan_period, required_bars
+from store import OHLCVStore
+from trading_calendar import NSE
+
+TICKERS = ["AAA.NS", "BBB.NS", "CCC.NS"]
+MOMENTS = [
+    ("Tuesday 09:20", "2025-09-09 09:20"),
+    ("Wednesday 09:45", "2025-09-10 09:45"),
+    ("Wednesday 11:00", "2025-09-10 11:00"),
+    ("Monday 09:20 (after the weekend)", "2025-09-08 09:20"),
+    ("Friday 09:20 (after a holiday)", "2025-10-03 09:20"),
+    ("Tuesday 08:00 (before the open)", "2025-09-09 08:00"),
+]
+
+
+class StubUpstream:
+    """yf.download stand-in at a fixed `now`: 1m bars of every session that opened by then."""
+
+    def __init__(self, now):
+        self.now = now
+        self.calls = 0
+
+    def sessions(self, first):
+        day, out = first, []
+        while day <= self.now.date():
+            hours = NSE.session(day)
+            if hours is not None and hours[0] <= self.now:
+                out.append(hours)
+            day += dt.timedelta(days=1)
+        return out
+
+    def __call__(self, tickers, interval, period=None, start=None):
+        self.calls += 1
+        first = NSE.sessions_back(int(period[:-1]), self.now) if start is None else pd.Timestamp(start).date()
+        index = pd.DatetimeIndex([t for o, c in self.sessions(first)
+                                  for t in pd.date_range(o, min(c, self.now), freq="1min", inclusive="left")])
+        frames = {}
+        for i, ticker in enumerate(tickers):
+            close = 100.0 + i + np.arange(len(index)) * 0.01
+            frames[ticker] = pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                                           "Adj Close": close, "Volume": 1000.0}, index=index)
+        return pd.concat(frames, axis=1)
+
+
+def at(now):
+    """Runs the calendar (and so every '<n>d' window) as if it were `now`."""
+    NSE._local = lambda when=None: (when or now).astimezone(NSE.tz)
+
+
+if __name__ == "__main__":
+    bars = required_bars()
+    print(f"scoring needs {bars} 1m bars; the anomaly scan needs {required_bars(ANOMALY_COLUMNS)}")
+    print(f"{'moment':<34} {'plan':>5} {'calls':>6} {'min bars':>9} {'store calls':>12} {'store bars':>11}")
+    print("-" * 82)
+    for name, when in MOMENTS:
+        now = MARKET_TIMEZONE.localize(dt.datetime.fromisoformat(when))
+        at(now)
+        period = plan_period("1m", bars, now)
+        assert period == plan_period("1m", required_bars(ANOMALY_COLUMNS), now)
+
+        upstream = StubUpstream(now)
+        frames, errors = pull_history_batch(TICKERS, "1m", period, store=False, provider=upstream)
+        cold = min(len(df) for df in frames.values())
+        assert not errors and upstream.calls == 1 and cold >= bars, (name, upstream.calls, cold, errors)
+
+        # Through the store: a full download, then a top-up that must still window to enough bars
+        store = OHLCVStore(tempfile.mkdtemp())
+        stored = StubUpstream(now)
+        pull_history_batch(TICKERS, "1m", period, store=store, provider=stored)
+        frames, errors = pull_history_batch(TICKERS, "1m", period, store=store, provider=stored)
+        warm = min(len(df) for df in frames.values())
+        assert not errors and stored.calls == 2 and warm >= bars, (name, stored.calls, warm, errors)
+        print(f"{name:<34} {period:>5} {upstream.calls:>6} {cold:>9} {stored.calls:>12} {warm:>11}")
+    print("\nevery plan downloaded its bars in one call")
@@ -0,0 +1,91 @@
+# Hedged vs unhedged upstream calls against a local stub server with injected latency:
+# p50/p95/p99 per mode, then the deadline (a hung endpoint) and retries (a flaky one).
+# Run from this folder:  python bench_hedging.py
+
+import random
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from hedge import Hedger, UpstreamTimeout
+
+CALLS = 300
+SLOW_SHARE = 0.03          # share of requests that stall (a slow upstream replica / GC pause)
+FAST_LATENCY = (0.02, 0.06)
+SLOW_LATENCY = 1.5
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/quote: mostly fast, sometimes slow; /hang: never in time; /flaky: every other request is a 503."""
+    flaky_hits = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        if self.path == "/hang":
+            time.sleep(5.0)
+        elif self.path == "/flaky":
+            with StubHandler.lock:
+                StubHandler.flaky_hits += 1
+                failing = StubHandler.flaky_hits % 2 == 1
+            if failing:
+                self.send_response(503)
+                self.end_headers()
+                return
+        else:
+            slow = random.random() < SLOW_SHARE
+            time.sleep(SLOW_LATENCY if slow else random.uniform(*FAST_LATENCY))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return response.read()
+
+
+def latencies(hedger, url, calls=CALLS):
+    out = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        hedger.call(fetch, url, kind="quote")
+        out.append(time.perf_counter() - start)
+    return np.array(out)
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    print(f"{CALLS} calls, {SLOW_SHARE:.0%} stalled for {SLOW_LATENCY}s")
+    print(f"{'mode':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'hedges':>7} {'wins':>5}")
+    print("-" * 60)
+    for name, hedger in (("unhedged", Hedger(enabled=False)), ("hedged", Hedger(default_delay=0.1))):
+        random.seed(3)
+        lat = latencies(hedger, f"{base}/quote") * 1e3
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+        print(f"{name:<10} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {lat.max():>8.1f} {hedger.hedges:>7} "
+              f"{hedger.hedge_wins:>5}")
+    print(f"hedge delay learnt: {hedger.hedge_delay('quote') * 1e3:.1f} ms (p95 of observed latencies)")
+
+    hedger = Hedger(default_delay=0.2, deadline=1.0)
+    start = time.perf_counter()
+    try:
+        hedger.call(fetch, f"{base}/hang", kind="hang")
+        print("deadline: hung endpoint answered?!")
+    except UpstreamTimeout as e:
+        print(f"\ndeadline: {e} after {time.perf_counter() - start:.2f}s (1.0s budget)")
+
+    hedger = Hedger(enabled=False, retries=2, backoff=0.05)
+    result = hedger.call(fetch, f"{base}/flaky", kind="flaky")
+    print(f"retries:  flaky endpoint answered {result!r} after {hedger.retried} retry")
+    print(f"stats:    {hedger.stats()}")
+    server.shutdown()
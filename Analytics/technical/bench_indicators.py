@@ -0,0 +1,123 @@
+# Benchmark + equivalence check: NumPy indicator engine vs the old pandas_ta path.
+# Run from this folder:  python bench_indicators.py
+
+import time
+import numpy as np
+import pandas as pd
+from indicators import compute_indicators
+import indicator_engine as engine
+from indicator_engine import ENGINE_COLUMNS
+from bank import DEFAULT_BANK, bank_columns, compute_bank
+
+SIZES = [250, 2_500, 250_000]
+TOLERANCE = 1e-6 # max |engine - pandas_ta| relative to the reference series' spread
+
+# pandas_ta output column -> canonical column
+PANDAS_TA_COLUMNS = {
+    "SMA_20": "SMA20", "SMA_50": "SMA50", "SMA_200": "SMA200",
+    "EMA_12": "EMA12", "EMA_26": "EMA26",
+    "MACD_12_26_9": "MACD", "MACDs_12_26_9": "MACD_SIGNAL", "MACDh_12_26_9": "MACD_HIST",
+    "ADX_14": "ADX", "DMP_14": "+DI", "DMN_14": "-DI",
+    "RSI_14": "RSI", "ATRr_14": "ATR",
+    "BBL_20_2.0": "BBL", "BBM_20_2.0": "BBM", "BBU_20_2.0": "BBU",
+    "OBV": "OBV", "CMF_20": "CMF", "MFI_14": "MFI",
+    "STOCHk_14_3_3": "STOCH_K", "STOCHd_14_3_3": "STOCH_D", "CCI_20_0.015": "CCI",
+}
+
+def synthetic_ohlcv(n, seed=7):
+    """Random-walk OHLCV bars (daily index) for benchmarking."""
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = close * (1 + rng.normal(0, 0.003, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, n)))
+    volume = rng.integers(100_000, 5_000_000, n).astype(float)
+    index = pd.date_range("2000-01-03", periods=n, freq="min")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index)
+
+def pandas_ta_indicators(df):
+    """The pre-engine implementation: one df.ta call per indicator."""
+    import pandas_ta as ta  # noqa: F401  (registers the .ta accessor)
+    df = df.copy()
+    df.ta.sma(length=20, append=True)
+    df.ta.sma(length=50, append=True)
+    df.ta.sma(length=200, append=True)
+    df.ta.ema(length=12, append=True)
+    df.ta.ema(length=26, append=True)
+    for fn, kwargs in [
+        ("macd", {}), ("adx", {}), ("rsi", {"length": 14}), ("atr", {"length": 14}),
+        ("bbands", {"length": 20, "std": 2}), ("obv", {}), ("cmf", {"length": 20}),
+        ("mfi", {"length": 14}), ("stoch", {}), ("cci", {"length": 20}),
+    ]:
+        getattr(df.ta, fn)(**kwargs, append=True)
+    return df
+
+def max_deviation(engine_df, reference_df):
+    """Worst per-column deviation, scaled by the reference column's spread."""
+    worst = {}
+    for raw, canonical in PANDAS_TA_COLUMNS.items():
+        if raw not in reference_df.columns:
+            continue
+        a = engine_df[canonical].to_numpy()
+        b = reference_df[raw].to_numpy(dtype=np.float64)
+        both = ~np.isnan(a) & ~np.isnan(b)
+        if (np.isnan(a) != np.isnan(b)).any():
+            worst[canonical] = np.inf
+        elif both.any():
+            worst[canonical] = np.max(np.abs(a[both] - b[both])) / (np.nanstd(b) + 1e-12)
+    return worst
+
+def bank_one_by_one(high, low, close, volume, grid=DEFAULT_BANK):
+    """The DEFAULT_BANK variants with one engine call each (what the bank replaces)."""
+    out = [engine.sma(close, n) for n in grid["SMA"]]
+    out += [engine.ema(close, n) for n in grid["EMA"]]
+    out += [engine.rsi(close, n) for n in grid["RSI"]]
+    out += [engine.atr(high, low, close, n) for n in grid["ATR"]]
+    out += [engine.bbands(close, n, k) for n in grid["BBANDS"]["length"] for k in grid["BBANDS"]["std"]]
+    out += [engine.zscore(close, n, min(10, n)) for n in grid["ZSCORE"]]
+    out += [engine.zscore(volume, n, min(10, n)) for n in grid["VOL_Z"]]
+    return out
+
+def timed(fn, *args, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+if __name__ == "__main__":
+    try:
+        import pandas_ta  # noqa: F401
+        have_pandas_ta = True
+    except ImportError:
+        have_pandas_ta = False
+        print("pandas_ta not installed: timing the engine only, no equivalence check.")
+
+    print(f"\n{'bars':>9} | {'engine':>10} | {'pandas_ta':>10} | {'speedup':>8} | max deviation")
+    print("-" * 70)
+    for n in SIZES:
+        df = synthetic_ohlcv(n)
+        t_engine, engine_df = timed(compute_indicators, df)
+        assert all(c in engine_df.columns for c in ENGINE_COLUMNS)
+
+        if have_pandas_ta:
+            # pandas_ta's CCI uses rolling().apply, so the 250k run takes a while
+            t_ta, ta_df = timed(pandas_ta_indicators, df, repeat=1)
+            deviation = max_deviation(engine_df, ta_df)
+            worst_col = max(deviation, key=deviation.get)
+            status = "OK" if deviation[worst_col] <= TOLERANCE else "MISMATCH"
+            print(f"{n:>9,} | {t_engine*1e3:>8.1f}ms | {t_ta*1e3:>8.1f}ms | {t_ta/t_engine:>7.1f}x | "
+                  f"{deviation[worst_col]:.1e} ({worst_col}) {status}")
+        else:
+            print(f"{n:>9,} | {t_engine*1e3:>8.1f}ms | {'-':>10} | {'-':>8} | -")
+
+    print(f"\n{'bars':>9} | {'bank':>10} | {'one-by-one':>10} | {'full pass':>10}   ({len(bank_columns(DEFAULT_BANK))} bank variants)")
+    print("-" * 70)
+    for n in SIZES:
+        df = synthetic_ohlcv(n)
+        h, l, c, v = (df[k].to_numpy() for k in ["High", "Low", "Close", "Volume"])
+        t_bank, _ = timed(compute_bank, h, l, c, v)
+        t_single, _ = timed(bank_one_by_one, h, l, c, v)
+        t_full, _ = timed(engine.compute_block, h, l, c, v)
+        print(f"{n:>9,} | {t_bank*1e3:>8.1f}ms | {t_single*1e3:>8.1f}ms | {t_full*1e3:>8.1f}ms")
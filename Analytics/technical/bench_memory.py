@@ -0,0 +1,109 @@
+# tracemalloc report: peak memory of the scoring pipeline per ticker and for a NIFTY 100 run,
+# old frame layout (copy + sort + concat) vs the compact layout in float64 and float32.
+# Run from this folder:  python bench_memory.py
+
+import gc
+import tracemalloc
+import numpy as np
+import pandas as pd
+from config import BASE_WEIGHTS, NIFTY_100_TICKERS
+from features import features_from_row, required_columns
+from indicator_engine import compute_block
+from indicators import compute_indicators
+
+# (label, bars, pandas frequency)
+DATASETS = [
+    ("1y daily", 250, "B"),
+    ("7d 1m", 7 * 375, "min"),
+    ("10y daily", 2_500, "B"),
+]
+
+def synthetic_ohlcv(n, freq, seed=7):
+    """Random-walk OHLCV bars, with the extra Adj close column yfinance frames carry."""
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = close * (1 + rng.normal(0, 0.003, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, n)))
+    volume = rng.integers(100_000, 5_000_000, n).astype(float)
+    index = pd.date_range("2015-01-01", periods=n, freq=freq, tz="Asia/Kolkata")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Adj close": close,
+                         "Volume": volume}, index=index)
+
+def _features(df_computed):
+    # normalize_features without its own sort/copy, so both layouts share it
+    hist = df_computed["MACD_HIST"].dropna()
+    obv = df_computed["OBV"].dropna()
+    obv_mean = obv.rolling(20).mean().iloc[-1] if len(obv) > 20 else None
+    return features_from_row(df_computed.iloc[-1], (len(hist), hist.mean(), hist.std()), obv_mean)
+
+def legacy_pipeline(df, columns):
+    """The previous layout: analyze_stock's df.copy(), compute_indicators' sort + drop + concat,
+    normalize_features' df.copy().sort_index()."""
+    df_to_analyze = df.copy()
+    work = df_to_analyze.sort_index()
+    block = compute_block(work["High"].to_numpy(dtype=np.float64), work["Low"].to_numpy(dtype=np.float64),
+                          work["Close"].to_numpy(dtype=np.float64), work["Volume"].to_numpy(dtype=np.float64),
+                          columns=columns)
+    computed = pd.DataFrame(block.T, index=work.index, columns=columns)
+    df_computed = pd.concat([work.drop(columns=[c for c in columns if c in work.columns]), computed], axis=1)
+    _features(df_computed.copy().sort_index())
+    return df_computed
+
+def compact_pipeline(df, columns, dtype):
+    df_computed = compute_indicators(df, columns=columns, dtype=dtype)
+    _features(df_computed)
+    return df_computed
+
+def peak(fn, *args):
+    """(peak KiB while fn runs, KiB of what it returns) measured with tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fn(*args)
+    current, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (top - base) / 1024, (current - base) / 1024
+
+def index_run(n_tickers, bars, pipeline):
+    """Scores n_tickers frames one after the other, keeping every computed frame (as a report would)."""
+    frames = [synthetic_ohlcv(bars, "B", seed=i) for i in range(n_tickers)]
+    columns = required_columns(weights=BASE_WEIGHTS)
+    return lambda: [pipeline(df, columns) for df in frames]
+
+if __name__ == "__main__":
+    columns = required_columns(weights=BASE_WEIGHTS)
+    layouts = {
+        "legacy f64": lambda df: legacy_pipeline(df, columns),
+        "compact f64": lambda df: compact_pipeline(df, columns, "float64"),
+        "compact f32": lambda df: compact_pipeline(df, columns, "float32"),
+    }
+
+    print(f"{'per ticker':<12} {'layout':<12} {'peak KiB':>10} {'frame KiB':>10} {'columns':>8}")
+    print("-" * 56)
+    for label, bars, freq in DATASETS:
+        df = synthetic_ohlcv(bars, freq)
+        for name, pipeline in layouts.items():
+            top, kept = peak(pipeline, df)
+            print(f"{label:<12} {name:<12} {top:>10.1f} {kept:>10.1f} {pipeline(df).shape[1]:>8}")
+        print("-" * 56)
+
+    print(f"\n{'NIFTY 100 (1y daily)':<22} {'peak MiB':>10} {'kept MiB':>10}")
+    print("-" * 44)
+    pipelines = {
+        "legacy f64": lambda df, cols: legacy_pipeline(df, cols),
+        "compact f64": lambda df, cols: compact_pipeline(df, cols, "float64"),
+        "compact f32": lambda df, cols: compact_pipeline(df, cols, "float32"),
+    }
+    for name, pipeline in pipelines.items():
+        run = index_run(len(NIFTY_100_TICKERS), 250, pipeline)
+        top, kept = peak(run)
+        print(f"{name:<22} {top / 1024:>10.2f} {kept / 1024:>10.2f}")
+
+    # float32 precision: worst relative deviation of the stored indicators vs float64
+    df = synthetic_ohlcv(2_500, "B")
+    f64 = compute_indicators(df, columns=columns)
+    f32 = compute_indicators(df, columns=columns, dtype="float32")
+    rel = ((f32 - f64).abs() / f64.abs().where(f64.abs() > 1e-9)).max().max()
+    print(f"\nfloat32 storage: max relative deviation {rel:.1e}")
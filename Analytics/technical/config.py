@@ -1,3 +1,4 @@
+import os
 import math
 from pytz import timezone
 
@@ -8,9 +9,100 @@ MARKET_OPEN_MINUTE = 15
 MARKET_CLOSE_HOUR = 15
 MARKET_CLOSE_MINUTE = 30
 
+# NSE trading calendar (see trading_calendar.py); extend from the exchange's holiday circular each year
+CALENDAR_YEARS = (2024, 2026) # first and last year of the session table: only years NSE_HOLIDAYS lists
+NSE_HOLIDAYS = [
+    "2024-01-22", "2024-01-26", "2024-03-08", "2024-03-25", "2024-03-29", "2024-04-11", "2024-04-17",
+    "2024-05-01", "2024-05-20", "2024-06-17", "2024-07-17", "2024-08-15", "2024-10-02", "2024-11-01",
+    "2024-11-15", "2024-11-20", "2024-12-25",
+    "2025-02-26", "2025-03-14", "2025-03-31", "2025-04-10", "2025-04-14", "2025-04-18", "2025-05-01",
+    "2025-08-15", "2025-08-27", "2025-10-02", "2025-10-21", "2025-10-22", "2025-11-05", "2025-12-25",
+    "2026-01-26", "2026-03-03", "2026-03-26", "2026-03-31", "2026-04-03", "2026-04-14", "2026-05-01",
+    "2026-05-28", "2026-06-26", "2026-09-14", "2026-10-02", "2026-10-20", "2026-11-10", "2026-11-24",
+    "2026-12-25",
+]
+# Sessions off the regular 9:15-15:30 weekday pattern: Muhurat trading, weekend sessions, half days.
+# A date listed here trades these hours even when it is a holiday or a weekend.
+NSE_SPECIAL_SESSIONS = {
+    "2024-01-20": ("09:15", "15:30"), # Saturday session
+    "2024-11-01": ("18:00", "19:00"), # Muhurat
+    "2025-02-01": ("09:15", "15:30"), # Budget day, Saturday
+    "2025-10-21": ("13:45", "14:45"), # Muhurat
+}
+
 # Analysis Thresholds
 ADX_TREND_THRESHOLD = 25.0 # ADX threshold for trend regime
 ANOMALY_Z_THRESHOLD = 3.0 # return/volume zscore for anomaly
+TREND_REGIME_THRESHOLD = 0.3 # ADX feature above which adapt_weights uses the trend regime
+TREND_BOOST = 0.5 # trend regime: SMA/EMA/MACD weights scale by 1 + TREND_BOOST * ADX feature
+
+# Data Fetch
+MIN_HISTORY_BARS = 200 # bars needed before indicators (SMA200) are meaningful
+BATCH_DOWNLOAD_SIZE = 50 # tickers per yf.download call in batch mode
+# Local OHLCV store (set to None to always download the full window)
+OHLCV_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache", "ohlcv")
+PRICE_CACHE_SIZE = 256 # in-process (ticker, interval, period) entries, expired at bar boundaries
+
+# Fetch planning: the smallest download the scoring indicators need (see lookback.py)
+LOOKBACK_TOLERANCE = 1e-4 # max start-up error of smoothed indicators (EMA/MACD/RSI/ATR/ADX) vs an unbounded history
+INTRADAY_MAX_DAYS = {"1m": 7, "2m": 60, "5m": 60, "15m": 60, "30m": 60, "60m": 730, "90m": 60, "1h": 730} # Yahoo limits
+
+# Parallel index analysis (see parallel.py)
+INDEX_EXECUTOR = "thread" # "thread" or "process"
+INDEX_WORKERS = 8 # concurrent tickers; keep at or below what the upstream rate limit allows
+TICKER_TIMEOUT = 30.0 # seconds one ticker (fetch, its upstream retries, scoring) may take before it is given up
+
+# Chart payloads (see utils.prepare_chart_data)
+CHART_LAYOUT = "columns" # "columns" (epoch/price arrays) or "rows" (the original [{date, price}] lists)
+CHART_POINT_BUDGET = {"1D": 500, "1M": 500, "6M": 500, "1Y": 500} # max points per timeframe (None: every bar)
+CHART_DOWNSAMPLE = "lttb" # "lttb" or "minmax" (see downsample.py)
+CHART_CACHE_SIZE = 512 # downsampled (ticker, timeframe, budget) series kept until the next bar
+
+# Multi-index runs (see planner.py)
+MAP_BSE_TO_NSE = False # score .BO members through their .NS listing when it is in the run anyway
+BSE_TO_NSE = {} # .BO tickers whose .NS symbol differs, e.g. {"XYZ.BO": "XYZLTD.NS"}
+
+# Precomputed snapshots (see precompute.py)
+PRECOMPUTE_UNIVERSE = None # tickers rescanned (None: NIFTY 100 + SENSEX 30)
+PRECOMPUTE_ON_STARTUP = True # one API worker (holding SNAPSHOT_PATH's lock file) runs the precompute thread, the rest read its snapshots
+PRECOMPUTE_INTERVAL = 60 # seconds between scans while the market is open
+PRECOMPUTE_AFTER_CLOSE = 120 # seconds after the close before the final scan of the day
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache", "snapshot", "technical.npz")
+
+# Universe anomaly scanner (see anomaly.py)
+ANOMALY_UNIVERSE = None # tickers scanned by default (None: NIFTY 100 + SENSEX 30)
+ANOMALY_TOP = 20 # tickers returned by default, largest |z| first
+ANOMALY_CACHE_SIZE = 16 # (universe, interval) scans kept until the next bar
+
+# Overlapped fetch/compute scans (see pipeline.py)
+PIPELINE_FETCH_CONCURRENCY = 8 # downloads in flight at once
+PIPELINE_COMPUTE_WORKERS = None # scoring processes (None: one per CPU)
+PIPELINE_QUEUE_SIZE = 16 # fetched frames waiting for a scorer before fetching pauses
+
+# Indicator frames (see indicators.compute_indicators)
+INDICATOR_DTYPE = "float64" # "float32" halves indicator memory at ~1e-7 relative precision
+
+# Upstream calls: hedging, deadlines, retries (see hedge.py)
+UPSTREAM_DEADLINE = 20.0 # seconds one upstream call may take, hedges and retries included
+UPSTREAM_DEADLINE_PER_TICKER = 1.0 # extra seconds a batch download gets per ticker after the first
+UPSTREAM_RETRIES = 2 # retries after a failed attempt
+UPSTREAM_BACKOFF = 0.5 # seconds; retry n sleeps a random [0, UPSTREAM_BACKOFF * 2**n]
+HEDGE_ENABLED = True
+HEDGE_QUANTILE = 0.95 # hedge once a call is slower than this quantile of recent latencies
+HEDGE_DEFAULT_DELAY = 3.0 # seconds, until HEDGE_MIN_SAMPLES latencies have been seen
+HEDGE_MIN_DELAY = 0.05 # never hedge sooner than this
+HEDGE_MIN_SAMPLES = 20
+
+# Tail-only scoring (see tail.py)
+TAIL_TOLERANCE = 1e-6 # max start-up error of Wilder-smoothed indicators, as a fraction of their input's range
+
+# Backtest (see backtest.py)
+BACKTEST_PERIOD = "10y" # daily history replayed by default
+BACKTEST_COST_BPS = 10.0 # cost per side (brokerage + slippage), in basis points
+
+# Weight/threshold optimizer (see optimize.py)
+OPTIMIZER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache", "optimizer")
+OPTIMIZER_HORIZON = 5 # bars ahead of the forward return candidates are scored against
 
 # Weights (base) — will be adapted by regime
 BASE_WEIGHTS = {
@@ -79,4 +171,4 @@ SENSEX_30_TICKERS = [
 
 
 # --- ADD THIS LINE AT THE END ---
-NIFTY_100_TICKERS = NIFTY_50_TICKERS + NIFTY_NEXT_50_TICKERS
\ No newline at end of file
+NIFTY_100_TICKERS = NIFTY_50_TICKERS + NIFTY_NEXT_50_TICKERS
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from config import MARKET_OPEN_HOUR, MARKET_OPEN_MINUTE
+from data_fetch import pull_history
+from store import period_start, window
+from utils import interval_minutes
+
+OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+# Coarse intervals built from daily bars: pandas rule, labelled like yfinance (week/month start)
+DAILY_RULES = {"1wk": "W-MON", "1mo": "MS"}
+
+
+def _bar_minutes(df):
+    """Smallest spacing between bars in minutes (None for fewer than two bars)."""
+    if len(df) < 2:
+        return None
+    return float(np.diff(df.index.as_unit("ns").asi8).min()) / 60e9
+
+
+def _reaches(period, other, interval=None):
+    """Whether a `period` download of `interval` bars reaches at least as far back as an `other` one."""
+    start, other_start = period_start(period, interval=interval), period_start(other, interval=interval)
+    return start is None or (other_start is not None and start <= other_start)
+
+
+def _last_sessions(df, period):
+    """
+    Intraday '<n>d' windows as yfinance returns them: the last n trading
+    sessions (not calendar days), so '1d' after the close is that day's session.
+    """
+    days = pd.DatetimeIndex(df.index.normalize()).unique()
+    n = int(period[:-1])
+    return df[df.index >= days[-n]] if len(days) > n else df
+
+
+def resample_ohlcv(df, interval):
+    """
+    Aggregates bars to a coarser `interval`: '<n>m'/'<n>h' bins aligned to the
+    session open (9:15, as Yahoo aligns them), '1wk' and '1mo' labelled by
+    their first day. Bins without trades are dropped.
+    """
+    minutes = interval_minutes(interval)
+    if minutes is not None:
+        offset = (MARKET_OPEN_HOUR * 60 + MARKET_OPEN_MINUTE) % minutes
+        bins = df.resample(f"{minutes}min", origin="start_day", offset=f"{offset}min", label="left", closed="left")
+    else:
+        bins = df.resample(DAILY_RULES[interval], label="left", closed="left")
+    return bins.agg(OHLCV_AGG).dropna(subset=["Close"])
+
+
+class DataContext:
+    """
+    Per-request OHLCV resolver: each (ticker, interval, period) is fetched at
+    most once, and a dataset that can be derived from one already loaded is
+    never fetched at all:
+      - the same interval over a shorter period is a window of the longer one;
+      - a coarser interval (1m -> 5m, 1d -> 1wk) is resampled locally from a
+        finer one covering the period.
+    Failures are remembered too, so a bad ticker is not retried within the
+    request. Counters: fetches (upstream calls), derived, hits.
+    """
+
+    def __init__(self, fetch=pull_history):
+        self.fetch = fetch
+        self.frames = {}
+        self.errors = {}
+        self.fetches = 0
+        self.derived = 0
+        self.hits = 0
+
+    def get(self, ticker, interval, period, min_bars=None):
+        """The frame for (ticker, interval, period); `min_bars` is passed on to a fetch (0: chart data, no extension)."""
+        key = (ticker, interval, period)
+        if key in self.frames:
+            self.hits += 1
+            return self.frames[key]
+        if key in self.errors:
+            self.hits += 1
+            raise self.errors[key]
+
+        df = self._derive(ticker, interval, period)
+        if df is not None:
+            self.derived += 1
+        else:
+            self.fetches += 1
+            try:
+                df = self.fetch(ticker, interval, period) if min_bars is None else \
+                    self.fetch(ticker, interval, period, min_bars=min_bars)
+            except Exception as e:
+                self.errors[key] = e
+                raise
+        self.frames[key] = df
+        return df
+
+    def put(self, ticker, interval, period, df):
+        """Registers a frame the caller already has (e.g. from a batch download)."""
+        self.frames[(ticker, interval, period)] = df
+
+    def _derive(self, ticker, interval, period):
+        target = interval_minutes(interval)
+        for (t, source_interval, source_period), df in self.frames.items():
+            if t != ticker or df.empty or not _reaches(source_period, period, interval):
+                continue
+            source = interval_minutes(source_interval)
+            # The frame must really hold bars of its nominal interval
+            # (pull_history falls back to daily bars for short intraday history)
+            spacing = _bar_minutes(df)
+            if source is not None and spacing != source:
+                continue
+            if source is None and source_interval != "1d":
+                continue
+
+            if source_interval == interval:
+                derived = df
+            elif target is not None and source is not None and target % source == 0:
+                derived = resample_ohlcv(df, interval)
+            elif target is None and source_interval == "1d" and interval in DAILY_RULES:
+                derived = resample_ohlcv(df, interval)
+            else:
+                continue
+
+            if source_period == period:
+                return derived
+            if target is not None and period.endswith("d"):
+                return _last_sessions(derived, period)
+            return window(derived, period, interval)
+        return None
@@ -1,56 +1,258 @@
+import logging
 import yfinance as yf
 import pandas as pd
 import numpy as np
+from config import (BATCH_DOWNLOAD_SIZE, OHLCV_STORE_DIR, PRICE_CACHE_SIZE, UPSTREAM_DEADLINE,
+                    UPSTREAM_DEADLINE_PER_TICKER)
+from store import OHLCVStore, period_start, window
+from cache import TTLCache
+from hedge import HEDGER
+from lookback import extension, required_bars
+from utils import interval_minutes, next_bar_boundary
 
-def pull_history(ticker, interval, period):
+logger = logging.getLogger(__name__)
+
+REQUIRED_PRICE_COLS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Periods yf.download accepts as such; any other (and every intraday '<n>d') is sent as a start date
+YF_PERIODS = {"1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"}
+
+_default_store = None
+
+# Process-wide price cache for API workers: (ticker, interval, period) -> DataFrame
+PRICE_CACHE = TTLCache(maxsize=PRICE_CACHE_SIZE)
+
+
+def default_store():
+    """The shared on-disk store, or None when OHLCV_STORE_DIR is disabled."""
+    global _default_store
+    if _default_store is None and OHLCV_STORE_DIR:
+        _default_store = OHLCVStore(OHLCV_STORE_DIR)
+    return _default_store
+
+
+def yf_provider(tickers, interval, period=None, start=None, deadline=None):
     """
-    Fetch historical OHLCV data safely using yfinance with dynamic interval/period.
+    Default upstream provider: one yf.download for one or many tickers, either
+    for a whole `period` or for every bar from `start` onwards.
+    Any callable with this signature can stand in for it (e.g. a fake in tests).
+
+    Latencies are tracked per interval and batch size (a power of two up to
+    BATCH_DOWNLOAD_SIZE), so a 50-ticker batch is hedged against other
+    batches, not single-ticker fetches. `deadline` defaults to
+    UPSTREAM_DEADLINE plus UPSTREAM_DEADLINE_PER_TICKER for every ticker after
+    the first.
     """
-    try:
-        df = yf.download(
-            ticker,
-            period=period, 
-            interval=interval, 
-            progress=False,
-            auto_adjust=False,
-        )
-    except Exception as e:
-        raise RuntimeError(f"❌ yfinance download failed for {ticker}: {e}")
+    # Intraday '<n>d' is n trading sessions: sent as the first one's date, so the bars
+    # downloaded are exactly the ones store.period_start counts
+    sessions = interval_minutes(interval) is not None and str(period)[:-1].isdigit() and str(period).endswith("d")
+    if start is None and (period not in YF_PERIODS or sessions):
+        start = period_start(period, interval=interval).date()
+    window_kwargs = {"start": start} if start is not None else {"period": period}
+    n = 1 if isinstance(tickers, str) else max(1, len(tickers))
+    bucket = min(1 << (n - 1).bit_length(), BATCH_DOWNLOAD_SIZE)
+    if deadline is None:
+        deadline = UPSTREAM_DEADLINE + UPSTREAM_DEADLINE_PER_TICKER * (n - 1)
+    # Hedged after the p95 latency of its kind, bounded by `deadline`, retried with backoff (see hedge.py)
+    return HEDGER.call(
+        yf.download,
+        tickers,
+        kind=f"yf.download:{interval}:{bucket}",
+        deadline=deadline,
+        interval=interval,
+        group_by="ticker",
+        progress=False,
+        auto_adjust=False,
+        threads=True,
+        **window_kwargs,
+    )
+
 
+def _normalize_ohlcv(df, ticker):
+    """
+    Flatten yfinance columns to Open/High/Low/Close/Volume and drop incomplete bars.
+    """
     if df is None or df.empty:
         raise RuntimeError(f"⚠ No data returned by yfinance for ticker: {ticker}")
 
+    df = df.copy()
     if isinstance(df.columns, pd.MultiIndex):
-        df.columns = [c[0] for c in df.columns] 
+        df.columns = [c[0] for c in df.columns]
 
     df.columns = [str(c).strip().capitalize() for c in df.columns]
 
-    required_cols_price = ["Open", "High", "Low", "Close", "Volume"]
-    missing = [c for c in required_cols_price if c not in df.columns]
+    missing = [c for c in REQUIRED_PRICE_COLS if c not in df.columns]
     if missing:
         if "Adj close" in df.columns and "Close" not in df.columns:
             df["Close"] = df["Adj close"]
-        missing = [c for c in required_cols_price if c not in df.columns]
+        missing = [c for c in REQUIRED_PRICE_COLS if c not in df.columns]
         if missing:
             raise RuntimeError(f"❌ Still missing columns {missing} for {ticker} after normalization.")
 
-    df = df.dropna(subset=required_cols_price)
+    df = df.dropna(subset=REQUIRED_PRICE_COLS)
     if df.empty:
         raise RuntimeError(f"⚠ All OHLCV data empty for {ticker} after dropna.")
-    
-    # Fallback to get more data if needed for indicators
-    if len(df) < 200:
+    return df
+
+
+def adjust_prices(df):
+    """
+    Split- and dividend-adjusted bars, as yfinance returns them with
+    auto_adjust=True (and Ticker.history): Open/High/Low/Close scaled by each
+    bar's Adj close / Close, Volume as is. The store keeps the raw bars plus
+    Adj close, so either view comes from the same download. Frames without
+    Adj close are returned unchanged.
+    """
+    if "Adj close" not in df.columns:
+        return df
+    factor = (df["Adj close"] / df["Close"]).fillna(1.0)
+    out = df.copy()
+    for column in ("Open", "High", "Low", "Close"):
+        out[column] = df[column] * factor
+    return out
+
+
+def _split_ticker(raw, ticker):
+    """
+    Pull one ticker's columns out of a (possibly multi-ticker) yf.download result.
+    """
+    if raw is None or raw.empty:
+        return pd.DataFrame()
+    if not isinstance(raw.columns, pd.MultiIndex):
+        return raw
+    if ticker in raw.columns.get_level_values(0):
+        return raw[ticker]
+    if ticker in raw.columns.get_level_values(1):
+        return raw.xs(ticker, axis=1, level=1)
+    return pd.DataFrame()
+
+
+def _download_frames(tickers, interval, provider, period=None, start=None):
+    """
+    One provider call for a list of tickers, split into normalized frames.
+    Returns (frames, errors, failure): `failure` is the provider's exception
+    when the call itself failed (then every ticker has an error), else None.
+    """
+    frames, errors = {}, {}
+    try:
+        raw = provider(tickers, interval, period=period, start=start)
+    except Exception as e:
+        return frames, {t: f"❌ yfinance download failed for {t}: {e}" for t in tickers}, e
+
+    for ticker in tickers:
         try:
-            df_daily = yf.download(ticker, period="1y", interval="1d", progress=False, auto_adjust=False)
-            if not df_daily.empty:
-                if isinstance(df_daily.columns, pd.MultiIndex):
-                    df_daily.columns = [c[0] for c in df_daily.columns]
-                df_daily.columns = [str(c).strip().capitalize() for c in df_daily.columns]
-                if "Adj close" in df_daily.columns and "Close" not in df_daily.columns:
-                    df_daily["Close"] = df_daily["Adj close"]
-                if len(df_daily) > len(df):
-                    df = df_daily.dropna(subset=required_cols_price)
-        except Exception:
-            pass 
-
-    return df
\ No newline at end of file
+            frames[ticker] = _normalize_ohlcv(_split_ticker(raw, ticker), ticker)
+        except Exception as e:
+            errors[ticker] = str(e)
+    return frames, errors, None
+
+
+def _fetch_batch(tickers, interval, period, store, provider):
+    """
+    Resolve one batch of tickers. Tickers the store already covers only download
+    the bars after their last stored timestamp (one shared top-up call); the rest
+    download the full period. Everything fetched is merged back into the store.
+    When the top-up call fails, the stored bars are still served, but logged
+    and marked: their frames carry attrs["stale"] with the reason (a ticker
+    with simply nothing new upstream is not marked).
+    """
+    frames, errors = {}, {}
+    covered = [t for t in tickers if store is not None and store.covers(t, interval, period)]
+    missing = [t for t in tickers if t not in covered]
+
+    if covered:
+        # Re-fetch from the oldest last bar so a still-forming bar gets replaced too
+        start = min(store.last_timestamp(t, interval) for t in covered)
+        fresh, _, failure = _download_frames(covered, interval, provider, start=start)
+        if failure is not None:
+            logger.warning("Top-up of %d stored %s tickers failed, serving stored bars: %s",
+                           len(covered), interval, failure)
+        for ticker in covered:
+            if ticker in fresh:
+                merged = store.merge(ticker, interval, fresh[ticker])
+            else:
+                # Nothing new upstream (or the top-up failed): serve what is stored
+                merged = store.load(ticker, interval)
+            try:
+                frames[ticker] = _normalize_ohlcv(window(merged, period, interval), ticker)
+            except Exception as e:
+                errors[ticker] = str(e)
+                continue
+            if failure is not None:
+                frames[ticker].attrs["stale"] = f"top-up failed, bars up to {merged.index[-1]}: {failure}"
+
+    if missing:
+        fresh, fetch_errors, _ = _download_frames(missing, interval, provider, period=period)
+        errors.update(fetch_errors)
+        for ticker, df in fresh.items():
+            if store is not None:
+                df = window(store.merge(ticker, interval, df, period=period), period, interval)
+            frames[ticker] = df
+
+    return frames, errors
+
+
+def pull_history(ticker, interval, period, store=None, provider=None, min_bars=None):
+    """
+    Fetch historical OHLCV data safely using yfinance with dynamic interval/period.
+    Reads through the local OHLCV store, so repeat calls only download new bars
+    (store=False bypasses it; provider swaps out the yfinance download).
+    """
+    frames, errors = pull_history_batch([ticker], interval, period, store=store, provider=provider, min_bars=min_bars)
+    if ticker not in frames:
+        raise RuntimeError(errors.get(ticker, f"⚠ No data returned by yfinance for ticker: {ticker}"))
+    return frames[ticker]
+
+
+def pull_history_batch(tickers, interval, period, batch_size=BATCH_DOWNLOAD_SIZE, store=None, provider=None,
+                       min_bars=None):
+    """
+    Fetch OHLCV for many tickers using one upstream call per batch.
+    Returns (frames, errors): {ticker: DataFrame} for every ticker that came back
+    usable, and {ticker: message} for the ones that did not. A failing ticker or
+    batch never aborts the rest of the run.
+    Frames shorter than `min_bars` (default: what the scoring indicators need,
+    see lookback.required_bars) get one planned extension download.
+    """
+    store = default_store() if store is None else (store or None)
+    provider = provider or yf_provider
+    min_bars = required_bars() if min_bars is None else min_bars
+    unique = list(dict.fromkeys(tickers))
+    frames, errors = {}, {}
+
+    for start in range(0, len(unique), batch_size):
+        batch_frames, batch_errors = _fetch_batch(unique[start:start + batch_size], interval, period, store, provider)
+        frames.update(batch_frames)
+        errors.update(batch_errors)
+
+    # Short frames: one download planned from the bars still missing (a wider intraday window
+    # at the density the ticker trades at, or daily bars past Yahoo's intraday history), grouped
+    # so tickers sharing a plan share the calls. Nothing is fetched when no download could help.
+    plans = {}
+    for ticker, df in frames.items():
+        plan = extension(interval, period, df, min_bars)
+        if plan is not None:
+            plans.setdefault(plan, []).append(ticker)
+    for (plan_interval, plan_period), short in plans.items():
+        for start in range(0, len(short), batch_size):
+            extended, _ = _fetch_batch(short[start:start + batch_size], plan_interval, plan_period, store, provider)
+            for ticker, df in extended.items():
+                if len(df) > len(frames[ticker]):
+                    frames[ticker] = df
+
+    return frames, errors
+
+
+def cached_history(ticker, interval, period):
+    """
+    pull_history behind PRICE_CACHE. An entry lives until the data can next change
+    (the next bar boundary while the market is open, the next session open when
+    it is closed), so repeat requests inside a bar never reach Yahoo.
+    """
+    key = (ticker, interval, period)
+    df = PRICE_CACHE.get(key)
+    if df is None:
+        # Served as asked (API price series and charts): no extension past the requested window
+        df = pull_history(ticker, interval, period, min_bars=0)
+        PRICE_CACHE.set(key, df, next_bar_boundary(interval).timestamp())
+    return df
@@ -0,0 +1,71 @@
+import numpy as np
+
+
+def _buckets(n_points, n_buckets):
+    """Start/end positions of `n_buckets` near-equal buckets over the interior points 1 .. n_points-2."""
+    every = (n_points - 2) / n_buckets
+    edges = (np.arange(n_buckets + 1) * every).astype(np.int64) + 1
+    edges[-1] = n_points - 1
+    return edges[:-1], edges[1:]
+
+
+def lttb(y, budget):
+    """
+    Largest-Triangle-Three-Buckets: positions of at most `budget` points of
+    `y` that keep its visual shape. The first and last points are always
+    kept; every bucket in between keeps the point forming the largest
+    triangle with the previous pick and the next bucket's average. x is the
+    bar position, so closed-market gaps do not distort the buckets. Bucket
+    bounds and averages are computed for all buckets at once; only the pick
+    itself (which depends on the previous one) walks the buckets.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if budget is None or budget >= n:
+        return np.arange(n)
+    budget = max(budget, 3)
+
+    lo, hi = _buckets(n, budget - 2)
+    csum = np.concatenate([[0.0], np.cumsum(y)])
+    mid_x = (lo + hi - 1) / 2.0
+    avg_y = (csum[hi] - csum[lo]) / (hi - lo)
+    # The point each bucket is weighed against: the next bucket's average (the last point for the last bucket)
+    next_x = np.append(mid_x[1:], n - 1.0)
+    next_y = np.append(avg_y[1:], y[-1])
+
+    picks = np.empty(budget, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(budget - 2):
+        b = np.arange(lo[i], hi[i])
+        area = np.abs((a - next_x[i]) * (y[b] - y[a]) - (a - b) * (next_y[i] - y[a]))
+        a = lo[i] + int(np.argmax(area))
+        picks[i + 1] = a
+    return picks
+
+
+def minmax(y, budget):
+    """
+    Min/max bucketing: positions of at most `budget` points of `y`, keeping
+    the first and last points plus each bucket's lowest and highest one, so
+    every extreme survives. Fully vectorized (reduceat over the buckets).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if budget is None or budget >= n:
+        return np.arange(n)
+    if budget < 4:
+        return lttb(y, budget)
+
+    lo, hi = _buckets(n, (budget - 2) // 2)
+    bucket = np.repeat(np.arange(len(lo)), hi - lo)
+    interior = y[1:-1]
+    pos = np.arange(1, n - 1)
+    low = np.minimum.reduceat(interior, lo - 1)
+    high = np.maximum.reduceat(interior, lo - 1)
+    first_low = np.minimum.reduceat(np.where(interior == low[bucket], pos, n), lo - 1)
+    first_high = np.minimum.reduceat(np.where(interior == high[bucket], pos, n), lo - 1)
+    return np.unique(np.concatenate([[0, n - 1], first_low, first_high]))
+
+
+DOWNSAMPLERS = {"lttb": lttb, "minmax": minmax}
@@ -0,0 +1,96 @@
+from config import BASE_WEIGHTS
+from utils import is_market_open
+from lookback import plan_period, required_bars
+from indicators import compute_indicators
+from features import normalize_features, required_columns
+from scoring import adapt_weights, aggregate_score, compute_confidence
+from signals import recommend_signal, smart_stop, interpret_score
+from tail import evaluate_tail
+
+# Signals every index summary lists, in display order
+SIGNAL_NAMES = ["BUY", "HOLD", "TIGHTEN_STOP", "EXIT", "VIGILANCE_HIGH_VOL", "EXIT_ANOMALY"]
+
+def select_data_mode():
+    """
+    Picks the scoring dataset: 1m bars while the market is open, daily bars otherwise,
+    over the shortest period holding the bars the scoring indicators need (see lookback.py).
+    Returns (is_open, interval, period, data_mode).
+    """
+    bars = required_bars()
+    if is_market_open():
+        return True, '1m', plan_period('1m', bars), "REAL-TIME (1m)"
+    return False, '1d', plan_period('1d', bars), "HISTORICAL (1d)"
+
+
+def analysis_frame(df, mode):
+    """The bars that get scored: intraday data fetched after the close drops its last, partial bar."""
+    is_open, interval, _, _ = mode
+    if not is_open and interval != '1d' and len(df) >= 2:
+        return df.iloc[:-1]
+    return df
+
+
+def evaluate_frame(df, mode, tail_only=False, weights=None):
+    """
+    The scoring part of analyze_stock for an already fetched frame.
+    Returns {"score", "signal", "confidence", "stop", "features", "latest"}
+    (latest is the last bar with its indicators); raises RuntimeError when
+    there is nothing to score.
+    """
+    base_weights = BASE_WEIGHTS if weights is None else weights
+
+    df_to_analyze = analysis_frame(df, mode)
+    if df_to_analyze.empty:
+        raise RuntimeError("No data to analyze.")
+
+    if tail_only:
+        df_computed = df_to_analyze
+        features, latest_row = evaluate_tail(df_to_analyze)
+    else:
+        df_computed = compute_indicators(df_to_analyze, columns=required_columns(weights=base_weights))
+        features = normalize_features(df_computed)
+        latest_row = df_computed.iloc[-1]
+
+    features["RET_Z"] = latest_row.get("RET_Z", 0)
+    features["VOL_Z"] = latest_row.get("VOL_Z", 0)
+
+    adapted = adapt_weights(base_weights.copy(), features, df_computed)
+    final_score, breakdown = aggregate_score(features, adapted)
+    confidence = compute_confidence(breakdown, features)
+    signal = recommend_signal(final_score, confidence, latest_row, breakdown)
+    stop_price = smart_stop(latest_row, signal)
+    return {"score": final_score, "signal": signal, "confidence": confidence,
+            "stop": stop_price, "features": features, "latest": latest_row}
+
+
+def summarize(records, total_stocks_in_list):
+    """
+    Index summary from per-ticker records (in list order; records with an
+    "error" key are skipped). Every index path (serial, batched, parallel)
+    goes through here, so their summaries differ only as much as their
+    per-ticker scores do (float rounding between the panel and per-ticker
+    scoring).
+    """
+    valid_stocks = 0
+    total_score = 0
+    signal_counts = {name: 0 for name in SIGNAL_NAMES}
+
+    for record in records:
+        if "error" in record:
+            continue
+        total_score += record.get('score', 50)
+        signal = record.get('signal', 'HOLD')
+        signal_counts[signal] = signal_counts.get(signal, 0) + 1
+        valid_stocks += 1
+
+    if valid_stocks == 0:
+        return {"error": "Could not analyze any stocks in the index."}
+
+    average_score = total_score / valid_stocks
+    return {
+        "total_stocks_in_list": total_stocks_in_list,
+        "total_stocks_analyzed": valid_stocks,
+        "average_score": average_score,
+        "overall_interpretation": interpret_score(average_score),
+        "signal_distribution": signal_counts
+    }
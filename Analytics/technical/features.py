@@ -1,17 +1,70 @@
 import pandas as pd
 import numpy as np
-from config import ADX_TREND_THRESHOLD
+from config import ADX_TREND_THRESHOLD, BASE_WEIGHTS
+
+# Indicator columns each feature reads
+FEATURE_INPUTS = {
+    "SMA_trend": ["SMA20", "SMA50", "SMA200"],
+    "EMA_trend": ["EMA12", "EMA26"],
+    "MACD": ["MACD_HIST"],
+    "ADX": ["ADX"],
+    "RSI": ["RSI"],
+    "ATR": ["ATR"],
+    "BOLL": ["BBL", "BBM", "BBU"],
+    "OBV": ["OBV"],
+    "CMF": ["CMF"],
+    "MFI": ["MFI"],
+    "STOCH": ["STOCH_K", "STOCH_D"],
+    "CCI": ["CCI"],
+    "VOL_Z": ["VOL_Z", "RET"],
+}
+# Read by the scoring pipeline whatever the weights: adapt_weights and
+# compute_confidence use ADX, recommend_signal the z-scores, smart_stop the ATR
+PIPELINE_INPUTS = ["ADX", "ATR", "RET_Z", "VOL_Z"]
+
+def required_columns(features=None, weights=None):
+    """
+    Indicator columns needed to compute `features`, or, by default, to score
+    with `weights` (BASE_WEIGHTS if None): every feature with a non-zero weight
+    plus what the rest of the scoring pipeline reads.
+    """
+    if features is None:
+        weights = BASE_WEIGHTS if weights is None else weights
+        features = [k for k, w in weights.items() if w] + ["ADX"]
+        columns = list(PIPELINE_INPUTS)
+    else:
+        columns = []
+    for feature in features:
+        for col in FEATURE_INPUTS.get(feature, []):
+            if col not in columns:
+                columns.append(col)
+    return columns
 
 def normalize_features(df):
     """
     Calculates features (normalized -1 to 1) for the last row of the DataFrame.
     """
-    df_local = df.copy().sort_index()
+    df_local = df if df.index.is_monotonic_increasing else df.sort_index()
     if df_local.empty:
         raise RuntimeError("DataFrame is empty after slicing for analysis.")
 
     last = df_local.iloc[-1]
-    
+
+    # The only whole-series inputs: MACD histogram mean/std and the OBV 20-bar mean
+    macd_hist = df_local["MACD_HIST"].dropna() if "MACD_HIST" in df_local else pd.Series(dtype=float)
+    macd_stats = (len(macd_hist), macd_hist.mean(), macd_hist.std())
+    obv = df_local["OBV"].dropna() if "OBV" in df_local else pd.Series(dtype=float)
+    obv_mean = obv.rolling(20).mean().iloc[-1] if len(obv) > 20 else None
+
+    return features_from_row(last, macd_stats, obv_mean)
+
+
+def features_from_row(last, macd_stats, obv_mean):
+    """
+    Feature math for one bar. `last` is the bar (Series or dict), `macd_stats` is
+    (count, mean, std) of the MACD histogram up to that bar, and `obv_mean` is the
+    20-bar OBV mean (None while fewer than 21 OBV values exist).
+    """
     if pd.isna(last.get("Close", np.nan)):
         raise RuntimeError("CRITICAL: Last bar is missing price data, cannot proceed.")
 
@@ -35,9 +88,9 @@ def normalize_features(df):
     except Exception: features["EMA_trend"] = 0
 
     try:
-        macd_hist = df_local["MACD_HIST"].dropna()
-        if len(macd_hist) > 10:
-            v = (last.get("MACD_HIST", 0) - macd_hist.mean()) / (macd_hist.std() + 1e-9)
+        macd_count, macd_mean, macd_std = macd_stats
+        if macd_count > 10:
+            v = (last.get("MACD_HIST", 0) - macd_mean) / (macd_std + 1e-9)
             features["MACD"] = np.tanh(v)
         else:
             features["MACD"] = 0
@@ -74,10 +127,8 @@ def normalize_features(df):
     except Exception: features["BOLL"] = 0.0
 
     try:
-        obv = df_local["OBV"].dropna()
-        if len(obv) > 20:
-            obv_roll_mean = obv.rolling(20).mean().iloc[-1]
-            features["OBV"] = 1 if last.get("OBV", 0) > obv_roll_mean else -1
+        if obv_mean is not None:
+            features["OBV"] = 1 if last.get("OBV", 0) > obv_mean else -1
         else:
             features["OBV"] = 0
     except Exception: features["OBV"] = 0
@@ -113,4 +164,65 @@ def normalize_features(df):
         features["VOL_Z"] = vol_sign
     except Exception: features["VOL_Z"] = 0
 
-    return features
\ No newline at end of file
+    return features
+
+def _clip_unit(v):
+    # Same result as max(-1, min(1, v)) on Python floats, NaN included (NaN -> 1)
+    v = np.where(v < 1, v, 1.0)
+    return np.where(v > -1, v, -1.0)
+
+
+def features_from_arrays(last, macd_stats, obv_mean):
+    """
+    Vectorized features_from_row: every value in `last` is an array (one entry per
+    ticker or per bar) and the result is a dict of feature arrays. Gives the same
+    numbers as the scalar version element for element, NaN handling included.
+    `macd_stats` is (count, mean, std) arrays; `obv_mean` is NaN where undefined.
+    """
+    get = lambda name: np.asarray(last[name], dtype=np.float64)
+    close = get("Close")
+    features = {}
+
+    s20, s50, s200 = get("SMA20"), get("SMA50"), get("SMA200")
+    up = (s20 > s50) & (s50 > s200)
+    down = (s20 < s50) & (s50 < s200)
+    features["SMA_trend"] = np.where(up, 1, np.where(down, -1, 0))
+
+    e12, e26 = get("EMA12"), get("EMA26")
+    features["EMA_trend"] = np.where(np.isnan(e12) | np.isnan(e26), 0, np.where(e12 > e26, 1, -1))
+
+    macd_count, macd_mean, macd_std = macd_stats
+    with np.errstate(invalid="ignore"):
+        macd_z = (get("MACD_HIST") - macd_mean) / (macd_std + 1e-9)
+    features["MACD"] = np.where(np.asarray(macd_count) > 10, np.tanh(macd_z), 0)
+
+    features["ADX"] = np.tanh((get("ADX") - ADX_TREND_THRESHOLD) / 10.0)
+    features["RSI"] = _clip_unit((get("RSI") - 50) / 50.0)
+
+    atr = get("ATR")
+    with np.errstate(invalid="ignore"):
+        atr_rel = atr / (close + 1e-9)
+    features["ATR"] = np.where((atr > 0) & (close > 0), np.tanh((0.02 - atr_rel) * 50), 0.0)
+
+    bb_mid = get("BBM")
+    bb_width = get("BBU") - get("BBL")
+    bb_width = np.where(bb_width > 1e-9, bb_width, 1e-9)
+    with np.errstate(invalid="ignore"):
+        bb_pos = (close - bb_mid) / bb_width
+    features["BOLL"] = np.where((bb_mid != 0) & (bb_width > 1e-9), np.tanh(-bb_pos), 0.0)
+
+    obv_mean = np.asarray(obv_mean, dtype=np.float64)
+    features["OBV"] = np.where(np.isnan(obv_mean), 0, np.where(get("OBV") > obv_mean, 1, -1))
+
+    features["CMF"] = np.tanh(get("CMF") * 5)
+    features["MFI"] = _clip_unit((get("MFI") - 50) / 50.0)
+
+    k, d = get("STOCH_K"), get("STOCH_D")
+    features["STOCH"] = np.where(np.isnan(k) | np.isnan(d), 0, np.where(k > d, 1, -1))
+
+    features["CCI"] = np.tanh(get("CCI") / 200.0)
+
+    volz, ret = get("VOL_Z"), get("RET")
+    spike = volz > 1.5
+    features["VOL_Z"] = np.where(spike & (ret > 0), 1, np.where(spike & (ret < 0), -1, 0))
+    return features
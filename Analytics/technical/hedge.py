@@ -0,0 +1,180 @@
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import (HEDGE_DEFAULT_DELAY, HEDGE_ENABLED, HEDGE_MIN_DELAY, HEDGE_MIN_SAMPLES, HEDGE_QUANTILE,
+                    UPSTREAM_BACKOFF, UPSTREAM_DEADLINE, UPSTREAM_RETRIES)
+
+logger = logging.getLogger(__name__)
+
+# Absolute time.monotonic() deadline set by Hedger.bounded for the calls made inside it
+_SCOPE_DEADLINE = ContextVar("upstream_deadline", default=None)
+
+
+class UpstreamTimeout(TimeoutError):
+    """No attempt (original or hedge) answered before the call's deadline."""
+
+
+class Hedger:
+    """
+    Tail-latency guard for blocking upstream calls (yfinance downloads,
+    fundamentals fetches).
+
+    call(fn, ...) runs fn on a worker thread. If it has not answered after the
+    `quantile` (p95) latency observed for that kind of call, an identical
+    hedge request is fired and whichever answers first wins; the loser is left
+    to finish in the background. The whole call, retries included, is bounded
+    by a deadline (UpstreamTimeout past it). An attempt that fails outright is
+    retried with exponential backoff and full jitter (a random sleep in
+    [0, backoff * 2**n]). Until `min_samples` latencies have been seen for a
+    kind, hedges fire after `default_delay`.
+    Counters (stats()): calls, hedges, hedge_wins, retries, timeouts, failures;
+    hedges, retries and timeouts are also logged.
+    """
+
+    def __init__(self, enabled=HEDGE_ENABLED, quantile=HEDGE_QUANTILE, default_delay=HEDGE_DEFAULT_DELAY,
+                 min_delay=HEDGE_MIN_DELAY, min_samples=HEDGE_MIN_SAMPLES, deadline=UPSTREAM_DEADLINE,
+                 retries=UPSTREAM_RETRIES, backoff=UPSTREAM_BACKOFF, max_workers=32, window=200):
+        self.enabled = enabled
+        self.quantile = quantile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.window = window
+        self.max_workers = max_workers
+        self._start_pool()
+        self._latencies = {}
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.retried = 0
+        self.timeouts = 0
+        self.failures = 0
+        # A forked worker (process pools) inherits the pool's bookkeeping but not its threads
+        os.register_at_fork(after_in_child=self._start_pool)
+
+    def _start_pool(self):
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="upstream")
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, kind):
+        """Seconds to wait before hedging a `kind` call: its observed p95 latency (or the default)."""
+        with self._lock:
+            samples = sorted(self._latencies.get(kind, ()))
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, samples[min(len(samples) - 1, int(self.quantile * len(samples)))])
+
+    def _timed(self, kind, fn, args, kwargs):
+        # Every successful attempt, winner or not, feeds the latency estimate
+        start = time.monotonic()
+        result = fn(*args, **kwargs)
+        elapsed = time.monotonic() - start
+        with self._lock:
+            self._latencies.setdefault(kind, deque(maxlen=self.window)).append(elapsed)
+        return result
+
+    def _attempt(self, kind, fn, args, kwargs, deadline_at):
+        """One hedged attempt: the result, the first error if every request failed, or UpstreamTimeout."""
+        original = self._pool.submit(self._timed, kind, fn, args, kwargs)
+        pending = {original}
+        if self.enabled:
+            done, _ = wait(pending, timeout=max(0.0, min(self.hedge_delay(kind), deadline_at - time.monotonic())))
+            if not done and time.monotonic() < deadline_at:
+                with self._lock:
+                    self.hedges += 1
+                logger.info("Hedging slow %s call (hedges=%d)", kind, self.hedges)
+                pending.add(self._pool.submit(self._timed, kind, fn, args, kwargs))
+
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline_at - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is not original:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = error or future.exception()
+        if error is not None and not pending:
+            raise error
+        with self._lock:
+            self.timeouts += 1
+        logger.warning("%s call missed its deadline (timeouts=%d)", kind, self.timeouts)
+        raise UpstreamTimeout(f"{kind}: no answer before the deadline")
+
+    @contextmanager
+    def bounded(self, seconds):
+        """
+        Caps the deadline of every call made inside the block (in this thread
+        or task) at `seconds` from now, e.g. a ticker's share of an index run.
+        """
+        deadline_at = time.monotonic() + seconds
+        outer = _SCOPE_DEADLINE.get()
+        token = _SCOPE_DEADLINE.set(deadline_at if outer is None else min(outer, deadline_at))
+        try:
+            yield
+        finally:
+            _SCOPE_DEADLINE.reset(token)
+
+    def call(self, fn, *args, kind=None, deadline=None, **kwargs):
+        """
+        fn(*args, **kwargs) with hedging, retries and a deadline (seconds,
+        default: the Hedger's), never past an enclosing bounded() block.
+        """
+        kind = kind or getattr(fn, "__name__", "call")
+        deadline_at = time.monotonic() + (self.deadline if deadline is None else deadline)
+        scoped = _SCOPE_DEADLINE.get()
+        if scoped is not None:
+            deadline_at = min(deadline_at, scoped)
+        with self._lock:
+            self.calls += 1
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(kind, fn, args, kwargs, deadline_at)
+            except UpstreamTimeout:
+                raise
+            except Exception as e:
+                attempt += 1
+                sleep = random.uniform(0.0, self.backoff * 2 ** (attempt - 1))
+                if attempt > self.retries or time.monotonic() + sleep >= deadline_at:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                with self._lock:
+                    self.retried += 1
+                logger.info("Retrying %s in %.2fs after: %s (retries=%d)", kind, sleep, e, self.retried)
+                time.sleep(sleep)
+
+    def stats(self):
+        with self._lock:
+            delays = {kind: None for kind in self._latencies}
+        for kind in delays:
+            delays[kind] = self.hedge_delay(kind)
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "retries": self.retried,
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+                "hedge_delay": delays,
+            }
+
+
+# One instance for every upstream call in the process, so latency estimates are shared
+HEDGER = Hedger()
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from config import BASE_WEIGHTS
+from features import FEATURE_INPUTS, features_from_arrays
+from scoring import adapt_weights_array, aggregate_score_array, compute_confidence_array
+from signals import recommend_signal_array, signal_codes, smart_stop_array
+
+
+def feature_history(df_computed):
+    """
+    normalize_features for every bar of a compute_indicators frame: each bar
+    only sees the bars up to it (expanding MACD histogram mean/std, trailing
+    20-bar OBV mean). Returns {feature: array over the bars}.
+    """
+    df = df_computed if df_computed.index.is_monotonic_increasing else df_computed.sort_index()
+    if df.empty:
+        raise RuntimeError("DataFrame is empty after slicing for analysis.")
+
+    hist = df["MACD_HIST"].dropna()
+    macd_count = np.array(hist.expanding().count().reindex(df.index).ffill().fillna(0))
+    macd_mean = np.array(hist.expanding().mean().reindex(df.index).ffill())
+    macd_std = np.array(hist.expanding().std().reindex(df.index).ffill())
+    # The last bar uses exactly normalize_features' statistics, so the final
+    # score is bit-identical to the scalar pipeline
+    macd_count[-1], macd_mean[-1], macd_std[-1] = len(hist), hist.mean(), hist.std()
+
+    obv = df["OBV"].dropna()
+    obv_seen = obv.expanding().count()
+    obv_mean = obv.rolling(20).mean().where(obv_seen > 20).reindex(df.index).to_numpy()
+
+    columns = ["Close"] + [c for cols in FEATURE_INPUTS.values() for c in cols]
+    last = {name: df[name].to_numpy(dtype=np.float64) for name in columns}
+    return features_from_arrays(last, (macd_count, macd_mean, macd_std), obv_mean)
+
+
+def score_history(df_computed, weights=None):
+    """
+    The whole scoring pipeline (adapt_weights -> aggregate_score ->
+    compute_confidence -> recommend_signal -> smart_stop) for every bar at once.
+    Returns a DataFrame on the frame's index with score, confidence, signal,
+    signal_code (see signals.SIGNAL_CODES), stop and one weight_<feature>
+    column per adapted weight. The last row matches analyze_stock exactly.
+    """
+    df = df_computed if df_computed.index.is_monotonic_increasing else df_computed.sort_index()
+    features = feature_history(df)
+
+    # Same overrides as analyze_stock: raw z-scores replace the VOL_Z feature
+    ret_z = df["RET_Z"].to_numpy(dtype=np.float64)
+    vol_z = df["VOL_Z"].to_numpy(dtype=np.float64)
+    features["RET_Z"] = ret_z
+    features["VOL_Z"] = vol_z
+
+    adapted = adapt_weights_array(BASE_WEIGHTS if weights is None else weights, features["ADX"])
+    score, breakdown = aggregate_score_array(features, adapted)
+    confidence = compute_confidence_array(breakdown, features["ADX"])
+    signal = recommend_signal_array(score, confidence, ret_z, vol_z)
+    stop = smart_stop_array(df["Close"].to_numpy(dtype=np.float64), df["ATR"].to_numpy(dtype=np.float64), signal)
+
+    out = pd.DataFrame({
+        "score": score,
+        "confidence": confidence,
+        "signal": signal,
+        "signal_code": signal_codes(signal),
+        "stop": stop,
+    }, index=df.index)
+    for k, w in adapted.items():
+        out[f"weight_{k}"] = w
+    return out
@@ -0,0 +1,441 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Canonical output columns, in the order compute_block writes them by default
+ENGINE_COLUMNS = [
+    "SMA20", "SMA50", "SMA200",
+    "EMA12", "EMA26",
+    "MACD", "MACD_SIGNAL", "MACD_HIST",
+    "ADX", "+DI", "-DI", "RSI", "ATR",
+    "BBL", "BBM", "BBU",
+    "OBV", "CMF", "MFI",
+    "STOCH_K", "STOCH_D", "CCI",
+    "RET", "RET_Z", "VOL_Z",
+]
+
+# Largest c**-k the closed-form recurrence is allowed to build inside one block
+_MAX_SCALE_LOG = 100 * np.log(10)
+# Rows per chunk for sliding-window reductions (bounds the temporary window copy)
+_WINDOW_CHUNK = 65536
+
+# Every function below takes 1-D (time,) or 2-D (time, ticker) float arrays and
+# works down axis 0. Leading NaNs (warm-up, late listings) are allowed; values
+# are assumed contiguous after the first valid bar, like a dropna'd DataFrame.
+
+
+def _as2d(x):
+    x = np.asarray(x, dtype=np.float64)
+    return x.reshape(len(x), -1)
+
+
+def _like(out, x):
+    return out.reshape(np.shape(x))
+
+
+def _shift(x2, periods=1):
+    out = np.empty_like(x2)
+    out[:periods] = np.nan
+    out[periods:] = x2[:-periods]
+    return out
+
+
+def _first_valid(x2):
+    """Row of the first non-NaN value per column (len(x2) if none)."""
+    valid = ~np.isnan(x2)
+    first = np.argmax(valid, axis=0)
+    first[~valid.any(axis=0)] = len(x2)
+    return first
+
+
+def _recurrence(u, c):
+    """
+    y[t] = c * y[t-1] + u[t] down axis 0 with y[-1] = 0, for NaN-free `u` and a
+    decay `c` in [0, 1) (scalar or one per column).
+
+    Solved in closed form block by block: inside a block y[t0+k] equals
+    c**k * (c * y[t0-1] + cumsum(u * c**-j)[k]), and blocks are kept short
+    enough that c**-j stays far from overflow.
+    """
+    T, N = u.shape
+    c = np.broadcast_to(np.asarray(c, dtype=np.float64), (N,))
+    y = np.empty_like(u)
+    if T == 0:
+        return y
+    if np.all(c == 0):
+        y[:] = u
+        return y
+
+    log_c = np.log(np.where(c > 0, c, 1.0))
+    block = int(max(1, min(T, _MAX_SCALE_LOG // max(-log_c.min(), 1e-12))))
+    k = np.arange(block, dtype=np.float64)[:, None]
+    powers = np.exp(k * log_c)          # c**k
+    inverse = np.exp(-k * log_c)        # c**-k
+    powers[:, c == 0] = (k == 0)        # c == 0 columns: y == u
+    inverse[:, c == 0] = (k == 0)
+
+    carry = np.zeros(N)
+    for start in range(0, T, block):
+        stop = min(start + block, T)
+        n = stop - start
+        acc = np.cumsum(u[start:stop] * inverse[:n], axis=0)
+        acc += c * carry
+        y[start:stop] = powers[:n] * acc
+        carry = y[stop - 1]
+    return y
+
+
+def _window_reduce(x2, n, reducer):
+    """Apply `reducer` over each full trailing window of length n (NaN before that)."""
+    T = len(x2)
+    out = np.full(x2.shape, np.nan)
+    if T < n:
+        return out
+    for start in range(n - 1, T, _WINDOW_CHUNK):
+        stop = min(start + _WINDOW_CHUNK, T)
+        windows = sliding_window_view(x2[start - n + 1:stop], n, axis=0)
+        out[start:stop] = reducer(windows)
+    return out
+
+
+def _prefix_sums(x2):
+    """
+    Prefix sums and valid counts of each column, centered on the column's first
+    valid value first so long histories do not lose precision. One set serves
+    any number of window lengths (see _window_sums).
+    """
+    valid = ~np.isnan(x2)
+    first = _first_valid(x2)
+    ref = np.where(first < len(x2), x2[np.minimum(first, len(x2) - 1), np.arange(x2.shape[1])], 0.0)
+    centered = np.where(valid, x2 - ref, 0.0)
+
+    csum = np.zeros((len(x2) + 1, x2.shape[1]))
+    np.cumsum(centered, axis=0, out=csum[1:])
+    ccount = np.zeros((len(x2) + 1, x2.shape[1]))
+    np.cumsum(valid, axis=0, out=ccount[1:])
+    return csum, ccount, ref
+
+
+def _window_sums(prefix, n, min_periods=None):
+    """Trailing n-bar sums and valid counts from _prefix_sums output."""
+    csum, ccount, ref = prefix
+    # Row t covers prefix rows (t+1-n, t+1]; rows before n start at prefix row 0 (zero)
+    total = csum[1:].copy()
+    count = ccount[1:].copy()
+    if n < len(total):
+        total[n:] -= csum[1:len(csum) - n]
+        count[n:] -= ccount[1:len(ccount) - n]
+    total += count * ref
+    min_periods = n if min_periods is None else min_periods
+    total[count < min_periods] = np.nan
+    return total, count
+
+
+def _rolling_sum2d(x2, n, min_periods=None):
+    """Trailing n-bar sums and valid counts via prefix sums."""
+    return _window_sums(_prefix_sums(x2), n, min_periods)
+
+
+def rolling_sum(x, n):
+    total, _ = _rolling_sum2d(_as2d(x), n)
+    return _like(total, x)
+
+
+def sma(x, n):
+    """Simple moving average; NaN until a full window of n valid bars."""
+    total, _ = _rolling_sum2d(_as2d(x), n)
+    return _like(total / n, x)
+
+
+def rolling_std(x, n, ddof=0):
+    return _like(_window_reduce(_as2d(x), n, lambda w: w.std(axis=-1, ddof=ddof)), x)
+
+
+def rolling_min(x, n):
+    return _like(_window_reduce(_as2d(x), n, lambda w: w.min(axis=-1)), x)
+
+
+def rolling_max(x, n):
+    return _like(_window_reduce(_as2d(x), n, lambda w: w.max(axis=-1)), x)
+
+
+def rolling_mad(x, n):
+    """Mean absolute deviation around the window mean."""
+    def mad(w):
+        return np.abs(w - w.mean(axis=-1, keepdims=True)).mean(axis=-1)
+    return _like(_window_reduce(_as2d(x), n, mad), x)
+
+
+def ewm_mean(x, alpha, min_periods=0):
+    """
+    pandas ewm(alpha=..., adjust=True).mean(): the weighted average of every bar
+    so far with weights (1-alpha)**age. NaN bars are skipped but still age the
+    older weights, as pandas does with ignore_na=False.
+    """
+    x2 = _as2d(x)
+    valid = ~np.isnan(x2)
+    c = 1.0 - np.asarray(alpha, dtype=np.float64)
+    num = _recurrence(np.where(valid, x2, 0.0), c)
+    den = _recurrence(valid.astype(np.float64), c)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = num / den
+    out[np.cumsum(valid, axis=0) < max(min_periods, 1)] = np.nan
+    return _like(out, x)
+
+
+def rma(x, n):
+    """Wilder's moving average, as pandas_ta.rma: ewm(alpha=1/n, min_periods=n)."""
+    return ewm_mean(x, 1.0 / n, min_periods=n)
+
+
+def ema(x, n):
+    """
+    pandas_ta.ema: seeded with the SMA of the first n valid bars at bar n-1 of the
+    series, then y = (1-a)*y_prev + a*x with a = 2/(n+1) (adjust=False).
+    """
+    x2 = _as2d(x)
+    T, N = x2.shape
+    alpha = 2.0 / (n + 1)
+    first = _first_valid(x2)
+    seed_row = first + n - 1
+    cols = np.arange(N)
+    has_seed = seed_row < T
+
+    csum = np.zeros((T + 1, N))
+    np.cumsum(np.nan_to_num(x2), axis=0, out=csum[1:])
+    seed_idx = np.minimum(seed_row, T - 1) if T else seed_row
+    seed = (csum[np.minimum(seed_row + 1, T), cols] - csum[np.minimum(first, T), cols]) / n
+
+    rows = np.arange(T)[:, None]
+    u = np.where(rows > seed_row, alpha * np.nan_to_num(x2), 0.0)
+    if T:
+        u[seed_idx[has_seed], cols[has_seed]] = seed[has_seed]
+    out = _recurrence(u, 1.0 - alpha)
+    out[rows < seed_row] = np.nan
+    return _like(out, x)
+
+
+def true_range(high, low, close):
+    h, l, c = _as2d(high), _as2d(low), _as2d(close)
+    prev_close = _shift(c)
+    tr = np.fmax(np.fmax(h - l, np.abs(h - prev_close)), np.abs(prev_close - l))
+    tr[0] = np.nan
+    return _like(tr, close)
+
+
+def atr(high, low, close, n=14):
+    return rma(true_range(high, low, close), n)
+
+
+def rsi(close, n=14):
+    c = _as2d(close)
+    diff = c - _shift(c)
+    gain = np.where(diff > 0, diff, 0.0)
+    loss = np.where(diff < 0, diff, 0.0)
+    gain[np.isnan(diff)] = np.nan
+    loss[np.isnan(diff)] = np.nan
+    avg_gain, avg_loss = rma(gain, n), rma(loss, n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _like(100.0 * avg_gain / (avg_gain + np.abs(avg_loss)), close)
+
+
+def macd(close, fast=12, slow=26, signal=9, fast_ema=None, slow_ema=None):
+    """Returns (macd, signal, histogram); pass precomputed EMAs to reuse them."""
+    fast_ema = ema(close, fast) if fast_ema is None else fast_ema
+    slow_ema = ema(close, slow) if slow_ema is None else slow_ema
+    line = fast_ema - slow_ema
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def adx(high, low, close, n=14, atr_values=None):
+    """Returns (adx, +DI, -DI) as in pandas_ta.adx with Wilder smoothing."""
+    h, l = _as2d(high), _as2d(low)
+    atr_values = _as2d(atr(high, low, close, n) if atr_values is None else atr_values)
+    up = h - _shift(h)
+    dn = _shift(l) - l
+    pos = np.where((up > dn) & (up > 0), up, 0.0)
+    neg = np.where((dn > up) & (dn > 0), dn, 0.0)
+    pos[np.isnan(up)] = np.nan
+    neg[np.isnan(dn)] = np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        k = 100.0 / atr_values
+        dmp = k * rma(pos, n)
+        dmn = k * rma(neg, n)
+        dx = 100.0 * np.abs(dmp - dmn) / (dmp + dmn)
+    return _like(rma(dx, n), close), _like(dmp, close), _like(dmn, close)
+
+
+def bbands(close, n=20, std=2.0, mid=None):
+    """Returns (lower, mid, upper) with a population (ddof=0) standard deviation."""
+    mid = sma(close, n) if mid is None else mid
+    dev = rolling_std(close, n, ddof=0)
+    return mid - std * dev, mid, mid + std * dev
+
+
+def obv(close, volume):
+    c, v = _as2d(close), _as2d(volume)
+    sign = np.sign(c - _shift(c))
+    sign[0] = 1.0
+    return _like(np.cumsum(sign * v, axis=0), close)
+
+
+def cmf(high, low, close, volume, n=20):
+    h, l, c, v = _as2d(high), _as2d(low), _as2d(close), _as2d(volume)
+    hl = h - l
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ad = np.where(hl != 0, ((c - l) - (h - c)) / np.where(hl != 0, hl, 1.0), 0.0) * v
+        return _like(rolling_sum(ad, n) / rolling_sum(v, n), close)
+
+
+def hlc3(high, low, close):
+    return (np.asarray(high, dtype=np.float64) + low + close) / 3.0
+
+
+def mfi(high, low, close, volume, n=14, typical=None):
+    tp = _as2d(hlc3(high, low, close) if typical is None else typical)
+    raw_flow = tp * _as2d(volume)
+    diff = tp - _shift(tp)
+    pos = np.where(diff > 0, raw_flow, 0.0)
+    neg = np.where(diff < 0, raw_flow, 0.0)
+    psum, nsum = rolling_sum(pos, n), rolling_sum(neg, n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _like(100.0 * psum / (psum + nsum), close)
+
+
+def stoch(high, low, close, k=14, d=3, smooth_k=3):
+    """Returns (%K, %D) as in pandas_ta.stoch (SMA smoothing)."""
+    lowest = rolling_min(low, k)
+    highest = rolling_max(high, k)
+    spread = highest - lowest
+    spread = np.where(spread == 0, np.finfo(np.float64).eps, spread)
+    raw = 100.0 * (np.asarray(close, dtype=np.float64) - lowest) / spread
+    stoch_k = sma(raw, smooth_k)
+    return stoch_k, sma(stoch_k, d)
+
+
+def cci(high, low, close, n=20, c=0.015, typical=None):
+    tp = hlc3(high, low, close) if typical is None else typical
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (tp - sma(tp, n)) / (c * rolling_mad(tp, n))
+
+
+def pct_return(close):
+    """Bar-over-bar return with the first bar set to 0, like pct_change().fillna(0)."""
+    c = _as2d(close)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ret = c / _shift(c) - 1.0
+    return _like(np.nan_to_num(ret, nan=0.0, posinf=0.0, neginf=0.0), close)
+
+
+def zscore(x, n=60, min_periods=10):
+    """
+    (x - rolling mean) / rolling sample std over up to n bars (at least
+    min_periods), 0 where undefined or the window is flat.
+    """
+    x2 = _as2d(x)
+    z = _zscore_windows(x2, _rolling_sum2d(x2, n, min_periods), _rolling_sum2d(x2 * x2, n, min_periods))
+    return _like(z, x)
+
+
+def _zscore_windows(x2, window, sq_window):
+    """zscore from the (sum, count) windows of x and of x*x."""
+    total, count = window
+    sq_total, _ = sq_window
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        var = (sq_total - total * mean) / (count - 1)
+        # Flat windows come out as tiny rounding noise; treat them as zero spread
+        var[var <= 1e-12 * sq_total / count] = np.nan
+        z = (x2 - mean) / np.sqrt(var)
+    return np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+# --- Indicator graph ---
+# name -> (inputs, function). Inputs are raw OHLCV fields or other nodes; tuple
+# results (MACD, DMI, BBANDS, STOCH) are split into their columns by the nodes
+# below them. Shared intermediates (EMAs feed MACD, ATR feeds ADX, SMA20 is the
+# Bollinger mid, the typical price feeds MFI and CCI) are separate nodes, so
+# they are computed once however many columns use them.
+GRAPH = {
+    "SMA20": (["Close"], lambda c: sma(c, 20)),
+    "SMA50": (["Close"], lambda c: sma(c, 50)),
+    "SMA200": (["Close"], lambda c: sma(c, 200)),
+    "EMA12": (["Close"], lambda c: ema(c, 12)),
+    "EMA26": (["Close"], lambda c: ema(c, 26)),
+    "_MACD": (["Close", "EMA12", "EMA26"], lambda c, f, s: macd(c, fast_ema=f, slow_ema=s)),
+    "MACD": (["_MACD"], lambda m: m[0]),
+    "MACD_SIGNAL": (["_MACD"], lambda m: m[1]),
+    "MACD_HIST": (["_MACD"], lambda m: m[2]),
+    "ATR": (["High", "Low", "Close"], lambda h, l, c: atr(h, l, c, 14)),
+    "_DMI": (["High", "Low", "Close", "ATR"], lambda h, l, c, a: adx(h, l, c, 14, atr_values=a)),
+    "ADX": (["_DMI"], lambda d: d[0]),
+    "+DI": (["_DMI"], lambda d: d[1]),
+    "-DI": (["_DMI"], lambda d: d[2]),
+    "RSI": (["Close"], lambda c: rsi(c, 14)),
+    "_BBANDS": (["Close", "SMA20"], lambda c, m: bbands(c, 20, 2.0, mid=m)),
+    "BBL": (["_BBANDS"], lambda b: b[0]),
+    "BBM": (["_BBANDS"], lambda b: b[1]),
+    "BBU": (["_BBANDS"], lambda b: b[2]),
+    "OBV": (["Close", "Volume"], obv),
+    "CMF": (["High", "Low", "Close", "Volume"], lambda h, l, c, v: cmf(h, l, c, v, 20)),
+    "_TYPICAL": (["High", "Low", "Close"], hlc3),
+    "MFI": (["High", "Low", "Close", "Volume", "_TYPICAL"],
+            lambda h, l, c, v, t: mfi(h, l, c, v, 14, typical=t)),
+    "_STOCH": (["High", "Low", "Close"], stoch),
+    "STOCH_K": (["_STOCH"], lambda st: st[0]),
+    "STOCH_D": (["_STOCH"], lambda st: st[1]),
+    "CCI": (["High", "Low", "Close", "_TYPICAL"], lambda h, l, c, t: cci(h, l, c, 20, typical=t)),
+    "RET": (["Close"], pct_return),
+    "RET_Z": (["RET"], lambda r: zscore(r, 60, 10)),
+    "VOL_Z": (["Volume"], lambda v: zscore(v, 60, 10)),
+}
+
+
+def dependencies(columns):
+    """Every graph node needed for `columns` (themselves included), in evaluation order."""
+    order, seen = [], set()
+
+    def visit(name):
+        if name in seen or name not in GRAPH:
+            return
+        seen.add(name)
+        for dep in GRAPH[name][0]:
+            visit(dep)
+        order.append(name)
+
+    for name in columns:
+        if name not in GRAPH:
+            raise KeyError(f"Unknown indicator: {name}")
+        visit(name)
+    return order
+
+
+def evaluate(columns, inputs):
+    """
+    Lazily evaluates the graph: only the nodes reachable from `columns` run,
+    each once. `inputs` maps OHLCV field names to arrays. Returns {column: array}.
+    """
+    values = dict(inputs)
+    for name in dependencies(columns):
+        deps, fn = GRAPH[name]
+        values[name] = fn(*(values[d] for d in deps))
+    return {name: values[name] for name in columns}
+
+
+def compute_block(high, low, close, volume, out=None, columns=None):
+    """
+    Compute the requested indicators (default: all of ENGINE_COLUMNS, in that
+    order) into one (len(columns), *close.shape) float64 block.
+    """
+    columns = ENGINE_COLUMNS if columns is None else list(columns)
+    inputs = {
+        "High": np.asarray(high, dtype=np.float64),
+        "Low": np.asarray(low, dtype=np.float64),
+        "Close": np.asarray(close, dtype=np.float64),
+        "Volume": np.asarray(volume, dtype=np.float64),
+    }
+    if out is None:
+        out = np.empty((len(columns),) + inputs["Close"].shape, dtype=np.float64)
+    for i, values in enumerate(evaluate(columns, inputs).values()):
+        out[i] = values
+    return out
@@ -0,0 +1,113 @@
+import math
+import datetime as dt
+
+from config import (INTRADAY_MAX_DAYS, LOOKBACK_TOLERANCE, MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE, MARKET_OPEN_HOUR,
+                    MARKET_OPEN_MINUTE, MARKET_TIMEZONE)
+from features import required_columns
+from store import period_start
+from tail import _decay_bars, min_lookback
+from trading_calendar import NSE
+from utils import interval_minutes
+
+SESSION_MINUTES = (MARKET_CLOSE_HOUR * 60 + MARKET_CLOSE_MINUTE) - (MARKET_OPEN_HOUR * 60 + MARKET_OPEN_MINUTE)
+
+# Periods Yahoo serves daily and longer bars for, shortest first
+DAILY_PERIODS = ["1mo", "3mo", "6mo", "1y", "2y", "5y", "10y"]
+# Calendar days one bar of a longer-than-daily interval spans
+CALENDAR_DAYS_PER_BAR = {"5d": 7, "1wk": 7, "1mo": 31, "3mo": 92}
+
+# Columns computed together with (and as far back as) a min_lookback entry
+LOOKBACK_GROUPS = {
+    "BBL": "BBANDS", "BBM": "BBANDS", "BBU": "BBANDS",
+    "STOCH_K": "STOCH", "STOCH_D": "STOCH",
+    "+DI": "ADX", "-DI": "ADX",
+}
+
+
+def indicator_bars(tolerance=LOOKBACK_TOLERANCE):
+    """
+    Bars each indicator column needs before its last value is within
+    `tolerance` of what an unbounded history gives: tail.min_lookback for the
+    windowed and Wilder-smoothed ones, plus the EMA/MACD warm-ups (seed window,
+    then the decay of the seed's error; the MACD signal smooths a MACD that is
+    itself still converging).
+    """
+    bars = min_lookback(tolerance)
+    bars["EMA12"] = 12 + _decay_bars(2.0 / 13, tolerance)
+    bars["EMA26"] = bars["MACD"] = 26 + _decay_bars(2.0 / 27, tolerance)
+    bars["MACD_SIGNAL"] = bars["MACD_HIST"] = bars["EMA26"] + 9 + _decay_bars(2.0 / 10, tolerance, stacked=True)
+    bars["RET"] = 2
+    return bars
+
+
+def required_bars(columns=None, tolerance=LOOKBACK_TOLERANCE):
+    """Bars the scoring pipeline needs for `columns` (default: what BASE_WEIGHTS scores)."""
+    columns = required_columns() if columns is None else columns
+    bars = indicator_bars(tolerance)
+    return max([1] + [bars[LOOKBACK_GROUPS.get(c, c)] for c in columns])
+
+
+def plan_period(interval, bars, now=None, per_session=None):
+    """
+    Smallest period whose `interval` bars hold at least `bars` bars.
+
+    Intraday: enough whole sessions at `per_session` bars each (a full session
+    by default), plus today's, which may have barely started, as a '<n>d'
+    period of n trading sessions, the way Yahoo reads it (store.period_start
+    and yf_provider resolve it with the NSE calendar). Daily and longer: the
+    shortest of DAILY_PERIODS reaching back to the first of the bars, else 'max'.
+    """
+    now = (now or dt.datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+    minutes = interval_minutes(interval)
+    if minutes is not None:
+        per_session = per_session or math.ceil(SESSION_MINUTES / minutes)
+        return f"{math.ceil(bars / per_session) + 1}d"
+
+    if interval == "1d":
+        first = NSE.sessions_back(bars, now)
+        days = (now.date() - first).days
+        if first == NSE.dates[0]:
+            # More sessions than the calendar table holds: estimate at ~245 sessions a year
+            days = max(days, math.ceil(bars * 365 / 245))
+    else:
+        days = math.ceil(bars * CALENDAR_DAYS_PER_BAR.get(interval, 1))
+    today = period_start("0d")
+    for period in DAILY_PERIODS:
+        if (today - period_start(period)).days >= days:
+            return period
+    return "max"
+
+
+def extension(interval, period, df, bars):
+    """
+    (interval, period) to download once for a frame that came back shorter
+    than `bars`, or None when no download can help.
+
+    Intraday frames are widened at the bar density they actually have (thin
+    trading leaves fewer bars per session); when that reaches more calendar days
+    back than Yahoo keeps the interval (INTRADAY_MAX_DAYS) the ticker moves to the
+    daily plan instead. A daily-or-longer frame planned for `bars` that is
+    still short simply has no older history (a recent listing).
+    """
+    if df.empty or len(df) >= bars:
+        return None
+    minutes = interval_minutes(interval)
+    if minutes is None:
+        return None
+
+    sessions = max(1, df.index.normalize().nunique())
+    wider = plan_period(interval, bars, per_session=max(1, len(df) // sessions))
+    first = period_start(wider, interval=interval)
+    if (period_start("0d") - first).days > INTRADAY_MAX_DAYS.get(interval, 60):
+        return "1d", plan_period("1d", bars)
+    start = period_start(period, interval=interval)
+    if start is not None and first >= start:
+        return None
+    return interval, wider
+
+
+if __name__ == "__main__":
+    bars = required_bars()
+    print(f"scoring needs {bars} bars (tolerance {LOOKBACK_TOLERANCE:g})")
+    for interval, old in (("1m", "7d"), ("5m", "60d"), ("15m", "60d"), ("1h", "730d"), ("1d", "1y"), ("1wk", "5y")):
+        print(f"{interval:<4} {old:>5} -> {plan_period(interval, bars)}")
@@ -6,30 +6,34 @@ import pandas as pd
 
 # Import all our custom modules (with NO dots)
 from config import NIFTY_50_TICKERS, NIFTY_NEXT_50_TICKERS, SENSEX_30_TICKERS, BASE_WEIGHTS, NIFTY_100_TICKERS
-from utils import is_market_open, prepare_chart_data
-from data_fetch import pull_history
-from indicators import compute_indicators
-from features import normalize_features
-from scoring import adapt_weights, aggregate_score, compute_confidence
-from signals import recommend_signal, smart_stop, interpret_score
-
-def analyze_stock(ticker, print_results=True):
+from utils import prepare_chart_data
+from data_fetch import pull_history_batch
+from signals import interpret_score
+from panel import score_panel
+from evaluation import analysis_frame, evaluate_frame, select_data_mode, summarize
+from parallel import run_index
+from pipeline import scan_index
+from planner import IndexPlanner
+from context import DataContext
+
+def analyze_stock(ticker, print_results=True, df=None, mode=None, tail_only=False, weights=None, context=None):
     """
     Runs the full analysis for a single stock ticker.
     - PRINTS the results if print_results=True.
     - RETURNS the key analysis data for aggregation.
+    - Uses `df` instead of downloading when the caller already fetched it
+      (with `mode` from select_data_mode() describing that data).
+    - tail_only=True computes just what the last bar's score needs
+      (see tail.evaluate_tail for the accuracy bound).
+    - `weights` replaces BASE_WEIGHTS; only the indicators its non-zero
+      features need are computed.
+    - Scoring and chart data are resolved through one DataContext (`context`,
+      or a fresh one), so each dataset is downloaded at most once and the
+      chart's 5m/1y series reuse the scoring fetch where they can.
     """
     try:
         # --- 1. Get Data for Scoring ---
-        is_open = is_market_open()
-        if is_open:
-            interval = '1m'
-            period = '7d'
-            data_mode = "REAL-TIME (1m)"
-        else:
-            interval = '1d'
-            period = '1y' 
-            data_mode = "HISTORICAL (1d)"
+        is_open, interval, period, data_mode = mode or select_data_mode()
             
         if print_results:
             print(f"\n--- Analyzing {ticker} ({data_mode}) ---")
@@ -37,29 +41,16 @@ def analyze_stock(ticker, print_results=True):
             # Print a compact version for index analysis
             print(f"  > Analyzing {ticker}...", end='', flush=True)
 
-        df = pull_history(ticker, interval, period)
-
-        df_to_analyze = df.copy()
-        if not is_open and interval != '1d' and len(df_to_analyze) >= 2:
-            df_to_analyze = df_to_analyze.iloc[:-1]
-        
-        if df_to_analyze.empty:
-            if print_results: print("No data to analyze.")
-            return {"error": "No data to analyze."}
+        context = context or DataContext()
+        if df is None:
+            df = context.get(ticker, interval, period)
+        else:
+            context.put(ticker, interval, period, df)
 
         # --- 2. Compute Score ---
-        df_computed = compute_indicators(df_to_analyze)
-        features = normalize_features(df_computed)
-        latest_row = df_computed.iloc[-1]
-        
-        features["RET_Z"] = latest_row.get("RET_Z", 0)
-        features["VOL_Z"] = latest_row.get("VOL_Z", 0)
-
-        weights = adapt_weights(BASE_WEIGHTS.copy(), features, df_computed)
-        final_score, breakdown = aggregate_score(features, weights)
-        confidence = compute_confidence(breakdown, features)
-        signal = recommend_signal(final_score, confidence, latest_row, breakdown)
-        stop_price = smart_stop(latest_row, signal)
+        result = evaluate_frame(df, (is_open, interval, period, data_mode), tail_only=tail_only, weights=weights)
+        final_score, signal = result["score"], result["signal"]
+        confidence, stop_price, latest_row = result["confidence"], result["stop"], result["latest"]
 
         # --- 3. Print All Results (if specified) ---
         if print_results:
@@ -93,13 +84,13 @@ def analyze_stock(ticker, print_results=True):
             print(f"\n📈 Preparing chart data for {ticker}...")
             
             try:
-                df_chart_1d = pull_history(ticker, interval='5m', period='1d')
+                df_chart_1d = context.get(ticker, '5m', '1d', min_bars=0)
             except Exception as e:
                 print(f"Could not fetch 1-Day chart data: {e}")
                 df_chart_1d = pd.DataFrame() 
 
             try:
-                df_chart_1y = pull_history(ticker, interval='1d', period='1y')
+                df_chart_1y = context.get(ticker, '1d', '1y', min_bars=0)
             except Exception as e:
                 print(f"Could not fetch 1-Year chart data: {e}")
                 df_chart_1y = pd.DataFrame()
@@ -132,45 +123,54 @@ def analyze_stock(ticker, print_results=True):
             print(f" Error: {e}")
         return {"error": str(e)}
 
-def analyze_index(ticker_list: list):
+def analyze_index(ticker_list: list, batched=False, parallel=False, pipelined=False):
     """
     Analyzes all stocks in a given list and returns an aggregated score.
+    With batched=True the whole list is scored as one (time x ticker) panel
+    instead of one analyze_stock call per ticker; with parallel=True each
+    ticker is fetched and scored in a worker pool with a per-ticker timeout
+    (see parallel.run_index); with pipelined=True downloads and
+    scoring overlap (see pipeline.scan). The summary is the same either way,
+    to float rounding.
     """
-    valid_stocks = 0
-    total_score = 0
-    signal_counts = { "BUY": 0, "HOLD": 0, "TIGHTEN_STOP": 0, "EXIT": 0, "VIGILANCE_HIGH_VOL": 0, "EXIT_ANOMALY": 0 }
     total_stocks_in_list = len(ticker_list)
-    
-    for i, ticker in enumerate(ticker_list):
-        print(f"\nAnalyzing {i+1}/{total_stocks_in_list}: ", end='', flush=True)
-        
-        # Call analyze_stock, but tell it NOT to print the full report
-        analysis = analyze_stock(ticker, print_results=False) 
+    mode = select_data_mode()
+
+    if parallel or pipelined:
+        if pipelined:
+            summary, records, _ = scan_index(ticker_list, mode=mode)
+        else:
+            summary, records = run_index(ticker_list, mode=mode)
+        for record in records:
+            if "error" in record:
+                print(f"  > {record['ticker']}: {record['status']}: {record['error']}")
+        return summary
+
+    # Fetch the whole list up front: one upstream call per batch, not per ticker
+    _, interval, period, _ = mode
+    frames, fetch_errors = pull_history_batch(ticker_list, interval, period)
+
+    records = []
+    if batched:
+        for ticker, error in fetch_errors.items():
+            print(f"  > {ticker}: Error: {error}")
+        scored = score_panel({t: analysis_frame(df, mode) for t, df in frames.items()}) if frames else None
+        if scored is not None:
+            records = [{"score": score, "signal": signal}
+                       for score, signal in zip(scored["score"].tolist(), scored["signal"])]
+    else:
+        for i, ticker in enumerate(ticker_list):
+            print(f"\nAnalyzing {i+1}/{total_stocks_in_list}: ", end='', flush=True)
+
+            if ticker in fetch_errors:
+                print(f"  > Analyzing {ticker}... Error: {fetch_errors[ticker]}", end='')
+                continue
         
-        if "error" not in analysis:
-            total_score += analysis.get('score', 50)
-            signal = analysis.get('signal', 'HOLD')
-            if signal in signal_counts:
-                signal_counts[signal] += 1
-            else:
-                signal_counts[signal] = 1 # Should not happen, but safe
-            valid_stocks += 1
-        # Error is already printed by analyze_stock
-
-    if valid_stocks == 0:
-        return {"error": "Could not analyze any stocks in the index."}
-
-    average_score = total_score / valid_stocks
-    overall_interpretation = interpret_score(average_score)
-    
-    # Return the final summary
-    return {
-        "total_stocks_in_list": total_stocks_in_list,
-        "total_stocks_analyzed": valid_stocks,
-        "average_score": average_score,
-        "overall_interpretation": overall_interpretation,
-        "signal_distribution": signal_counts
-    }
+            # Call analyze_stock, but tell it NOT to print the full report
+            # (errors are already printed by analyze_stock)
+            records.append(analyze_stock(ticker, print_results=False, df=frames.get(ticker), mode=mode))
+
+    return summarize(records, total_stocks_in_list)
 
 def print_index_summary(summary, name):
     """Prints a clean summary for the index analysis."""
@@ -198,20 +198,19 @@ if __name__ == "__main__":
     print("   RUNNING DEFAULT INDEX ANALYSIS (NIFTY 50/100, SENSEX)")
     print("="*50)
 
-    # Run NIFTY 50
-    print("\nAnalyzing NIFTY 50... This will take a moment.")
-    n50_summary = analyze_index(NIFTY_50_TICKERS)
-    print_index_summary(n50_summary, "NIFTY 50")
-
-    # Run NIFTY 100
-    print("\nAnalyzing NIFTY 100... This will take several minutes.")
-    n100_summary = analyze_index(NIFTY_100_TICKERS)
-    print_index_summary(n100_summary, "NIFTY 100")
-
-    # Run SENSEX 30
-    print("\nAnalyzing SENSEX 30... This will take a moment.")
-    sensex_summary = analyze_index(SENSEX_30_TICKERS)
-    print_index_summary(sensex_summary, "SENSEX 30")
+    # One shared universe: NIFTY 100 only adds NIFTY 50's missing members,
+    # SENSEX 30 only its own (or none with MAP_BSE_TO_NSE)
+    planner = IndexPlanner()
+    planner.add_index("NIFTY 50", NIFTY_50_TICKERS)
+    planner.add_index("NIFTY 100", NIFTY_100_TICKERS)
+    planner.add_index("SENSEX 30", SENSEX_30_TICKERS)
+    print(f"\nAnalyzing {len(planner.universe())} unique tickers... This will take a moment.")
+    summaries = planner.run()
+    for record in planner.records.values():
+        if "error" in record:
+            print(f"  > {record['ticker']}: Error: {record['error']}")
+    for name, summary in summaries.items():
+        print_index_summary(summary, name)
 
     print("\n" + "="*50)
     print("           DEFAULT ANALYSIS COMPLETE")
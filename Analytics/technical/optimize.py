@@ -0,0 +1,350 @@
+# Weight-profile / regime-threshold optimizer for the technical score.
+# Run from this folder:  python optimize.py [random|grid|coordinate]
+#
+# Candidates are scored on a cached feature matrix (every bar after warm-up of
+# every ticker), so a candidate only costs the weighted sum, not the indicators.
+# The objective is the correlation between the score and the forward return
+# OPTIMIZER_HORIZON bars later, pooled over tickers and bars.
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from config import (ADX_TREND_THRESHOLD, BASE_WEIGHTS, MIN_HISTORY_BARS, NIFTY_100_TICKERS,
+                    OPTIMIZER_DIR, OPTIMIZER_HORIZON, TREND_BOOST, TREND_REGIME_THRESHOLD)
+from data_fetch import pull_history_batch
+from indicators import compute_indicators
+from history import feature_history
+
+WEIGHT_NAMES = list(BASE_WEIGHTS)
+# Non-weight parameters and the range random search / coordinate descent keep them in
+THRESHOLDS = {
+    "ADX_TREND_THRESHOLD": (ADX_TREND_THRESHOLD, (10.0, 40.0)),
+    "TREND_REGIME_THRESHOLD": (TREND_REGIME_THRESHOLD, (0.0, 0.9)),
+    "TREND_BOOST": (TREND_BOOST, (0.0, 2.0)),
+}
+# adapt_weights groups (see scoring.adapt_weights)
+_TREND_KEYS = ["SMA_trend", "EMA_trend", "MACD"]
+
+_MATRIX = None  # the feature matrix inside pool workers
+
+logger = logging.getLogger(__name__)
+
+
+def current_params():
+    """The shipped configuration as an optimizer candidate."""
+    params = dict(BASE_WEIGHTS)
+    params.update({name: default for name, (default, _) in THRESHOLDS.items()})
+    return params
+
+
+# --- Feature matrix ---
+
+def build_feature_matrix(frames, horizon=OPTIMIZER_HORIZON, warmup=MIN_HISTORY_BARS):
+    """
+    Stacks the per-bar features of every frame (bars after `warmup` that have
+    a forward return) into a (len(WEIGHT_NAMES), M) matrix. NaN features are
+    stored as 0, as aggregate_score treats them. The ADX feature depends on
+    ADX_TREND_THRESHOLD, so the raw ADX is kept and the feature rebuilt per
+    candidate; VOL_Z holds the raw z-score, as in analyze_stock.
+    """
+    features, adx, forward = [], [], []
+    for df in frames.values():
+        if len(df) <= warmup + horizon:
+            continue
+        computed = compute_indicators(df)
+        feats = feature_history(computed)
+        feats["VOL_Z"] = computed["VOL_Z"].to_numpy(dtype=np.float64)
+        close = computed["Close"].to_numpy(dtype=np.float64)
+        fwd = np.full(len(close), np.nan)
+        fwd[:-horizon] = close[horizon:] / close[:-horizon] - 1.0
+
+        rows = np.arange(len(close)) >= warmup
+        rows &= np.isfinite(fwd)
+        features.append(np.vstack([np.asarray(feats[k], dtype=np.float64)[rows] for k in WEIGHT_NAMES]))
+        adx.append(computed["ADX"].to_numpy(dtype=np.float64)[rows])
+        forward.append(fwd[rows])
+
+    if not features:
+        raise RuntimeError("No ticker has enough history for the optimizer.")
+    return {
+        "features": np.nan_to_num(np.hstack(features), nan=0.0, posinf=0.0, neginf=0.0),
+        "adx": np.hstack(adx),
+        "forward": np.hstack(forward),
+    }
+
+
+def save_feature_matrix(matrix, path):
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, **matrix)
+    os.replace(tmp, path)
+
+
+def load_feature_matrix(path):
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+
+def matrix_digest(matrix):
+    """SHA-256 of a feature matrix's arrays (names, dtypes, shapes and values), not of the file holding it."""
+    digest = hashlib.sha256()
+    for name in sorted(matrix):
+        array = np.ascontiguousarray(matrix[name])
+        digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+# --- Vectorized evaluator ---
+
+def candidate_score(matrix, params):
+    """
+    The raw weighted score (aggregate_score's s, in [-1, 1]) of every bar in the
+    matrix under `params`, with adapt_weights' regime adjustment applied.
+    Only the weighted sums are recomputed; the indicators are not touched.
+    """
+    F = matrix["features"]
+    with np.errstate(invalid="ignore"):
+        adx_feature = np.tanh((matrix["adx"] - params["ADX_TREND_THRESHOLD"]) / 10.0)
+    adx_feature = np.nan_to_num(adx_feature)
+    regime = params["TREND_REGIME_THRESHOLD"]
+
+    trend_boost = np.where(adx_feature > 0, adx_feature, 0.0)
+    trending = trend_boost > regime
+    factors = {
+        "trend": np.where(trending, 1.0 + params["TREND_BOOST"] * trend_boost, 1.0),
+        "BOLL": np.where(trending, np.maximum(0.4, 1.0 - 0.8 * trend_boost), 1.0 + 0.8 * (regime - trend_boost)),
+        "RSI": np.where(trending, 1.0, 1.0 + 0.3 * (regime - trend_boost)),
+    }
+
+    numerator = np.zeros(F.shape[1])
+    denominator = np.zeros(F.shape[1])
+    for i, name in enumerate(WEIGHT_NAMES):
+        w = params[name]
+        if not w:
+            continue
+        values = adx_feature if name == "ADX" else F[i]
+        factor = factors["trend"] if name in _TREND_KEYS else factors.get(name, 1.0)
+        numerator += (w * factor) * values
+        denominator += w * factor
+    return numerator / np.where(denominator > 1e-9, denominator, 1.0)
+
+
+def objective(matrix, params):
+    """Correlation of the candidate's score with the forward return (higher is better)."""
+    score = candidate_score(matrix, params)
+    forward = matrix["forward"]
+    s, f = score - score.mean(), forward - forward.mean()
+    denom = np.sqrt((s * s).sum() * (f * f).sum())
+    return float((s * f).sum() / denom) if denom > 0 else 0.0
+
+
+def _init_worker(path):
+    global _MATRIX
+    _MATRIX = load_feature_matrix(path)
+
+
+def _evaluate(params):
+    return objective(_MATRIX, params)
+
+
+# --- Candidate generation ---
+
+def _key(params):
+    return json.dumps({k: round(float(v), 10) for k, v in sorted(params.items())})
+
+
+def _clip(name, value):
+    if name in THRESHOLDS:
+        low, high = THRESHOLDS[name][1]
+        return min(max(value, low), high)
+    return max(value, 0.0)
+
+
+def grid_candidates(grid, base=None):
+    """Every combination of `grid` ({param: [values]}); other params stay at `base`."""
+    base = base or current_params()
+    names = list(grid)
+    for values in itertools.product(*(grid[n] for n in names)):
+        params = dict(base)
+        params.update(zip(names, values))
+        yield params
+
+
+def random_candidates(n, seed=0, base=None, spread=0.5):
+    """
+    `n` candidates: weights are `base` scaled by log-normal noise (sigma
+    `spread`), thresholds uniform over their THRESHOLDS range. Deterministic
+    for a seed, so a resumed run regenerates the same sequence.
+    """
+    base = base or current_params()
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        params = {k: base[k] * float(np.exp(rng.normal(0.0, spread))) for k in WEIGHT_NAMES}
+        for name, (_, (low, high)) in THRESHOLDS.items():
+            params[name] = float(rng.uniform(low, high))
+        yield params
+
+
+class Optimizer:
+    """
+    Evaluates candidates in a process pool (processes=1: in-process) against a
+    saved feature matrix. Every result is memoised and, with a `checkpoint`
+    path, written to disk after each batch, so an interrupted run resumes by
+    re-running the same call: already-evaluated candidates are skipped. The
+    checkpoint records the matrix's digest (see matrix_digest); results
+    scored on another matrix (a rebuild with a new horizon, tickers or dates)
+    are discarded, not resumed.
+    """
+
+    def __init__(self, matrix_path, checkpoint=None, processes=None, batch_size=64):
+        self.matrix_path = matrix_path
+        self.checkpoint = checkpoint
+        self.processes = processes
+        self.batch_size = batch_size
+        self.matrix_digest = matrix_digest(load_feature_matrix(matrix_path))
+        self.results = {}
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                saved = json.load(f)
+            if saved.get("matrix") == self.matrix_digest:
+                self.results = saved["results"]
+            else:
+                logger.warning("Ignoring %s: its %d results were scored on a different feature matrix",
+                               checkpoint, len(saved.get("results", {})))
+        self._pool = None
+        self._matrix = None
+
+    def __enter__(self):
+        if self.processes != 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                             initargs=(self.matrix_path,))
+        else:
+            self._matrix = load_feature_matrix(self.matrix_path)
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def evaluate(self, candidates):
+        """Objective for each candidate (a list, in order), evaluating only the new ones."""
+        candidates = list(candidates)
+        pending = list({_key(p): p for p in candidates if _key(p) not in self.results}.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            params = [p for _, p in batch]
+            if self._pool is not None:
+                chunk = max(1, len(params) // (4 * (self.processes or os.cpu_count())))
+                scores = list(self._pool.map(_evaluate, params, chunksize=chunk))
+            else:
+                scores = [objective(self._matrix, p) for p in params]
+            self.results.update({key: score for (key, _), score in zip(batch, scores)})
+            self._save()
+        return [self.results[_key(p)] for p in candidates]
+
+    def best(self, candidates=None):
+        """(params, objective) of the best of `candidates`, or of everything evaluated so far."""
+        if candidates is None:
+            key = max(self.results, key=self.results.get)
+            return json.loads(key), self.results[key]
+        candidates = list(candidates)
+        scores = self.evaluate(candidates)
+        i = int(np.argmax(scores))
+        return candidates[i], scores[i]
+
+    def _save(self):
+        if not self.checkpoint:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.checkpoint)), exist_ok=True)
+        tmp = self.checkpoint + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"matrix": self.matrix_digest, "results": self.results}, f)
+        os.replace(tmp, self.checkpoint)
+
+    # --- Search strategies ---
+
+    def grid_search(self, grid, base=None):
+        return self.best(grid_candidates(grid, base))
+
+    def random_search(self, n=256, seed=0, base=None, spread=0.5):
+        return self.best([base or current_params()] + list(random_candidates(n, seed, base, spread)))
+
+    def coordinate_descent(self, base=None, step=0.5, rounds=6, min_step=0.05, passes=10):
+        """
+        From `base`, each pass tries every single-parameter move (weights scaled
+        by 1 +/- step, thresholds moved by step * their range) in parallel and
+        keeps the best improving one; the step halves when nothing improves
+        (or after `passes` passes).
+        """
+        current = dict(base or current_params())
+        score = self.evaluate([current])[0]
+        for _ in range(rounds):
+            for _ in range(passes):
+                moves = []
+                for name in current:
+                    for sign in (-1.0, 1.0):
+                        move = dict(current)
+                        if name in THRESHOLDS:
+                            low, high = THRESHOLDS[name][1]
+                            move[name] = _clip(name, current[name] + sign * step * (high - low))
+                        else:
+                            move[name] = _clip(name, current[name] * (1.0 + sign * step))
+                        moves.append(move)
+                scores = self.evaluate(moves)
+                i = int(np.argmax(scores))
+                if scores[i] <= score:
+                    break
+                current, score = moves[i], scores[i]
+            step /= 2.0
+            if step < min_step:
+                break
+        return current, score
+
+
+def normalized(params):
+    """`params` with the weights rescaled to sum to 1, as config.BASE_WEIGHTS."""
+    total = sum(params[k] for k in WEIGHT_NAMES)
+    out = dict(params)
+    if total > 0:
+        out.update({k: params[k] / total for k in WEIGHT_NAMES})
+    return out
+
+
+if __name__ == "__main__":
+    method = sys.argv[1] if len(sys.argv) > 1 else "random"
+    os.makedirs(OPTIMIZER_DIR, exist_ok=True)
+    matrix_path = os.path.join(OPTIMIZER_DIR, "nifty100_1d_5y.npz")
+    checkpoint = os.path.join(OPTIMIZER_DIR, f"nifty100_{method}.json")
+
+    if not os.path.exists(matrix_path):
+        print("Building feature matrix (NIFTY 100, 5y daily)...")
+        frames, errors = pull_history_batch(NIFTY_100_TICKERS, "1d", "5y")
+        save_feature_matrix(build_feature_matrix(frames), matrix_path)
+
+    start = time.perf_counter()
+    with Optimizer(matrix_path, checkpoint=checkpoint) as opt:
+        baseline = opt.evaluate([current_params()])[0]
+        if method == "grid":
+            best, score = opt.grid_search({
+                "ADX_TREND_THRESHOLD": [15.0, 20.0, 25.0, 30.0],
+                "TREND_REGIME_THRESHOLD": [0.1, 0.3, 0.5],
+                "TREND_BOOST": [0.0, 0.5, 1.0],
+            })
+        elif method == "coordinate":
+            best, score = opt.coordinate_descent()
+        else:
+            best, score = opt.random_search()
+
+    print(f"\nEvaluated {len(opt.results)} candidates in {time.perf_counter() - start:.1f}s")
+    print(f"Objective (score vs {OPTIMIZER_HORIZON}-bar forward return correlation): "
+          f"current {baseline:+.4f}, best {score:+.4f}")
+    for name, value in normalized(best).items():
+        print(f"  {name:<24} {value:.4f}")
@@ -0,0 +1,131 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+from config import BASE_WEIGHTS
+from indicator_engine import ENGINE_COLUMNS, compute_block
+from features import features_from_arrays
+from scoring import adapt_weights_array, aggregate_score_array, compute_confidence_array
+from signals import recommend_signal_array, smart_stop_array
+
+PANEL_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+_COL = {name: i for i, name in enumerate(ENGINE_COLUMNS)}
+
+
+def build_panel(frames):
+    """
+    Aligns {ticker: OHLCV DataFrame} on the union of their timestamps.
+    Returns a dict with "index", "tickers", one (T, N) float64 array per
+    OHLCV field (NaN where a ticker has no bar) and the (T, N) "valid" mask.
+    """
+    frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        raise RuntimeError("No data to build a panel from.")
+
+    wide = pd.concat({t: df[PANEL_FIELDS] for t, df in frames.items()}, axis=1).sort_index()
+    panel = {"index": wide.index, "tickers": list(frames)}
+    for field in PANEL_FIELDS:
+        panel[field] = wide.xs(field, axis=1, level=1)[panel["tickers"]].to_numpy(dtype=np.float64)
+
+    valid = np.ones(panel["Close"].shape, dtype=bool)
+    for field in ["High", "Low", "Close", "Volume"]:
+        valid &= ~np.isnan(panel[field])
+    panel["valid"] = valid
+    return panel
+
+
+def _compaction(valid):
+    """
+    Row order that moves every ticker's bars to the top of its column, in time
+    order, plus the gather index that also pads the tail with its last bar. The
+    engine only handles leading NaNs, so each gathered column then looks like an
+    ordinary gap-free series.
+    """
+    rows = np.arange(valid.shape[0])[:, None]
+    order = np.argsort(~valid, axis=0, kind="stable")
+    counts = valid.sum(axis=0)
+    gather = np.take_along_axis(order, np.minimum(rows, np.maximum(counts - 1, 0)), axis=0)
+    return order, gather
+
+
+def compute_panel_indicators(panel):
+    """
+    Every indicator of compute_indicators for the whole universe in one engine
+    pass. Returns a (len(ENGINE_COLUMNS), T, N) block on the panel's time axis,
+    NaN where the ticker has no bar (not yet listed, suspended, missing minute).
+    Each column equals compute_indicators on that ticker's own frame.
+    """
+    valid = panel["valid"]
+    order, gather = _compaction(valid)
+    compact = compute_block(*(np.take_along_axis(panel[f], gather, axis=0)
+                              for f in ["High", "Low", "Close", "Volume"]))
+
+    # Scatter back through the unpadded order: padding rows land on missing bars
+    block = np.empty_like(compact)
+    for k in range(len(ENGINE_COLUMNS)):
+        np.put_along_axis(block[k], order, compact[k], axis=0)
+    block[:, ~valid] = np.nan
+    return block
+
+
+def panel_features(panel, block):
+    """
+    Column-wise normalize_features: the feature arrays (one entry per ticker) for
+    each ticker's last bar, plus that bar's row and the raw last-bar values.
+    """
+    valid = panel["valid"]
+    n_rows, n_tickers = valid.shape
+    has_bar = valid.any(axis=0)
+    last_row = n_rows - 1 - np.argmax(valid[::-1], axis=0)
+    cols = np.arange(n_tickers)
+
+    last = {name: block[_COL[name], last_row, cols] for name in ENGINE_COLUMNS}
+    last["Close"] = panel["Close"][last_row, cols]
+    last["Close"][~has_bar] = np.nan
+
+    hist = block[_COL["MACD_HIST"]]
+    macd_count = (~np.isnan(hist)).sum(axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+        macd_stats = (macd_count, np.nanmean(hist, axis=0), np.nanstd(hist, axis=0, ddof=1))
+
+    # Mean of each ticker's last 20 OBV values (OBV exists on every bar)
+    obv = np.where(valid, block[_COL["OBV"]], 0.0)
+    seen = np.cumsum(valid, axis=0)
+    counts = seen[-1]
+    tail20 = valid & (seen > counts - 20)
+    obv_mean = np.where(counts > 20, (obv * tail20).sum(axis=0) / 20.0, np.nan)
+
+    features = features_from_arrays(last, macd_stats, obv_mean)
+    return features, last, last_row
+
+
+def score_panel(frames):
+    """
+    Batched equivalent of running analyze_stock's scoring on every frame.
+    Returns a DataFrame indexed by ticker with the last bar's time and close,
+    the score, confidence, signal and smart stop.
+    """
+    panel = build_panel(frames)
+    block = compute_panel_indicators(panel)
+    features, last, last_row = panel_features(panel, block)
+
+    # Same overrides as analyze_stock: raw z-scores replace the VOL_Z feature
+    features["RET_Z"] = last["RET_Z"]
+    features["VOL_Z"] = last["VOL_Z"]
+
+    weights = adapt_weights_array(BASE_WEIGHTS, features["ADX"])
+    score, breakdown = aggregate_score_array(features, weights)
+    confidence = compute_confidence_array(breakdown, features["ADX"])
+    signal = recommend_signal_array(score, confidence, last["RET_Z"], last["VOL_Z"])
+    stop = smart_stop_array(last["Close"], last["ATR"], signal)
+
+    result = pd.DataFrame({
+        "bar_time": panel["index"][last_row],
+        "close": last["Close"],
+        "score": score,
+        "confidence": confidence,
+        "signal": signal,
+        "stop": stop,
+    }, index=pd.Index(panel["tickers"], name="ticker"))
+    return result[panel["valid"].any(axis=0)]
@@ -0,0 +1,113 @@
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from config import INDEX_EXECUTOR, INDEX_WORKERS, TICKER_TIMEOUT
+from data_fetch import pull_history
+from evaluation import evaluate_frame, select_data_mode, summarize
+from hedge import HEDGER
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+
+def _record(ticker, status, attempts, elapsed, error=None, result=None):
+    """
+    One ticker's outcome. Failed records carry an "error" key (and are skipped
+    by evaluation.summarize); successful ones carry the score, signal,
+    confidence, smart stop, last close and bar time.
+    """
+    record = {"ticker": ticker, "status": status, "attempts": attempts, "elapsed": elapsed}
+    if error is not None:
+        record["error"] = error
+    if result is not None:
+        latest = result["latest"]
+        record.update({
+            "score": float(result["score"]),
+            "signal": result["signal"],
+            "confidence": float(result["confidence"]),
+            "stop": float(result["stop"]),
+            "close": float(latest["Close"]),
+            "bar_time": str(latest.name),
+        })
+    return record
+
+
+def _analyze_ticker(ticker, mode, timeout):
+    """
+    Fetches and scores one ticker; runs in a pool worker. The fetch is not
+    retried here: the hedger already retries failed upstream calls with
+    jittered backoff (UPSTREAM_RETRIES, see hedge.py), and anything else
+    (no data, bad columns) would fail again. The clock starts when the worker
+    picks the ticker up, and every upstream call inside is cut off at its
+    `timeout` (HEDGER.bounded), so a hung response frees the worker slot.
+    Returns a record (see _record).
+    """
+    _, interval, period, _ = mode
+    start = time.monotonic()
+    try:
+        with HEDGER.bounded(timeout):
+            df = pull_history(ticker, interval, period)
+        result = evaluate_frame(df, mode)
+    except Exception as e:
+        return _record(ticker, "error", 1, time.monotonic() - start, error=str(e))
+    return _record(ticker, "ok", 1, time.monotonic() - start, result=result)
+
+
+def run_index(ticker_list, executor=INDEX_EXECUTOR, workers=INDEX_WORKERS, timeout=TICKER_TIMEOUT, mode=None):
+    """
+    analyze_index with every ticker fetched and scored concurrently in a
+    thread or process pool (`executor`). Each ticker gets `timeout` seconds
+    from the moment a worker starts it: its upstream calls are cut off there
+    (see _analyze_ticker), and a ticker still running past it is recorded as
+    "timeout" and the run moves on without it. With the process executor a
+    future counts as running once it enters the pool's call queue, so there
+    the clock also covers a short wait for a free worker. Running work
+    cannot be interrupted, so the whole run is also bounded: whatever is
+    still pending `timeout` per round of `workers` tickers after submission
+    (plus one round) is recorded as "timeout" too, even if it never started.
+    Returns (summary, records): the summary is exactly what the serial
+    analyze_index returns for the same data, and records holds one dict per
+    entry of ticker_list, in list order, with status "ok", "error" or
+    "timeout" (see _record).
+    """
+    mode = mode or select_data_mode()
+    tickers = list(dict.fromkeys(ticker_list))
+    results = {}
+
+    n_workers = max(1, min(workers, len(tickers)))
+    pool = EXECUTORS[executor](max_workers=n_workers)
+    try:
+        submitted = time.monotonic()
+        pending = {pool.submit(_analyze_ticker, t, mode, timeout): t for t in tickers}
+        run_limit = timeout * (math.ceil(len(tickers) / n_workers) + 1)
+        started = {}
+        poll = min(0.5, timeout)
+        while pending:
+            done, _ = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+            for future in done:
+                ticker = pending.pop(future)
+                try:
+                    results[ticker] = future.result()
+                except Exception as e:
+                    # The worker itself died (e.g. a killed process)
+                    results[ticker] = _record(ticker, "error", 0, 0.0, error=str(e))
+
+            now = time.monotonic()
+            overrun = now - submitted >= run_limit
+            for future, ticker in list(pending.items()):
+                if future.running():
+                    started.setdefault(future, now)
+                if overrun or (future in started and now - started[future] >= timeout):
+                    # A running future cannot be cancelled; its worker slot frees up once
+                    # its upstream deadline passes. Queued ones are dropped at shutdown.
+                    del pending[future]
+                    elapsed = now - started.get(future, now)
+                    results[ticker] = _record(ticker, "timeout", 0, elapsed,
+                                              error=f"Timed out after {timeout:.0f}s" if future in started
+                                              else "Not started before the run's time limit")
+    finally:
+        # Timed-out workers cannot be interrupted; don't wait for them
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    records = [results[t] for t in ticker_list]
+    return summarize(records, len(ticker_list)), records
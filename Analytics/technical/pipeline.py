@@ -0,0 +1,156 @@
+# Overlapped fetch -> score pipeline for universe scans.
+# Run from this folder:  python pipeline.py   (NIFTY 100, prints per-stage timings)
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (NIFTY_100_TICKERS, PIPELINE_COMPUTE_WORKERS, PIPELINE_FETCH_CONCURRENCY,
+                    PIPELINE_QUEUE_SIZE)
+from data_fetch import pull_history
+from evaluation import evaluate_frame, select_data_mode, summarize
+from parallel import EXECUTORS, _record
+
+
+def _score_frame(ticker, df, mode):
+    """CPU stage for one fetched frame; runs in a pool worker. Returns (record, seconds)."""
+    start = time.perf_counter()
+    try:
+        record = _record(ticker, "ok", 1, 0.0, result=evaluate_frame(df, mode))
+    except Exception as e:
+        record = _record(ticker, "error", 1, 0.0, error=str(e))
+    return record, time.perf_counter() - start
+
+
+class StageTimer:
+    """
+    Busy time and active span of one pipeline stage. `busy` sums the seconds
+    spent on items (across all concurrent slots), `span` runs from the first
+    item's start to the last item's end.
+    """
+
+    def __init__(self):
+        self.busy = 0.0
+        self.items = 0
+        self.first = None
+        self.last = None
+
+    def add(self, start, seconds):
+        self.busy += seconds
+        self.items += 1
+        self.first = start if self.first is None else min(self.first, start)
+        self.last = start + seconds if self.last is None else max(self.last, start + seconds)
+
+    def report(self, slots):
+        span = (self.last - self.first) if self.items else 0.0
+        return {"items": self.items, "busy": self.busy, "span": span,
+                "busy_per_slot": self.busy / max(1, slots)}
+
+
+async def scan(ticker_list, mode=None, fetch_concurrency=PIPELINE_FETCH_CONCURRENCY,
+               compute_workers=PIPELINE_COMPUTE_WORKERS, queue_size=PIPELINE_QUEUE_SIZE,
+               compute_executor="process"):
+    """
+    Fetches and scores a universe with the two stages overlapped: up to
+    `fetch_concurrency` downloads run at once (blocking pull_history calls on a
+    thread pool) and hand each frame through a queue of `queue_size` to
+    `compute_workers` scorers (evaluation.evaluate_frame in a process pool).
+    When the scorers fall behind the queue fills and fetching waits, so memory
+    stays bounded; wall time approaches max(fetch, compute) rather than their sum.
+    A scorer whose pool breaks records the error for each ticker it still gets.
+    Returns (summary, records, timings): summary and records as in
+    parallel.run_index; timings has wall time, each stage's StageTimer report,
+    the seconds fetchers spent blocked on a full queue ("backpressure") and
+    the seconds scorers sat idle on an empty one ("starved"), plus
+    "bottleneck", the stage with the larger busy_per_slot.
+    """
+    mode = mode or select_data_mode()
+    _, interval, period, _ = mode
+    tickers = list(dict.fromkeys(ticker_list))
+    compute_workers = compute_workers or os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+
+    queue = asyncio.Queue(maxsize=queue_size)
+    limit = asyncio.Semaphore(fetch_concurrency)
+    fetch_timer, compute_timer = StageTimer(), StageTimer()
+    waits = {"backpressure": 0.0, "starved": 0.0}
+    results = {}
+
+    async def fetch(ticker, pool):
+        async with limit:
+            start = time.perf_counter()
+            try:
+                df = await loop.run_in_executor(pool, pull_history, ticker, interval, period)
+            except Exception as e:
+                df, error = None, str(e)
+            fetch_timer.add(start, time.perf_counter() - start)
+        if df is None:
+            results[ticker] = _record(ticker, "error", 1, time.perf_counter() - start, error=error)
+            return
+        blocked = time.perf_counter()
+        await queue.put((ticker, df, start))
+        waits["backpressure"] += time.perf_counter() - blocked
+
+    async def score(pool):
+        while True:
+            idle = time.perf_counter()
+            item = await queue.get()
+            waits["starved"] += time.perf_counter() - idle
+            if item is None:
+                return
+            ticker, df, fetched_at = item
+            start = time.perf_counter()
+            try:
+                record, seconds = await loop.run_in_executor(pool, _score_frame, ticker, df, mode)
+            except Exception as e:
+                # The pool itself failed (e.g. BrokenProcessPool after a worker died): the scorer
+                # keeps draining the queue, so fetchers never block on a queue nobody reads
+                record, seconds = _record(ticker, "error", 1, 0.0, error=f"Scoring worker failed: {e!r}"), 0.0
+            compute_timer.add(start, seconds)
+            record["elapsed"] = time.perf_counter() - fetched_at
+            results[ticker] = record
+
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=fetch_concurrency) as fetch_pool, \
+            EXECUTORS[compute_executor](max_workers=compute_workers) as compute_pool:
+        scorers = [asyncio.create_task(score(compute_pool)) for _ in range(compute_workers)]
+        await asyncio.gather(*(fetch(t, fetch_pool) for t in tickers))
+        for _ in scorers:
+            await queue.put(None)
+        await asyncio.gather(*scorers)
+    wall = time.perf_counter() - wall
+
+    fetch_report = fetch_timer.report(fetch_concurrency)
+    compute_report = compute_timer.report(compute_workers)
+    timings = {
+        "wall": wall,
+        "fetch": fetch_report,
+        "compute": compute_report,
+        "backpressure": waits["backpressure"],
+        "starved": waits["starved"],
+        "bottleneck": "fetch" if fetch_report["busy_per_slot"] >= compute_report["busy_per_slot"] else "compute",
+    }
+    records = [results[t] for t in ticker_list]
+    return summarize(records, len(ticker_list)), records, timings
+
+
+def scan_index(ticker_list, **kwargs):
+    """Synchronous wrapper around scan() for scripts; same arguments and return value."""
+    return asyncio.run(scan(ticker_list, **kwargs))
+
+
+if __name__ == "__main__":
+    summary, records, timings = scan_index(NIFTY_100_TICKERS)
+    for record in records:
+        if "error" in record:
+            print(f"  > {record['ticker']}: {record['error']}")
+    print(f"\nAverage score: {summary.get('average_score', float('nan')):.2f}"
+          f" ({summary.get('total_stocks_analyzed', 0)}/{len(NIFTY_100_TICKERS)} tickers)")
+    print(f"Wall time:     {timings['wall']:.2f}s  (bottleneck: {timings['bottleneck']})")
+    for stage in ("fetch", "compute"):
+        t = timings[stage]
+        print(f"  {stage:<8} {t['items']:>4} items  busy {t['busy']:7.2f}s  "
+              f"per slot {t['busy_per_slot']:6.2f}s  span {t['span']:6.2f}s")
+    print(f"  fetchers blocked on a full queue: {timings['backpressure']:.2f}s, "
+          f"scorers idle: {timings['starved']:.2f}s")
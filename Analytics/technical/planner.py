@@ -0,0 +1,97 @@
+from config import BSE_TO_NSE, MAP_BSE_TO_NSE
+from data_fetch import pull_history_batch
+from evaluation import analysis_frame, select_data_mode, summarize
+from panel import score_panel
+from parallel import run_index
+
+
+def nse_equivalent(ticker, nse_tickers=()):
+    """
+    The .NS listing standing in for a .BO ticker: BSE_TO_NSE when the symbols
+    differ, else the same symbol on .NS when it is one of `nse_tickers` (or
+    when no list is given). Other tickers map to themselves.
+    """
+    if not ticker.endswith(".BO"):
+        return ticker
+    if ticker in BSE_TO_NSE:
+        return BSE_TO_NSE[ticker]
+    candidate = ticker[:-3] + ".NS"
+    return candidate if not nse_tickers or candidate in nse_tickers else ticker
+
+
+class IndexPlanner:
+    """
+    Scores several overlapping indices through one shared universe. Every
+    ticker is fetched and scored once, however many indices list it, and each
+    index summary is derived from those shared per-ticker records, so it
+    equals what analyze_index would return for that list to float rounding
+    (the batched panel and the per-ticker path can differ in the last digits
+    of a score). Results persist across run() calls: an index added later
+    only costs its new members.
+
+        planner = IndexPlanner(map_bo=True)
+        planner.add_index("NIFTY 50", NIFTY_50_TICKERS)
+        planner.add_index("SENSEX 30", SENSEX_30_TICKERS)
+        summaries = planner.run()
+
+    With map_bo=True (default: MAP_BSE_TO_NSE) a .BO member is scored through
+    its .NS listing (see nse_equivalent) whenever that one is in the universe
+    too; the two exchanges' prices differ slightly, so this trades exactness
+    per index for fewer downloads. `method` is "batched" (one panel, see panel.score_panel)
+    or "parallel" (see parallel.run_index).
+    """
+
+    def __init__(self, mode=None, map_bo=MAP_BSE_TO_NSE, method="batched"):
+        self.mode = mode or select_data_mode()
+        self.map_bo = map_bo
+        self.method = method
+        self.indices = {}
+        self.records = {}
+
+    def add_index(self, name, tickers):
+        self.indices[name] = list(tickers)
+
+    def members(self, name):
+        """The tickers actually scored for an index, in list order (after .BO mapping)."""
+        nse = {t for tickers in self.indices.values() for t in tickers if t.endswith(".NS")}
+        if not self.map_bo:
+            return list(self.indices[name])
+        return [nse_equivalent(t, nse) for t in self.indices[name]]
+
+    def universe(self):
+        """The deduplicated union of every index's members, in first-seen order."""
+        return list(dict.fromkeys(t for name in self.indices for t in self.members(name)))
+
+    def pending(self):
+        """Universe tickers without a record yet."""
+        return [t for t in self.universe() if t not in self.records]
+
+    def _score(self, tickers):
+        if self.method == "parallel":
+            _, records = run_index(tickers, mode=self.mode)
+            return dict(zip(tickers, records))
+
+        _, interval, period, _ = self.mode
+        frames, errors = pull_history_batch(tickers, interval, period)
+        records = {t: {"ticker": t, "status": "error", "error": e} for t, e in errors.items()}
+        if frames:
+            scored = score_panel({t: analysis_frame(df, self.mode) for t, df in frames.items()})
+            for ticker, row in zip(scored.index, scored.itertuples(index=False)):
+                records[ticker] = {"ticker": ticker, "status": "ok", "score": row.score, "signal": row.signal,
+                                   "confidence": float(row.confidence), "stop": float(row.stop),
+                                   "close": float(row.close), "bar_time": str(row.bar_time)}
+        for ticker in tickers:
+            records.setdefault(ticker, {"ticker": ticker, "status": "error", "error": "No data to analyze."})
+        return records
+
+    def run(self):
+        """Scores the pending tickers, then returns {index name: summary} for every index."""
+        todo = self.pending()
+        if todo:
+            self.records.update(self._score(todo))
+        return {name: self.summary(name) for name in self.indices}
+
+    def summary(self, name):
+        """analyze_index's summary for one index, from the shared records."""
+        members = self.members(name)
+        return summarize([self.records[t] for t in members if t in self.records], len(members))
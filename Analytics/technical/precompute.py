@@ -0,0 +1,296 @@
+# Background precompute of technical scores for the configured universe.
+# Run from this folder:  python precompute.py   (keeps SNAPSHOT_PATH fresh for API workers)
+
+import os
+import json
+import time
+import threading
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from config import (MARKET_TIMEZONE, NIFTY_100_TICKERS, PRECOMPUTE_AFTER_CLOSE, PRECOMPUTE_INTERVAL,
+                    PRECOMPUTE_UNIVERSE, SENSEX_30_TICKERS, SNAPSHOT_PATH)
+from data_fetch import pull_history_batch
+from evaluation import evaluate_frame, select_data_mode
+from indicators import compute_indicators
+from store import window
+from trading_calendar import NSE
+from utils import is_market_open
+
+# Daily indicator series the /technical endpoint reports
+SERIES_COLUMNS = ["RSI", "MACD", "MACD_SIGNAL", "MACD_HIST"]
+SERIES_DAYS = 365
+
+
+class Snapshot:
+    """
+    One immutable scan of the universe. `records` maps each ticker to its
+    score, signal, confidence, smart stop, features, last close and bar time;
+    `series` maps it to the last SERIES_DAYS of daily Close and SERIES_COLUMNS
+    (exactly what /technical computes live). Never modified once published.
+    """
+
+    def __init__(self, version, built_at, mode, records, series, errors, elapsed):
+        self.version = version
+        self.built_at = built_at
+        self.mode = mode
+        self.records = records
+        self.series = series
+        self.errors = errors
+        self.elapsed = elapsed
+
+    def meta(self):
+        return {"version": self.version, "built_at": self.built_at, "data_mode": self.mode[3],
+                "tickers": len(self.records), "errors": len(self.errors), "elapsed": self.elapsed}
+
+
+class SnapshotBuffer:
+    """
+    Double buffer of snapshots. The writer fills the back slot and then flips
+    the front index, a single reference assignment, so readers never block and
+    never see a half-built snapshot: they get the old one or the new one.
+    With `path`, every published snapshot is also written there atomically
+    (save_snapshot: tmp file + os.replace), and a process without its own
+    writer picks up newer files on read (checked at most once a second).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._slots = [None, None]
+        self._front = 0
+        self._checked = 0.0
+        self._mtime = None
+
+    def publish(self, snapshot):
+        back = 1 - self._front
+        self._slots[back] = snapshot
+        self._front = back
+        if self.path:
+            save_snapshot(snapshot, self.path)
+            self._mtime = os.stat(self.path).st_mtime
+
+    def current(self):
+        """The latest snapshot, or None before the first one."""
+        if self.path and time.monotonic() - self._checked >= 1.0:
+            self._checked = time.monotonic()
+            self._load_newer()
+        return self._slots[self._front]
+
+    def _load_newer(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        try:
+            snapshot = load_snapshot(self.path)
+        except Exception:
+            return
+        front = self._slots[self._front]
+        if front is None or snapshot.version > front.version or snapshot.built_at > front.built_at:
+            back = 1 - self._front
+            self._slots[back] = snapshot
+            self._front = back
+
+
+def save_snapshot(snapshot, path):
+    """
+    Writes `snapshot` to `path` atomically as an .npz: every ticker's series
+    concatenated into one timestamp and one value array, everything else as
+    JSON. No pickle, so loading a file from the shared cache dir never runs code.
+    """
+    columns = ["Close"] + SERIES_COLUMNS
+    ts, values, bounds, tz = [np.empty(0, dtype=np.int64)], [np.empty((0, len(columns)))], {}, None
+    rows = 0
+    for ticker, df in snapshot.series.items():
+        index = df.index
+        if index.tz is not None:
+            tz = str(index.tz)
+            index = index.tz_convert("UTC").tz_localize(None)
+        ts.append(index.values.astype("datetime64[ns]").astype(np.int64))
+        values.append(df[columns].to_numpy(dtype=np.float64))
+        bounds[ticker] = [rows, rows + len(df)]
+        rows += len(df)
+    meta = {
+        "version": snapshot.version,
+        "built_at": snapshot.built_at,
+        "mode": list(snapshot.mode),
+        "records": snapshot.records,
+        "errors": snapshot.errors,
+        "elapsed": snapshot.elapsed,
+        "series": bounds,
+        "columns": columns,
+        "tz": tz,
+    }
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+                 ts=np.concatenate(ts), values=np.vstack(values))
+    os.replace(tmp, path)
+
+
+def load_snapshot(path):
+    """The Snapshot save_snapshot wrote to `path`."""
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(data["meta"].tobytes())
+        ts, values = data["ts"], data["values"]
+    index = pd.DatetimeIndex(ts.astype("datetime64[ns]"))
+    if meta["tz"]:
+        index = index.tz_localize("UTC").tz_convert(meta["tz"])
+    series = {t: pd.DataFrame(values[start:stop], index=index[start:stop], columns=meta["columns"])
+              for t, (start, stop) in meta["series"].items()}
+    return Snapshot(meta["version"], meta["built_at"], tuple(meta["mode"]), meta["records"], series,
+                    meta["errors"], meta["elapsed"])
+
+
+def writer_lock(path):
+    """
+    Takes the single-writer lock for snapshots published to `path` (a
+    non-blocking lock on `path`.lock, released when the returned file is
+    closed or the process exits). Returns the open lock file, or None when
+    another process already holds it and writes the snapshots.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lock = open(f"{path}.lock", "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+def build_snapshot(universe, version, mode=None):
+    """Fetches and scores every ticker of `universe` (batched downloads); returns a Snapshot."""
+    start = time.perf_counter()
+    mode = mode or select_data_mode()
+    _, interval, period, _ = mode
+    tickers = list(dict.fromkeys(universe))
+
+    frames, errors = pull_history_batch(tickers, interval, period)
+    # Scoring off-hours uses daily 1y, the same dataset /technical reads
+    if (interval, period) == ("1d", "1y"):
+        daily, daily_errors = frames, errors
+    else:
+        daily, daily_errors = pull_history_batch(tickers, "1d", "1y")
+
+    records, series = {}, {}
+    for ticker in tickers:
+        if ticker in frames:
+            try:
+                result = evaluate_frame(frames[ticker], mode)
+                latest = result["latest"]
+                records[ticker] = {
+                    "ticker": ticker,
+                    "score": float(result["score"]),
+                    "signal": result["signal"],
+                    "confidence": float(result["confidence"]),
+                    "stop": float(result["stop"]),
+                    "features": {k: float(v) for k, v in result["features"].items()},
+                    "close": float(latest["Close"]),
+                    "bar_time": str(latest.name),
+                }
+            except Exception as e:
+                errors[ticker] = str(e)
+        if ticker in daily:
+            history = window(daily[ticker], f"{SERIES_DAYS}d")
+            if not history.empty:
+                series[ticker] = compute_indicators(history, columns=SERIES_COLUMNS)[["Close"] + SERIES_COLUMNS]
+        elif ticker in daily_errors:
+            errors.setdefault(ticker, daily_errors[ticker])
+
+    return Snapshot(version, time.time(), mode, records, series, errors, time.perf_counter() - start)
+
+
+class Precomputer(threading.Thread):
+    """
+    Rescans `universe` (default PRECOMPUTE_UNIVERSE) into `buffer` on a
+    schedule: every PRECOMPUTE_INTERVAL seconds while the market is open, once
+    more PRECOMPUTE_AFTER_CLOSE seconds after the close (so the final bars are
+    in), then not again until the next session opens. A failed scan keeps the previous snapshot and is retried
+    at the next slot.
+    """
+
+    def __init__(self, buffer, universe=None, interval=PRECOMPUTE_INTERVAL,
+                 after_close=PRECOMPUTE_AFTER_CLOSE):
+        super().__init__(name="technical-precompute", daemon=True)
+        self.buffer = buffer
+        self.universe = list(universe or PRECOMPUTE_UNIVERSE or NIFTY_100_TICKERS + SENSEX_30_TICKERS)
+        self.interval = interval
+        self.after_close = after_close
+        self.failures = 0
+        self.last_error = None
+        self._halt = threading.Event()
+        self._version = 0
+
+    def rebuild(self):
+        """One scan, published on success; returns the snapshot (or None)."""
+        try:
+            self._version += 1
+            snapshot = build_snapshot(self.universe, self._version)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            return None
+        self.buffer.publish(snapshot)
+        return snapshot
+
+    def delay(self):
+        """Seconds until the next scan: the next interval boundary while open, else the next session open."""
+        now = dt.datetime.now(MARKET_TIMEZONE)
+        session = NSE.current_session(now)
+        if session is not None:
+            # The last scan of a session runs at its close (special sessions end off the interval grid)
+            until_close = max(1.0, (session[1] - now).total_seconds())
+            return min(self.interval - (now.timestamp() % self.interval), until_close)
+        return max(1.0, (NSE.next_open(now) - now).total_seconds())
+
+    def run(self):
+        last_open = False
+        while not self._halt.is_set():
+            is_open = is_market_open()
+            # The close just passed: give Yahoo time to publish the final bars
+            if last_open and not is_open and self._halt.wait(self.after_close):
+                break
+            self.rebuild()
+            last_open = is_open
+            self._halt.wait(self.delay())
+
+    def stop(self):
+        self._halt.set()
+
+
+if __name__ == "__main__":
+    lock = writer_lock(SNAPSHOT_PATH)
+    if lock is None:
+        raise SystemExit(f"Another process already precomputes into {SNAPSHOT_PATH}")
+    buffer = SnapshotBuffer(SNAPSHOT_PATH)
+    worker = Precomputer(buffer)
+    print(f"Precomputing {len(worker.universe)} tickers into {SNAPSHOT_PATH} (Ctrl+C to stop)")
+    worker.start()
+    seen = None
+    try:
+        while True:
+            time.sleep(1)
+            snapshot = buffer.current()
+            if snapshot is not None and snapshot.version != seen:
+                seen = snapshot.version
+                print(snapshot.meta())
+    except KeyboardInterrupt:
+        worker.stop()
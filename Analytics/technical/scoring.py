@@ -1,23 +1,24 @@
 import math
+import numpy as np
 import pandas as pd
-from config import BASE_WEIGHTS
+from config import BASE_WEIGHTS, TREND_BOOST, TREND_REGIME_THRESHOLD
 
 def adapt_weights(base_weights, features, df):
     w = base_weights.copy()
     adx_val = float(features.get("ADX", 0)) 
     trend_boost = max(0, adx_val)
     
-    if trend_boost > 0.3:
+    if trend_boost > TREND_REGIME_THRESHOLD:
         for k in ["SMA_trend", "EMA_trend", "MACD"]:
             if k in w:
-                w[k] *= 1.0 + 0.5 * trend_boost
+                w[k] *= 1.0 + TREND_BOOST * trend_boost
         if "BOLL" in w:
             w["BOLL"] *= max(0.4, 1.0 - 0.8 * trend_boost)
     else:
         if "BOLL" in w:
-            w["BOLL"] *= 1.0 + 0.8 * (0.3 - trend_boost)
+            w["BOLL"] *= 1.0 + 0.8 * (TREND_REGIME_THRESHOLD - trend_boost)
         if "RSI" in w:
-            w["RSI"] *= 1.0 + 0.3 * (0.3 - trend_boost)
+            w["RSI"] *= 1.0 + 0.3 * (TREND_REGIME_THRESHOLD - trend_boost)
             
     s = sum([v for v in w.values() if not math.isnan(v)])
     if s > 1e-9:
@@ -53,4 +54,60 @@ def compute_confidence(breakdown, features):
     conf = (mag / num_features) * 0.8 + adx_bias * 0.2
     
     conf = max(0.0, min(1.0, conf))
-    return conf
\ No newline at end of file
+    return conf
+
+# --- Vectorized versions (one entry per ticker or per bar) ---
+# Same arithmetic in the same order as the scalar functions above, so results
+# are identical element for element, including how NaN features are treated.
+
+def adapt_weights_array(base_weights, adx_feature, regime_threshold=TREND_REGIME_THRESHOLD, boost=TREND_BOOST):
+    adx = np.asarray(adx_feature, dtype=np.float64)
+    trend_boost = np.where(adx > 0, adx, 0.0)  # max(0, adx) with NaN -> 0
+    trending = trend_boost > regime_threshold
+    w = {k: np.full(adx.shape, v, dtype=np.float64) for k, v in base_weights.items()}
+
+    for k in ["SMA_trend", "EMA_trend", "MACD"]:
+        if k in w:
+            w[k] = np.where(trending, w[k] * (1.0 + boost * trend_boost), w[k])
+    if "BOLL" in w:
+        w["BOLL"] = np.where(trending,
+                             w["BOLL"] * np.maximum(0.4, 1.0 - 0.8 * trend_boost),
+                             w["BOLL"] * (1.0 + 0.8 * (regime_threshold - trend_boost)))
+    if "RSI" in w:
+        w["RSI"] = np.where(trending, w["RSI"], w["RSI"] * (1.0 + 0.3 * (regime_threshold - trend_boost)))
+
+    s = 0
+    for v in w.values():
+        s = s + np.where(np.isnan(v), 0.0, v)
+    safe = np.where(s > 1e-9, s, 1.0)
+    for k in w:
+        w[k] = np.where(s > 1e-9, w[k] / safe, w[k])
+    return w
+
+
+def aggregate_score_array(features, weights):
+    s = 0.0
+    breakdown = {}
+    for k, w in weights.items():
+        val = np.asarray(features.get(k, 0.0), dtype=np.float64)
+        val = np.where(np.isfinite(val), val, 0.0)
+        contr = w * val
+        breakdown[k] = contr
+        s = s + contr
+
+    score = (s + 1.0) / 2.0 * 100.0
+    score = np.where(np.isfinite(score), score, 50.0)
+    return score, breakdown
+
+
+def compute_confidence_array(breakdown, adx_feature):
+    mag = 0
+    for v in breakdown.values():
+        mag = mag + np.abs(v)
+    adx_bias = np.abs(np.asarray(adx_feature, dtype=np.float64))
+
+    num_features = len(BASE_WEIGHTS) if len(BASE_WEIGHTS) > 0 else 1
+    conf = (mag / num_features) * 0.8 + adx_bias * 0.2
+
+    conf = np.where(conf < 1.0, conf, 1.0)  # min(1.0, conf) with NaN -> 1.0
+    return np.where(conf > 0.0, conf, 0.0)
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from config import ANOMALY_Z_THRESHOLD
 
@@ -47,6 +48,52 @@ def smart_stop(latest, signal):
     stop = min(stop, price * 0.995) 
     return max(0.0, stop)
 
+# --- Vectorized versions (one entry per ticker or per bar) ---
+
+# Integer codes for the signals, ordered from most bearish to most bullish
+SIGNAL_CODES = {
+    "EXIT_ANOMALY": 0, "EXIT": 1, "TIGHTEN_STOP": 2,
+    "VIGILANCE_HIGH_VOL": 3, "HOLD": 4, "BUY": 5,
+}
+
+def signal_codes(signal):
+    """Maps an array of signal names to their SIGNAL_CODES (int8)."""
+    signal = np.asarray(signal)
+    codes = np.full(signal.shape, -1, dtype=np.int8)
+    for name, code in SIGNAL_CODES.items():
+        codes[signal == name] = code
+    return codes
+
+
+def recommend_signal_array(score, confidence, ret_z, vol_z):
+    """recommend_signal over arrays; returns an array of signal names."""
+    score = np.asarray(score, dtype=np.float64)
+    signal = np.where(score < 30, "EXIT", np.where(score < 45, "TIGHTEN_STOP",
+                      np.where(score < 60, "HOLD", "BUY"))).astype("<U18")
+
+    anomaly = (np.abs(ret_z) > ANOMALY_Z_THRESHOLD) | (np.abs(vol_z) > ANOMALY_Z_THRESHOLD)
+    signal = np.where(anomaly & (signal == "BUY"), "TIGHTEN_STOP",
+             np.where(anomaly & (signal == "HOLD"), "VIGILANCE_HIGH_VOL",
+             np.where(anomaly & ((signal == "TIGHTEN_STOP") | (signal == "EXIT")), "EXIT_ANOMALY", signal)))
+
+    return np.where((np.asarray(confidence) < 0.35) & (signal == "BUY"), "HOLD", signal)
+
+
+def smart_stop_array(close, atr, signal):
+    """smart_stop over arrays of closes, ATRs and signal names."""
+    price = np.asarray(close, dtype=np.float64)
+    atr = np.asarray(atr, dtype=np.float64)
+    atr = np.where((atr <= 0) | np.isnan(atr), price * 0.01, atr)
+
+    multiplier = np.where(signal == "BUY", 3.0, np.where(signal == "HOLD", 2.0,
+                 np.where((signal == "TIGHTEN_STOP") | (signal == "VIGILANCE_HIGH_VOL"), 1.0, 0.5)))
+    stop = price - multiplier * atr
+
+    cap = price * 0.995
+    stop = np.where(cap < stop, cap, stop)      # min(stop, price * 0.995)
+    stop = np.where(stop > 0.0, stop, 0.0)      # max(0.0, stop)
+    return np.where(price <= 0, 0.0, stop)
+
 def interpret_score(score):
     """Provides a simple text interpretation of the technical score."""
     if score > 70:
@@ -0,0 +1,219 @@
+import os
+import re
+import json
+import uuid
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from trading_calendar import NSE
+from utils import interval_minutes
+
+STORE_COLUMNS = ["Open", "High", "Low", "Close", "Adj close", "Volume"]
+
+
+def period_start(period, index=None, interval=None):
+    """
+    Earliest timestamp a yfinance `period` string ('7d', '1mo', '1y', 'ytd', 'max')
+    reaches back to from now, in the timezone of `index`. None means unbounded.
+    For an intraday `interval`, '<n>d' counts trading sessions as Yahoo does
+    (the last n sessions that have opened, today's included), not calendar days.
+    """
+    tz = getattr(index, "tz", None)
+    now = pd.Timestamp.now(tz=tz)
+    if period in (None, "max"):
+        return None
+    if period == "ytd":
+        return now.normalize().replace(month=1, day=1)
+
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", str(period))
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    n, unit = int(match.group(1)), match.group(2)
+    if unit == "d" and n > 0 and interval is not None and interval_minutes(interval) is not None:
+        start = pd.Timestamp(NSE.sessions_back(n))
+        return start.tz_localize(NSE.tz).tz_convert(tz) if tz is not None else start
+    offset = {
+        "d": pd.DateOffset(days=n),
+        "wk": pd.DateOffset(weeks=n),
+        "mo": pd.DateOffset(months=n),
+        "y": pd.DateOffset(years=n),
+    }[unit]
+    return (now - offset).normalize()
+
+
+def window(df, period, interval=None):
+    """Slice a stored frame down to the bars a `period` request of `interval` bars would return."""
+    start = period_start(period, df.index, interval)
+    if start is None or df.empty:
+        return df
+    return df[df.index >= start]
+
+
+class OHLCVStore:
+    """
+    On-disk OHLCV history keyed by (ticker, interval).
+
+    Each key is three files under <root>/<interval>/: timestamps (int64 ns) and an
+    (n, 6) float64 block as memory-mapped .npy arrays, plus a small JSON meta file
+    holding the timezone and how far back the stored history is complete.
+    Several processes may share a root: files are replaced through unique temp
+    names, and merges of one key are serialized by a lock file next to it.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _paths(self, ticker, interval):
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+        base = os.path.join(self.root, interval, name)
+        return base + ".ts.npy", base + ".ohlcv.npy", base + ".json"
+
+    def _meta(self, ticker, interval):
+        _, _, meta_path = self._paths(ticker, interval)
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @contextmanager
+    def _locked(self, ticker, interval):
+        """Exclusive lock on one key, across threads and processes (blocks until it is free)."""
+        _, _, meta_path = self._paths(ticker, interval)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        with open(meta_path[:-len(".json")] + ".lock", "a+") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+                yield
+                return
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def load(self, ticker, interval):
+        """Return the stored frame, or None if nothing usable is stored."""
+        meta = self._meta(ticker, interval)
+        if meta is None:
+            return None
+        ts_path, values_path, _ = self._paths(ticker, interval)
+        try:
+            ts = np.load(ts_path, mmap_mode="r")
+            values = np.load(values_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if len(ts) != meta["rows"] or values.shape != (len(ts), len(STORE_COLUMNS)):
+            return None  # torn write; caller falls back to a full download
+
+        index = pd.DatetimeIndex(np.asarray(ts, dtype="datetime64[ns]"))
+        if meta.get("tz"):
+            index = index.tz_localize("UTC").tz_convert(meta["tz"])
+        return pd.DataFrame(np.array(values), index=index, columns=STORE_COLUMNS)
+
+    def last_timestamp(self, ticker, interval):
+        """Timestamp of the newest stored bar, read from the index file only."""
+        meta = self._meta(ticker, interval)
+        if not meta or not meta["rows"]:
+            return None
+        ts_path, _, _ = self._paths(ticker, interval)
+        try:
+            ts = np.load(ts_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if len(ts) != meta["rows"]:
+            return None
+        last = pd.Timestamp(int(ts[-1]))
+        if meta.get("tz"):
+            last = last.tz_localize("UTC").tz_convert(meta["tz"])
+        return last
+
+    def covers(self, ticker, interval, period):
+        """
+        True when the stored history is complete back to the start of `period` and
+        reaches into it, so only bars after the last stored one need fetching.
+        """
+        meta = self._meta(ticker, interval)
+        last = self.last_timestamp(ticker, interval)
+        if last is None:
+            return False
+        if meta.get("complete_max"):
+            return True
+        start = period_start(period, pd.DatetimeIndex([last]), interval)
+        coverage = meta.get("coverage_start")
+        if start is None or coverage is None or coverage > start.value:
+            return False
+        return last >= start
+
+    def save(self, ticker, interval, df, coverage_start=None, complete_max=False):
+        """Atomically replace the stored history for a key (merge holds the key's lock around it)."""
+        ts_path, values_path, meta_path = self._paths(ticker, interval)
+        os.makedirs(os.path.dirname(ts_path), exist_ok=True)
+
+        index = df.index
+        tz = str(index.tz) if index.tz is not None else None
+        if tz:
+            index = index.tz_convert("UTC").tz_localize(None)
+        values = df.reindex(columns=STORE_COLUMNS).to_numpy(dtype=np.float64)
+
+        # Data files first, meta last: a reader only trusts arrays the meta agrees with
+        ts = index.values.astype("datetime64[ns]").astype(np.int64)
+        # Temp names are unique per writer, so concurrent saves never write into each other's file
+        suffix = f".{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        for path, arr in ((ts_path, ts), (values_path, values)):
+            tmp = path + suffix
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp, path)
+
+        meta = {
+            "rows": len(df),
+            "tz": tz,
+            "coverage_start": coverage_start,
+            "complete_max": complete_max,
+        }
+        tmp = meta_path + suffix
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def merge(self, ticker, interval, new_df, period=None):
+        """
+        Merge freshly downloaded bars into the store (newer bars win on duplicate
+        timestamps) and return the full merged history. Pass the `period` of a full
+        download so the store records how far back it is complete.
+        """
+        # Read-merge-write under the key's lock: a concurrent merge cannot drop the bars this one adds
+        with self._locked(ticker, interval):
+            old = self.load(ticker, interval)
+            meta = (self._meta(ticker, interval) or {}) if old is not None else {}
+            coverage = meta.get("coverage_start")
+            complete_max = meta.get("complete_max", False)
+
+            if period is not None and not complete_max:
+                start = period_start(period, new_df.index, interval)
+                if start is None:
+                    coverage, complete_max = None, True
+                elif coverage is None or start.value < coverage:
+                    coverage = start.value
+
+            new_df = new_df.reindex(columns=STORE_COLUMNS)
+            if old is not None and not old.empty:
+                if old.index.tz is not None and new_df.index.tz is not None:
+                    new_df.index = new_df.index.tz_convert(old.index.tz)
+                merged = pd.concat([old, new_df])
+                merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            else:
+                merged = new_df.sort_index()
+
+            self.save(ticker, interval, merged, coverage_start=coverage, complete_max=complete_max)
+            return merged
@@ -0,0 +1,393 @@
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+import indicator_engine as ie
+from indicator_engine import ENGINE_COLUMNS
+from features import features_from_row
+
+PRICE_COLS = ["Open", "High", "Low", "Close", "Volume"]
+NAN = float("nan")
+
+
+class _Window:
+    """
+    Fixed-length trailing window with running sum / sum of squares.
+    Sums are kept relative to a reference value and rebuilt every n pushes,
+    which bounds rounding drift at an amortized O(1) cost per bar.
+    """
+
+    def __init__(self, n, values=()):
+        self.n = n
+        self.values = deque((float(v) for v in list(values)[-n:]), maxlen=n)
+        self._rebuild()
+
+    def _rebuild(self):
+        self.ref = self.values[0] if self.values else 0.0
+        centered = [v - self.ref for v in self.values]
+        self.sum = math.fsum(centered)
+        self.sumsq = math.fsum(d * d for d in centered)
+        self.pushes = 0
+
+    def push(self, value):
+        if len(self.values) == self.n:
+            old = self.values[0] - self.ref
+            self.sum -= old
+            self.sumsq -= old * old
+        self.values.append(float(value))
+        d = value - self.ref
+        self.sum += d
+        self.sumsq += d * d
+        self.pushes += 1
+        if self.pushes >= self.n:
+            self._rebuild()
+
+    @property
+    def count(self):
+        return len(self.values)
+
+    @property
+    def full(self):
+        return len(self.values) == self.n
+
+    def total(self):
+        return self.ref * len(self.values) + self.sum
+
+    def mean(self):
+        return self.ref + self.sum / len(self.values)
+
+    def var(self, ddof=0):
+        k = len(self.values)
+        return max(0.0, (self.sumsq - self.sum * self.sum / k) / (k - ddof))
+
+    def mean_square(self):
+        k = len(self.values)
+        return (self.sumsq + 2 * self.ref * self.sum) / k + self.ref * self.ref
+
+
+class _Ema:
+    """pandas_ta-style EMA: SMA of the first n values as seed, then adjust=False."""
+
+    def __init__(self, n, value=None, warm=()):
+        self.n = n
+        self.alpha = 2.0 / (n + 1)
+        self.value = value
+        self.warm = list(warm)
+
+    def push(self, x):
+        if self.value is None:
+            self.warm.append(x)
+            if len(self.warm) == self.n:
+                self.value = math.fsum(self.warm) / self.n
+                self.warm = []
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+        return NAN if self.value is None else self.value
+
+    @classmethod
+    def seeded(cls, n, series, ema_values):
+        series = series[~np.isnan(series)]
+        if len(series) >= n:
+            return cls(n, value=float(ema_values[-1]))
+        return cls(n, warm=series.tolist())
+
+
+class _Rma:
+    """Wilder smoothing as pandas ewm(alpha=1/n, adjust=True, min_periods=n)."""
+
+    def __init__(self, n, num=0.0, den=0.0, count=0):
+        self.n = n
+        self.decay = 1.0 - 1.0 / n
+        self.num, self.den, self.count = num, den, count
+
+    def push(self, x):
+        self.num *= self.decay
+        self.den *= self.decay
+        if not math.isnan(x):
+            self.num += x
+            self.den += 1.0
+            self.count += 1
+        return self.num / self.den if self.count >= self.n else NAN
+
+    @classmethod
+    def seeded(cls, n, series):
+        valid = ~np.isnan(series)
+        if not valid.any():
+            return cls(n)
+        ages = (len(series) - 1 - np.flatnonzero(valid)).astype(np.float64)
+        weights = (1.0 - 1.0 / n) ** ages
+        return cls(n, float(np.dot(weights, series[valid])), float(weights.sum()), int(valid.sum()))
+
+
+class StreamingIndicators:
+    """
+    Incremental version of compute_indicators + normalize_features for live bars.
+
+    Seed it once from a history frame (the NumPy engine does that pass), then
+    call update() with each completed bar: every indicator advances with a
+    running sum, an EMA/Wilder recurrence or a short fixed window, so the cost
+    per bar does not depend on how much history is behind it. latest() returns
+    the same canonical columns compute_indicators would give for the last bar,
+    features() the normalize_features output, and snapshot()/restore() move
+    the whole state through plain JSON-serializable dicts.
+    """
+
+    def __init__(self):
+        self.latest_row = {}
+
+    # --- seeding ---------------------------------------------------------
+    @classmethod
+    def from_history(cls, df):
+        df = df.sort_index()
+        h, l, c, v = (df[col].to_numpy(dtype=np.float64) for col in ("High", "Low", "Close", "Volume"))
+        if len(c) == 0:
+            raise RuntimeError("Cannot seed streaming indicators from an empty history.")
+        block = dict(zip(ENGINE_COLUMNS, ie.compute_block(h, l, c, v)))
+        self = cls()
+
+        self.prev_close, self.prev_high, self.prev_low = float(c[-1]), float(h[-1]), float(l[-1])
+        typical = ie.hlc3(h, l, c)
+        self.prev_typical = float(typical[-1])
+
+        self.close20 = _Window(20, c)
+        self.close50 = _Window(50, c)
+        self.close200 = _Window(200, c)
+
+        self.ema12 = _Ema.seeded(12, c, block["EMA12"])
+        self.ema26 = _Ema.seeded(26, c, block["EMA26"])
+        self.signal9 = _Ema.seeded(9, block["MACD"], block["MACD_SIGNAL"])
+
+        tr = ie.true_range(h, l, c)
+        self.atr = _Rma.seeded(14, tr)
+        diff = np.diff(c, prepend=np.nan)
+        gain = np.where(diff > 0, diff, 0.0)
+        loss = np.where(diff < 0, diff, 0.0)
+        gain[0] = loss[0] = np.nan
+        self.rsi_gain = _Rma.seeded(14, gain)
+        self.rsi_loss = _Rma.seeded(14, loss)
+
+        up = np.diff(h, prepend=np.nan)
+        dn = -np.diff(l, prepend=np.nan)
+        pos = np.where((up > dn) & (up > 0), up, 0.0)
+        neg = np.where((dn > up) & (dn > 0), dn, 0.0)
+        pos[0] = neg[0] = np.nan
+        self.dm_pos = _Rma.seeded(14, pos)
+        self.dm_neg = _Rma.seeded(14, neg)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            dx = 100.0 * np.abs(block["+DI"] - block["-DI"]) / (block["+DI"] + block["-DI"])
+        self.adx = _Rma.seeded(14, dx)
+
+        self.obv = float(block["OBV"][-1])
+        self.obv20 = _Window(20, block["OBV"])
+        self.obv_count = len(c)
+
+        hl = h - l
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ad = np.where(hl != 0, ((c - l) - (h - c)) / np.where(hl != 0, hl, 1.0), 0.0) * v
+        self.cmf_ad = _Window(20, ad)
+        self.cmf_vol = _Window(20, v)
+
+        flow = typical * v
+        tp_diff = np.diff(typical, prepend=np.nan)
+        self.mfi_pos = _Window(14, np.where(tp_diff > 0, flow, 0.0))
+        self.mfi_neg = _Window(14, np.where(tp_diff < 0, flow, 0.0))
+
+        self.stoch_low = deque(l[-14:].tolist(), maxlen=14)
+        self.stoch_high = deque(h[-14:].tolist(), maxlen=14)
+        lowest, highest = ie.rolling_min(l, 14), ie.rolling_max(h, 14)
+        spread = np.where(highest - lowest == 0, np.finfo(np.float64).eps, highest - lowest)
+        raw = 100.0 * (c - lowest) / spread
+        self.stoch_raw = _Window(3, raw[~np.isnan(raw)])
+        self.stoch_k = _Window(3, block["STOCH_K"][~np.isnan(block["STOCH_K"])])
+
+        self.cci_tp = deque(typical[-20:].tolist(), maxlen=20)
+        self.ret60 = _Window(60, block["RET"])
+        self.vol60 = _Window(60, v)
+
+        hist = block["MACD_HIST"][~np.isnan(block["MACD_HIST"])]
+        self.hist_count = len(hist)
+        self.hist_mean = float(hist.mean()) if len(hist) else 0.0
+        self.hist_m2 = float(((hist - self.hist_mean) ** 2).sum()) if len(hist) else 0.0
+
+        last = df.iloc[-1]
+        self.latest_row = {col: float(last[col]) for col in PRICE_COLS}
+        self.latest_row.update({name: float(values[-1]) for name, values in block.items()})
+        return self
+
+    # --- per-bar update --------------------------------------------------
+    def update(self, bar):
+        """Advance every indicator by one completed bar (dict/Series with OHLCV) and return latest()."""
+        o, h, l, c, v = (float(bar[col]) for col in PRICE_COLS)
+        row = {"Open": o, "High": h, "Low": l, "Close": c, "Volume": v}
+
+        self.close20.push(c)
+        self.close50.push(c)
+        self.close200.push(c)
+        row["SMA20"] = self.close20.mean() if self.close20.full else NAN
+        row["SMA50"] = self.close50.mean() if self.close50.full else NAN
+        row["SMA200"] = self.close200.mean() if self.close200.full else NAN
+
+        row["EMA12"] = self.ema12.push(c)
+        row["EMA26"] = self.ema26.push(c)
+        row["MACD"] = row["EMA12"] - row["EMA26"]
+        row["MACD_SIGNAL"] = self.signal9.push(row["MACD"]) if not math.isnan(row["MACD"]) else NAN
+        row["MACD_HIST"] = row["MACD"] - row["MACD_SIGNAL"]
+        if not math.isnan(row["MACD_HIST"]):
+            # Welford update of the whole-history histogram mean/std used by the MACD feature
+            self.hist_count += 1
+            delta = row["MACD_HIST"] - self.hist_mean
+            self.hist_mean += delta / self.hist_count
+            self.hist_m2 += delta * (row["MACD_HIST"] - self.hist_mean)
+
+        tr = max(h - l, abs(h - self.prev_close), abs(self.prev_close - l))
+        row["ATR"] = self.atr.push(tr)
+        diff = c - self.prev_close
+        avg_gain = self.rsi_gain.push(diff if diff > 0 else 0.0)
+        avg_loss = self.rsi_loss.push(diff if diff < 0 else 0.0)
+        row["RSI"] = _ratio(100.0 * avg_gain, avg_gain + abs(avg_loss))
+
+        up, dn = h - self.prev_high, self.prev_low - l
+        pos_dm = self.dm_pos.push(up if (up > dn and up > 0) else 0.0)
+        neg_dm = self.dm_neg.push(dn if (dn > up and dn > 0) else 0.0)
+        row["+DI"] = _ratio(100.0 * pos_dm, row["ATR"])
+        row["-DI"] = _ratio(100.0 * neg_dm, row["ATR"])
+        dx = _ratio(100.0 * abs(row["+DI"] - row["-DI"]), row["+DI"] + row["-DI"])
+        row["ADX"] = self.adx.push(dx)
+
+        if self.close20.full:
+            dev = math.sqrt(self.close20.var(ddof=0))
+            row["BBM"] = row["SMA20"]
+            row["BBL"], row["BBU"] = row["BBM"] - 2.0 * dev, row["BBM"] + 2.0 * dev
+        else:
+            row["BBL"] = row["BBM"] = row["BBU"] = NAN
+
+        sign = 1.0 if c > self.prev_close else (-1.0 if c < self.prev_close else 0.0)
+        self.obv += sign * v
+        row["OBV"] = self.obv
+        self.obv20.push(self.obv)
+        self.obv_count += 1
+
+        hl = h - l
+        self.cmf_ad.push(((c - l) - (h - c)) / hl * v if hl != 0 else 0.0)
+        self.cmf_vol.push(v)
+        row["CMF"] = _ratio(self.cmf_ad.total(), self.cmf_vol.total()) if self.cmf_ad.full else NAN
+
+        typical = (h + l + c) / 3.0
+        flow = typical * v
+        self.mfi_pos.push(flow if typical > self.prev_typical else 0.0)
+        self.mfi_neg.push(flow if typical < self.prev_typical else 0.0)
+        if self.mfi_pos.full:
+            psum, nsum = self.mfi_pos.total(), self.mfi_neg.total()
+            row["MFI"] = _ratio(100.0 * psum, psum + nsum)
+        else:
+            row["MFI"] = NAN
+
+        self.stoch_low.append(l)
+        self.stoch_high.append(h)
+        if len(self.stoch_low) == 14:
+            lowest, highest = min(self.stoch_low), max(self.stoch_high)
+            spread = (highest - lowest) or np.finfo(np.float64).eps
+            self.stoch_raw.push(100.0 * (c - lowest) / spread)
+        row["STOCH_K"] = self.stoch_raw.mean() if self.stoch_raw.full else NAN
+        if not math.isnan(row["STOCH_K"]):
+            self.stoch_k.push(row["STOCH_K"])
+        row["STOCH_D"] = self.stoch_k.mean() if self.stoch_k.full else NAN
+
+        self.cci_tp.append(typical)
+        if len(self.cci_tp) == 20:
+            tp_mean = math.fsum(self.cci_tp) / 20
+            mad = math.fsum(abs(x - tp_mean) for x in self.cci_tp) / 20
+            row["CCI"] = _ratio(typical - tp_mean, 0.015 * mad)
+        else:
+            row["CCI"] = NAN
+
+        ret = c / self.prev_close - 1.0 if self.prev_close else 0.0
+        row["RET"] = ret if math.isfinite(ret) else 0.0
+        self.ret60.push(row["RET"])
+        self.vol60.push(v)
+        row["RET_Z"] = _zscore(self.ret60, row["RET"])
+        row["VOL_Z"] = _zscore(self.vol60, v)
+
+        self.prev_close, self.prev_high, self.prev_low, self.prev_typical = c, h, l, typical
+        self.latest_row = row
+        return self.latest()
+
+    # --- outputs ---------------------------------------------------------
+    def latest(self):
+        """Canonical indicator columns for the most recent bar."""
+        return dict(self.latest_row)
+
+    def features(self):
+        """normalize_features() for the most recent bar, from running statistics."""
+        std = math.sqrt(self.hist_m2 / (self.hist_count - 1)) if self.hist_count > 1 else NAN
+        obv_mean = self.obv20.mean() if self.obv_count > 20 else None
+        return features_from_row(self.latest_row, (self.hist_count, self.hist_mean, std), obv_mean)
+
+    # --- snapshot / restore ----------------------------------------------
+    def snapshot(self):
+        """Whole state as a JSON-serializable dict."""
+        def window(w):
+            return list(w.values)
+
+        def rma(r):
+            return [r.num, r.den, r.count]
+
+        def ema(e):
+            return [e.value, list(e.warm)]
+
+        return {
+            "prev": [self.prev_close, self.prev_high, self.prev_low, self.prev_typical],
+            "windows": {name: window(getattr(self, name)) for name in _WINDOWS},
+            "rma": {name: rma(getattr(self, name)) for name in _RMAS},
+            "ema": {name: ema(getattr(self, name)) for name in _EMAS},
+            "stoch_low": list(self.stoch_low),
+            "stoch_high": list(self.stoch_high),
+            "cci_tp": list(self.cci_tp),
+            "obv": [self.obv, self.obv_count],
+            "hist": [self.hist_count, self.hist_mean, self.hist_m2],
+            "latest": self.latest_row,
+        }
+
+    @classmethod
+    def restore(cls, state):
+        self = cls()
+        self.prev_close, self.prev_high, self.prev_low, self.prev_typical = state["prev"]
+        for name, values in state["windows"].items():
+            setattr(self, name, _Window(_WINDOWS[name], values))
+        for name, (num, den, count) in state["rma"].items():
+            setattr(self, name, _Rma(14, num, den, count))
+        for name, (value, warm) in state["ema"].items():
+            setattr(self, name, _Ema(_EMAS[name], value, warm))
+        self.stoch_low = deque(state["stoch_low"], maxlen=14)
+        self.stoch_high = deque(state["stoch_high"], maxlen=14)
+        self.cci_tp = deque(state["cci_tp"], maxlen=20)
+        self.obv, self.obv_count = state["obv"]
+        self.hist_count, self.hist_mean, self.hist_m2 = state["hist"]
+        self.latest_row = dict(state["latest"])
+        return self
+
+
+# Attribute name -> window length / EMA length, for snapshot() and restore()
+_WINDOWS = {
+    "close20": 20, "close50": 50, "close200": 200, "obv20": 20,
+    "cmf_ad": 20, "cmf_vol": 20, "mfi_pos": 14, "mfi_neg": 14,
+    "stoch_raw": 3, "stoch_k": 3, "ret60": 60, "vol60": 60,
+}
+_RMAS = ["atr", "rsi_gain", "rsi_loss", "dm_pos", "dm_neg", "adx"]
+_EMAS = {"ema12": 12, "ema26": 26, "signal9": 9}
+
+
+def _ratio(num, den):
+    if math.isnan(num) or math.isnan(den) or den == 0:
+        return NAN
+    return num / den
+
+
+def _zscore(window, x):
+    """Matches indicator_engine.zscore: >= 10 bars, sample std, flat window -> 0."""
+    if window.count < 10:
+        return 0.0
+    var = window.var(ddof=1)
+    if var <= 1e-12 * window.mean_square():
+        return 0.0
+    return (x - window.mean()) / math.sqrt(var)
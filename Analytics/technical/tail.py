@@ -0,0 +1,90 @@
+import math
+import numpy as np
+import pandas as pd
+
+from config import TAIL_TOLERANCE
+from indicator_engine import ENGINE_COLUMNS, compute_block, ema, macd
+from features import features_from_row
+
+
+def _decay_bars(alpha, tolerance, stacked=False):
+    """
+    Bars after which the start-up error of an exponentially smoothed series
+    falls below `tolerance` (relative to its input's range): (1-alpha)^k, or
+    (1 + alpha*k)(1-alpha)^k when smoothing an input that is itself still
+    converging (ADX smooths DX, which is built from smoothed DM/ATR).
+    """
+    k = math.ceil(math.log(tolerance) / math.log(1.0 - alpha))
+    while stacked and (1.0 + alpha * k) * (1.0 - alpha) ** k > tolerance:
+        k += 1
+    return k
+
+
+def min_lookback(tolerance=TAIL_TOLERANCE):
+    """
+    Bars each tail-computed indicator needs for its last value. Windowed
+    indicators are exact with their window (plus one bar when built on
+    differences); Wilder-smoothed ones (RSI, ATR, ADX) get their warm-up plus
+    the bars needed for the truncation error to decay below `tolerance`.
+    EMA12/EMA26/MACD are not listed: tail mode runs them over the full history.
+    """
+    wilder = _decay_bars(1.0 / 14, tolerance)
+    return {
+        "SMA20": 20, "SMA50": 50, "SMA200": 200,
+        "BBANDS": 20, "CMF": 20, "CCI": 20,
+        "MFI": 15, "STOCH": 14 + 3 + 3 - 2,
+        "RET_Z": 61, "VOL_Z": 60, "OBV": 21,
+        "RSI": 15 + wilder, "ATR": 15 + wilder,
+        "ADX": 2 * 14 + _decay_bars(1.0 / 14, tolerance, stacked=True),
+    }
+
+
+def evaluate_tail(df, tolerance=TAIL_TOLERANCE):
+    """
+    Tail-only version of compute_indicators + normalize_features: computes just
+    what the last bar's features need. Returns (features, latest_row), where
+    latest_row holds the OHLCV and indicator values of the last bar.
+
+    Accuracy against the full computation:
+      - EMA12, EMA26, MACD and the MACD histogram mean/std run over the whole
+        history, so they are exact.
+      - SMA/Bollinger/CMF/CCI/MFI/STOCH/RET_Z/VOL_Z are exact (their windows fit
+        in the tail).
+      - RSI, ATR and ADX differ by at most `tolerance` times the range of their
+        input over the history (RSI/ADX: at most 100 * tolerance points).
+      - OBV is cumulative from the tail start, so its level is offset but the
+        OBV feature (last value vs its 20-bar mean) is unchanged.
+    """
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    if df.empty:
+        raise RuntimeError("DataFrame is empty after slicing for analysis.")
+
+    lookback = max(min_lookback(tolerance).values())
+    tail = df.iloc[-lookback:]
+    block = compute_block(
+        tail["High"].to_numpy(dtype=np.float64),
+        tail["Low"].to_numpy(dtype=np.float64),
+        tail["Close"].to_numpy(dtype=np.float64),
+        tail["Volume"].to_numpy(dtype=np.float64),
+    )
+    latest = dict(zip(ENGINE_COLUMNS, block[:, -1]))
+
+    # Trend EMAs and MACD over the full history (cheap recurrences)
+    close = df["Close"].to_numpy(dtype=np.float64)
+    ema12, ema26 = ema(close, 12), ema(close, 26)
+    line, signal_line, hist = macd(close, fast_ema=ema12, slow_ema=ema26)
+    for name, values in [("EMA12", ema12), ("EMA26", ema26), ("MACD", line),
+                         ("MACD_SIGNAL", signal_line), ("MACD_HIST", hist)]:
+        latest[name] = values[-1]
+
+    last_bar = df.iloc[-1]
+    latest_row = pd.concat([last_bar.drop(ENGINE_COLUMNS, errors="ignore"), pd.Series(latest)])
+    latest_row.name = last_bar.name
+
+    macd_hist = pd.Series(hist).dropna()
+    macd_stats = (len(macd_hist), macd_hist.mean(), macd_hist.std())
+    obv = block[ENGINE_COLUMNS.index("OBV")]
+    obv_mean = obv[-20:].mean() if len(df) > 20 else None
+
+    return features_from_row(latest_row, macd_stats, obv_mean), latest_row
@@ -0,0 +1,136 @@
+import datetime as dt
+
+from config import (CALENDAR_YEARS, MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE, MARKET_OPEN_HOUR, MARKET_OPEN_MINUTE,
+                    MARKET_TIMEZONE, NSE_HOLIDAYS, NSE_SPECIAL_SESSIONS)
+
+
+def _clock(text):
+    hour, minute = text.split(":")
+    return dt.time(int(hour), int(minute))
+
+
+class TradingCalendar:
+    """
+    Precomputed session table for one exchange: every trading day between
+    the first and last of `years` with its open and close (weekdays minus
+    `holidays`, with `special_sessions` overriding the hours of their date,
+    weekend or not).
+
+    Two per-calendar-day arrays (first session on or after the day, last
+    session on or before it) make every lookup O(1): the session of a day,
+    whether the market is open, the next open, the previous close, the bar
+    boundary and the date n sessions back. Timestamps outside the table raise
+    ValueError, and so does a table spanning a year without any holiday listed
+    (its holidays would silently count as sessions).
+    """
+
+    def __init__(self, holidays=NSE_HOLIDAYS, special_sessions=NSE_SPECIAL_SESSIONS, years=CALENDAR_YEARS,
+                 tz=MARKET_TIMEZONE):
+        self.tz = tz
+        self.first_day = dt.date(years[0], 1, 1)
+        self.last_day = dt.date(years[1], 12, 31)
+        holidays = {dt.date.fromisoformat(d) for d in holidays}
+        unlisted = sorted(set(range(years[0], years[1] + 1)) - {d.year for d in holidays})
+        if unlisted:
+            raise ValueError(f"No holidays listed for {unlisted}: add the exchange's holidays or narrow the years")
+        special = {dt.date.fromisoformat(d): (_clock(o), _clock(c)) for d, (o, c) in special_sessions.items()}
+        regular = (dt.time(MARKET_OPEN_HOUR, MARKET_OPEN_MINUTE), dt.time(MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE))
+
+        self.dates, self.hours = [], []
+        self._next, self._prev = [], []
+        day = self.first_day
+        while day <= self.last_day:
+            hours = special.get(day)
+            if hours is None and day.weekday() < 5 and day not in holidays:
+                hours = regular
+            self._next.append(len(self.dates))
+            if hours is not None:
+                self.dates.append(day)
+                self.hours.append(hours)
+            self._prev.append(len(self.dates) - 1)
+            day += dt.timedelta(days=1)
+        # Past the last session: no next one
+        self._next.append(len(self.dates))
+
+    def _at(self, i, which):
+        # Localized on demand: building ~5000 sessions' datetimes up front costs a quarter second
+        return self.tz.localize(dt.datetime.combine(self.dates[i], self.hours[i][which]))
+
+    def _local(self, now):
+        return (now or dt.datetime.now(self.tz)).astimezone(self.tz)
+
+    def _day(self, day):
+        offset = (day - self.first_day).days
+        if not 0 <= offset < len(self._prev):
+            raise ValueError(f"{day} is outside the trading calendar ({self.first_day} to {self.last_day})")
+        return offset
+
+    def session(self, day):
+        """(open, close) of `day`'s session, or None when the exchange does not trade that day."""
+        i = self._prev[self._day(day)]
+        if i >= 0 and self.dates[i] == day:
+            return self._at(i, 0), self._at(i, 1)
+        return None
+
+    def current_session(self, now=None):
+        """(open, close) of the session in progress at `now`, or None."""
+        now = self._local(now)
+        hours = self.session(now.date())
+        if hours is not None and hours[0] <= now < hours[1]:
+            return hours
+        return None
+
+    def is_open(self, now=None):
+        return self.current_session(now) is not None
+
+    def next_open(self, now=None):
+        """Next session open strictly after `now`."""
+        now = self._local(now)
+        i = self._next[self._day(now.date())]
+        if i < len(self.dates) and self._at(i, 0) <= now:
+            i += 1
+        if i >= len(self.dates):
+            raise ValueError(f"No session after {now} in the trading calendar")
+        return self._at(i, 0)
+
+    def previous_close(self, now=None):
+        """Latest session close at or before `now`."""
+        now = self._local(now)
+        i = self._prev[self._day(now.date())]
+        if i >= 0 and self._at(i, 1) > now:
+            i -= 1
+        if i < 0:
+            raise ValueError(f"No session before {now} in the trading calendar")
+        return self._at(i, 1)
+
+    def next_bar_boundary(self, minutes=None, now=None):
+        """
+        When bars of `minutes` (None: daily or longer) can next change: the
+        close of the current bar, aligned to the session open and capped at its
+        close, or the next minute for daily bars while the session runs; the
+        next session open when the market is closed.
+        """
+        now = self._local(now)
+        hours = self.current_session(now)
+        if hours is None:
+            return self.next_open(now)
+        market_open, market_close = hours
+        step = minutes or 1
+        elapsed = int((now - market_open).total_seconds() // 60)
+        return min(market_open + dt.timedelta(minutes=(elapsed // step + 1) * step), market_close)
+
+    def sessions_back(self, n, now=None):
+        """
+        Date of the n-th most recent session that has opened by `now` (n=1:
+        today's once it has opened, else the last one), the first session a
+        Yahoo intraday '<n>d' period returns.
+        """
+        now = self._local(now)
+        i = self._prev[self._day(now.date())]
+        if i >= 0 and self.dates[i] == now.date() and self._at(i, 0) > now:
+            i -= 1
+        return self.dates[max(0, i - (n - 1))]
+
+
+# The NSE calendar every market-hours check reads
+NSE = TradingCalendar()
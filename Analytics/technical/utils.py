@@ -1,74 +1,139 @@
-import datetime as dt
-from config import MARKET_TIMEZONE, MARKET_OPEN_HOUR, MARKET_OPEN_MINUTE, MARKET_CLOSE_HOUR, MARKET_CLOSE_MINUTE
+import numpy as np
+import pandas as pd
+from cache import TTLCache
+from downsample import DOWNSAMPLERS
+from config import CHART_CACHE_SIZE, CHART_DOWNSAMPLE, CHART_LAYOUT, CHART_POINT_BUDGET
+from trading_calendar import NSE
 
 def is_market_open():
-    """Checks if NSE market is currently open (9:15 AM to 3:30 PM IST, Mon-Fri)."""
-    now_ist = dt.datetime.now(MARKET_TIMEZONE)
-    if now_ist.weekday() >= 5: # Saturday or Sunday
-        return False
-    market_open = now_ist.replace(hour=MARKET_OPEN_HOUR, minute=MARKET_OPEN_MINUTE, second=0, microsecond=0)
-    market_close = now_ist.replace(hour=MARKET_CLOSE_HOUR, minute=MARKET_CLOSE_MINUTE, second=0, microsecond=0)
-    return market_open <= now_ist < market_close
+    """Checks if NSE is in a trading session right now (holidays, Muhurat and special sessions included)."""
+    return NSE.is_open()
 
-def prepare_chart_data(ticker, df_1d_intraday, df_1y_daily):
+def interval_minutes(interval):
+    """Bar length in minutes for intraday yfinance intervals ('1m', '5m', '1h'), else None."""
+    if interval.endswith("m") and not interval.endswith("mo"):
+        return int(interval[:-1])
+    if interval.endswith("h"):
+        return int(interval[:-1]) * 60
+    return None
+
+def next_session_open(now=None):
+    """Next NSE session open strictly after `now` (see trading_calendar.py)."""
+    return NSE.next_open(now)
+
+def next_bar_boundary(interval, now=None):
+    """
+    When data of this interval can next change.
+    - Market open, intraday interval: the close of the current bar (bars are aligned to the session open).
+    - Market open, daily or longer: the next minute, since today's bar is still forming.
+    - Market closed (nights, weekends, holidays): the next session open.
+    """
+    return NSE.next_bar_boundary(interval_minutes(interval), now)
+
+# Downsampled chart series, keyed by ticker, timeframe, budget and the bars they cover
+CHART_CACHE = TTLCache(maxsize=CHART_CACHE_SIZE)
+
+def _months_back(index, months):
+    """Position of the first bar within `months` months of the last one (DataFrame.last('<n>M') semantics)."""
+    return int(index.searchsorted(index[-1] - pd.offsets.MonthEnd(months), side="right"))
+
+def _chart_series(df):
+    """(index, close array) of a price frame's bars with a close; None when there are none."""
+    if df is None or df.empty:
+        return None
+    close = df["Close"].to_numpy(dtype=np.float64)
+    keep = ~np.isnan(close)
+    if not keep.any():
+        return None
+    return df.index[keep], close[keep]
+
+def _convert_points(index, close, layout):
+    """JSON-ready lists for one series: {"t": [epoch seconds], "price": [...]} or [{"date", "price"}] rows."""
+    prices = close.tolist()
+    if layout == "rows":
+        return [{"date": ts.isoformat(), "price": p} for ts, p in zip(index, prices)]
+    return {"t": (index.as_unit("ns").asi8 // 1_000_000_000).tolist(), "price": prices}
+
+def _chart_points(index, close, layout):
+    """
+    Returns take(start, positions=None) for one series. Without positions it
+    slices a single conversion of the whole series, so shorter timeframes
+    reuse the same lists instead of converting again; with positions (a
+    downsampled selection) only those points are converted.
+    """
+    converted = []
+
+    def take(start=0, positions=None):
+        if positions is not None:
+            return _convert_points(index[positions], close[positions], layout)
+        if not converted:
+            converted.append(_convert_points(index, close, layout))
+        points = converted[0]
+        if layout == "rows":
+            return points[start:]
+        return {"t": points["t"][start:], "price": points["price"][start:]}
+    return take
+
+def _timeframe_points(ticker, timeframe, take, index, close, start, layout, budget, method, interval):
+    """
+    One timeframe (bars start..end of the series), downsampled to its point
+    budget when it has more bars. Downsampled results are cached per
+    (ticker, timeframe, budget) and the bars they cover, so they are reused
+    until a new bar arrives, and expire at the next bar boundary.
+    """
+    budget = budget.get(timeframe) if isinstance(budget, dict) else budget
+    bars = len(index) - start
+    if not budget or bars <= budget:
+        return take(start)
+    key = (ticker, timeframe, budget, method, layout, index[start], index[-1], bars)
+    points = CHART_CACHE.get(key)
+    if points is None:
+        points = take(start, start + DOWNSAMPLERS[method](close[start:], budget))
+        CHART_CACHE.set(key, points, next_bar_boundary(interval).timestamp())
+    return points
+
+def prepare_chart_data(ticker, df_1d_intraday, df_1y_daily, layout=CHART_LAYOUT,
+                       budget=CHART_POINT_BUDGET, method=CHART_DOWNSAMPLE):
     """
     Generates 1D, 1M, 6M, and 1Y price-only chart data and returns as a dict.
-    The format is: [ { "date": "...", "price": ... }, ... ]
+    - layout="columns": { "1D": { "t": [epoch seconds, ...], "price": [...] }, ... }
+      plus "layout": "columns".
+    - layout="rows" (the original format): { "1D": [ { "date": "...", "price": ... }, ... ], ... }
+    1M and 6M are slices of the converted 1Y series, not separate passes.
+    A timeframe with more bars than its `budget` (an int, or {timeframe: int};
+    None keeps every bar) is downsampled with `method` ("lttb" or "minmax",
+    see downsample.py), so the payload size stays fixed however much history
+    the frames hold.
     """
-    chart_data = {}
+    empty = [] if layout == "rows" else {"t": [], "price": []}
+    chart_data = {"layout": "columns"} if layout != "rows" else {}
 
     # --- 1. 1-Day (Intraday Chart) ---
     try:
-        if not df_1d_intraday.empty:
-            df_1d = df_1d_intraday.dropna(subset=["Close"])
-            data_1d = []
-            for index, row in df_1d.iterrows():
-                # isoformat() is a standard way to represent dates as strings
-                data_1d.append({"date": index.isoformat(), "price": row['Close']})
-            chart_data['1D'] = data_1d
+        series = _chart_series(df_1d_intraday)
+        if series:
+            index, close = series
+            chart_data['1D'] = _timeframe_points(ticker, '1D', _chart_points(index, close, layout), index, close,
+                                                 0, layout, budget, method, '1m')
         else:
-            chart_data['1D'] = [] # Send empty list if no data
+            chart_data['1D'] = empty
     except Exception as e:
         print(f"Could not process 1-Day chart data: {e}")
-        chart_data['1D'] = []
+        chart_data['1D'] = empty
 
     # --- 2. 1-Month, 6-Month, 1-Year (Daily Charts) ---
     try:
-        if not df_1y_daily.empty:
-            df_1y = df_1y_daily.dropna(subset=["Close"])
-            
-            # Slice for other timeframes
-            df_6m = df_1y.last('6M')
-            df_1m = df_1y.last('1M')
-
-            # Process 1M
-            data_1m = []
-            for index, row in df_1m.iterrows():
-                data_1m.append({"date": index.isoformat(), "price": row['Close']})
-            chart_data['1M'] = data_1m
-            
-            # Process 6M
-            data_6m = []
-            for index, row in df_6m.iterrows():
-                data_6m.append({"date": index.isoformat(), "price": row['Close']})
-            chart_data['6M'] = data_6m
-
-            # Process 1Y
-            data_1y = []
-            for index, row in df_1y.iterrows():
-                data_1y.append({"date": index.isoformat(), "price": row['Close']})
-            chart_data['1Y'] = data_1y
-            
+        series = _chart_series(df_1y_daily)
+        if series:
+            index, close = series
+            take = _chart_points(index, close, layout)
+            for timeframe, start in (('1M', _months_back(index, 1)), ('6M', _months_back(index, 6)), ('1Y', 0)):
+                chart_data[timeframe] = _timeframe_points(ticker, timeframe, take, index, close,
+                                                          start, layout, budget, method, '1d')
         else:
-            # Send empty lists if no data
-            chart_data['1M'] = []
-            chart_data['6M'] = []
-            chart_data['1Y'] = []
-            
+            chart_data['1M'] = chart_data['6M'] = chart_data['1Y'] = empty
     except Exception as e:
         print(f"Could not process daily chart data: {e}")
-        chart_data['1M'] = []
-        chart_data['6M'] = []
-        chart_data['1Y'] = []
+        chart_data['1M'] = chart_data['6M'] = chart_data['1Y'] = empty
 
-    return chart_data
\ No newline at end of file
+    return chart_data
@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# technical/ is a script folder (flat `from config import ...` imports); the services import it as a package
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "Analytics" / "technical"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from config import MARKET_TIMEZONE
+from store import window
+from trading_calendar import NSE
+
+
+def ohlcv(index, start=100.0, seed=0):
+    """Random-walk OHLCV bars on `index`."""
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Adj Close": close, "Volume": rng.integers(1_000, 50_000, len(index)).astype(float)},
+                        index=index)
+
+
+def daily_bars(n, seed=0):
+    """`n` weekday bars ending today, in the market timezone."""
+    today = pd.Timestamp.now(tz=MARKET_TIMEZONE).normalize()
+    return ohlcv(pd.bdate_range(end=today, periods=n, tz=MARKET_TIMEZONE), seed=seed)
+
+
+def minute_bars(sessions, per_session, minutes=1, seed=0):
+    """`per_session` bars of `minutes` from the open of each of the last `sessions` sessions that have opened."""
+    days = [NSE.sessions_back(n) for n in range(sessions, 0, -1)]
+    index = pd.DatetimeIndex([t for d in days for t in pd.date_range(NSE.session(d)[0], periods=per_session,
+                                                                      freq=f"{minutes}min")])
+    return ohlcv(index, seed=seed)
+
+
+class StubProvider:
+    """
+    yf.download stand-in over fixed per-ticker histories: answers a `period`
+    (as store.window slices it) or every bar from `start`, in yfinance's
+    group_by="ticker" layout, and records each call. `fail` makes calls raise.
+    """
+
+    def __init__(self, histories):
+        self.histories = histories
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, tickers, interval, period=None, start=None):
+        self.calls.append({"tickers": list(tickers), "interval": interval, "period": period, "start": start})
+        if self.fail:
+            raise ConnectionError("upstream unavailable")
+        parts = {}
+        for ticker in tickers:
+            df = self.histories[ticker]
+            if start is not None:
+                df = df[df.index >= pd.Timestamp(start)]
+            elif period is not None:
+                df = window(df, period, interval)
+            parts[ticker] = df
+        return pd.concat(parts, axis=1)
+
+
+@pytest.fixture
+def store(tmp_path):
+    from store import OHLCVStore
+    return OHLCVStore(str(tmp_path / "ohlcv"))
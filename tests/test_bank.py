@@ -0,0 +1,29 @@
+import numpy as np
+
+import indicator_engine as engine
+from bank import DEFAULT_BANK, bank_columns, indicator_bank
+from conftest import daily_bars
+
+
+def test_volume_zscores_match_the_engine():
+    df = daily_bars(300)
+
+    bank = indicator_bank(df)
+
+    assert list(bank.columns) == bank_columns(DEFAULT_BANK)
+    for n in DEFAULT_BANK["VOL_Z"]:
+        expected = engine.zscore(df["Volume"].to_numpy(dtype=np.float64), n, min(10, n))
+        np.testing.assert_allclose(bank[f"VOL_Z_{n}"].to_numpy(), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_bank_matches_the_single_variant_engine():
+    df = daily_bars(300, seed=3)
+    h, l, c = (df[k].to_numpy(dtype=np.float64) for k in ["High", "Low", "Close"])
+
+    bank = indicator_bank(df)
+
+    np.testing.assert_allclose(bank["SMA_50"], engine.sma(c, 50), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(bank["EMA_21"], engine.ema(c, 21), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(bank["RSI_14"], engine.rsi(c, 14), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(bank["ATR_14"], engine.atr(h, l, c, 14), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(bank["ZSCORE_60"], engine.zscore(c, 60, 10), rtol=1e-9, atol=1e-9)
@@ -0,0 +1,125 @@
+import pandas as pd
+
+from conftest import StubProvider, daily_bars, minute_bars
+from data_fetch import adjust_prices, pull_history, pull_history_batch
+from store import window
+
+
+def test_cold_fetch_downloads_the_period_and_stores_it(store):
+    stub = StubProvider({"AAA.NS": daily_bars(300), "BBB.NS": daily_bars(300, seed=1)})
+
+    frames, errors = pull_history_batch(["AAA.NS", "BBB.NS"], "1d", "1y", store=store, provider=stub, min_bars=0)
+
+    assert errors == {}
+    assert stub.calls == [{"tickers": ["AAA.NS", "BBB.NS"], "interval": "1d", "period": "1y", "start": None}]
+    for ticker, df in frames.items():
+        expected = window(stub.histories[ticker], "1y")
+        assert len(df) == len(expected)
+        pd.testing.assert_index_equal(store.load(ticker, "1d").index, expected.index.as_unit("ns"))
+        assert store.covers(ticker, "1d", "1y")
+
+
+def test_covered_tickers_only_top_up_from_the_last_stored_bar(store):
+    stub = StubProvider({"AAA.NS": daily_bars(300), "BBB.NS": daily_bars(300, seed=1)})
+    pull_history_batch(["AAA.NS", "BBB.NS"], "1d", "1y", store=store, provider=stub, min_bars=0)
+    last = store.last_timestamp("AAA.NS", "1d")
+
+    frames, errors = pull_history_batch(["AAA.NS", "BBB.NS"], "1d", "6mo", store=store, provider=stub, min_bars=0)
+
+    assert errors == {}
+    assert len(stub.calls) == 2
+    assert stub.calls[1]["period"] is None and stub.calls[1]["start"] == last
+    assert len(frames["AAA.NS"]) == len(window(stub.histories["AAA.NS"], "6mo"))
+
+
+def test_top_up_replaces_the_still_forming_bar(store):
+    history = daily_bars(300)
+    stub = StubProvider({"AAA.NS": history})
+    pull_history("AAA.NS", "1d", "1y", store=store, provider=stub, min_bars=0)
+
+    # The last bar was still forming: upstream now has its final values
+    stub.histories["AAA.NS"] = history.copy()
+    stub.histories["AAA.NS"].iloc[-1, history.columns.get_loc("Close")] += 5.0
+    df = pull_history("AAA.NS", "1d", "1y", store=store, provider=stub, min_bars=0)
+
+    assert df["Close"].iloc[-1] == history["Close"].iloc[-1] + 5.0
+    assert df.index.is_unique
+    stored = store.load("AAA.NS", "1d")
+    assert stored.index.is_unique and stored["Close"].iloc[-1] == df["Close"].iloc[-1]
+
+
+def test_max_download_marks_the_store_complete(store):
+    stub = StubProvider({"AAA.NS": daily_bars(600)})
+    pull_history("AAA.NS", "1d", "max", store=store, provider=stub, min_bars=0)
+
+    assert store._meta("AAA.NS", "1d")["complete_max"]
+    assert store.covers("AAA.NS", "1d", "10y")
+    df = pull_history("AAA.NS", "1d", "max", store=store, provider=stub, min_bars=0)
+    assert stub.calls[1]["start"] is not None
+    assert len(df) == 600
+
+
+def test_short_intraday_frame_gets_one_planned_extension():
+    # A thinly traded ticker: 20 five-minute bars a session, so '2d' holds 40 of the 208 bars scoring needs
+    stub = StubProvider({"THIN.NS": minute_bars(15, 20, minutes=5)})
+
+    df = pull_history("THIN.NS", "5m", "2d", store=False, provider=stub)
+
+    assert [call["period"] for call in stub.calls] == ["2d", "12d"]
+    assert len(df) == 240
+
+
+def test_short_daily_frame_is_not_extended():
+    # A recent listing: there is no older history to download
+    stub = StubProvider({"NEW.NS": daily_bars(40)})
+
+    df = pull_history("NEW.NS", "1d", "1y", store=False, provider=stub)
+
+    assert len(stub.calls) == 1 and len(df) == 40
+
+
+def test_failed_top_up_serves_stored_bars_marked_stale(store, caplog):
+    stub = StubProvider({"AAA.NS": daily_bars(300)})
+    pull_history("AAA.NS", "1d", "1y", store=store, provider=stub, min_bars=0)
+
+    stub.fail = True
+    with caplog.at_level("WARNING", logger="data_fetch"):
+        frames, errors = pull_history_batch(["AAA.NS"], "1d", "1y", store=store, provider=stub, min_bars=0)
+
+    assert errors == {}
+    assert len(frames["AAA.NS"]) == len(window(stub.histories["AAA.NS"], "1y"))
+    assert "upstream unavailable" in frames["AAA.NS"].attrs["stale"]
+    assert "Top-up of 1 stored 1d tickers failed" in caplog.text
+
+
+def test_top_up_with_nothing_new_is_not_stale(store):
+    stub = StubProvider({"AAA.NS": daily_bars(300)})
+    pull_history("AAA.NS", "1d", "1y", store=store, provider=stub, min_bars=0)
+
+    stub.histories["AAA.NS"] = stub.histories["AAA.NS"].iloc[:0]
+    df = pull_history("AAA.NS", "1d", "1y", store=store, provider=stub, min_bars=0)
+
+    assert "stale" not in df.attrs and len(df) == len(window(daily_bars(300), "1y"))
+
+
+def test_adjust_prices_scales_ohlc_by_the_adjusted_close():
+    df = daily_bars(5).rename(columns={"Adj Close": "Adj close"})
+    df["Adj close"] = df["Close"] * [0.5, 0.5, 0.9, 1.0, 1.0]
+
+    adjusted = adjust_prices(df)
+
+    assert (adjusted["Close"] == df["Adj close"]).all()
+    assert (adjusted["High"] / df["High"]).round(12).tolist() == [0.5, 0.5, 0.9, 1.0, 1.0]
+    assert (adjusted["Volume"] == df["Volume"]).all()
+
+
+def test_technical_data_reports_adjusted_prices(monkeypatch):
+    from Analytics.services import technicals_service
+
+    df = daily_bars(60).rename(columns={"Adj Close": "Adj close"})
+    df["Adj close"] = df["Close"] / 2
+    monkeypatch.setattr(technicals_service, "_history", lambda symbol, interval, period: df)
+
+    data = technicals_service.get_technical_data("AAA.NS")
+
+    assert data["latest_close"] == round(df["Close"].iloc[-1] / 2, 2)
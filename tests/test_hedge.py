@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+import hedge
+from hedge import Hedger, UpstreamTimeout
+
+
+class Upstream:
+    """Callable stub: the n-th call (from 0) sleeps `delays[n]` (default `fast`) and raises if `fail(n)`."""
+
+    def __init__(self, delays=None, fast=0.005, fail=lambda n: False):
+        self.delays = delays or {}
+        self.fast = fast
+        self.fail = fail
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            n = self.count
+            self.count += 1
+        time.sleep(self.delays.get(n, self.fast))
+        if self.fail(n):
+            raise ConnectionError(f"attempt {n} failed")
+        return n
+
+
+def timed(fn, *args, **kwargs):
+    start = time.monotonic()
+    result = fn(*args, **kwargs)
+    return result, time.monotonic() - start
+
+
+def test_slow_call_is_hedged_after_the_observed_p95():
+    hedger = Hedger(default_delay=5.0, min_samples=10, min_delay=0.01, deadline=5.0)
+    warm = Upstream()
+    for _ in range(20):
+        hedger.call(warm, kind="quote")
+    assert hedger.hedge_delay("quote") < 0.1
+    assert hedger.hedges == 0
+
+    # The original request stalls; the hedge sent after ~p95 answers first
+    stalled = Upstream(delays={0: 1.0})
+    result, elapsed = timed(hedger.call, stalled, kind="quote")
+
+    assert result == 1 and elapsed < 0.5
+    assert hedger.hedges == 1 and hedger.hedge_wins == 1
+
+
+def test_hedges_wait_for_the_default_delay_until_enough_samples():
+    hedger = Hedger(default_delay=0.2, min_samples=100, deadline=5.0)
+    stalled = Upstream(delays={0: 1.0})
+
+    result, elapsed = timed(hedger.call, stalled, kind="cold")
+
+    assert result == 1 and 0.2 <= elapsed < 0.6
+    assert hedger.hedge_delay("cold") == 0.2
+
+
+def test_deadline_raises_a_timeout_error():
+    hedger = Hedger(default_delay=0.05, deadline=0.3)
+
+    start = time.monotonic()
+    with pytest.raises(UpstreamTimeout) as excinfo:
+        hedger.call(Upstream(fast=2.0), kind="hang")
+
+    assert isinstance(excinfo.value, TimeoutError)
+    assert time.monotonic() - start < 1.0
+    assert hedger.timeouts == 1
+
+
+def test_failed_attempts_are_retried_with_jittered_backoff(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(hedge.random, "uniform", lambda low, high: sleeps.append((low, high)) or 0.0)
+    hedger = Hedger(enabled=False, retries=2, backoff=0.05)
+    flaky = Upstream(fail=lambda n: n < 2)
+
+    assert hedger.call(flaky, kind="flaky") == 2
+    assert hedger.retried == 2
+    assert sleeps == [(0.0, 0.05), (0.0, 0.1)]
+
+
+def test_retries_give_up_with_the_last_error():
+    hedger = Hedger(enabled=False, retries=2, backoff=0.0)
+    broken = Upstream(fail=lambda n: True)
+
+    with pytest.raises(ConnectionError, match="attempt 2"):
+        hedger.call(broken, kind="broken")
+    assert broken.count == 3 and hedger.failures == 1
+
+
+def test_bounded_caps_the_deadline_of_calls_inside_it():
+    hedger = Hedger(enabled=False, deadline=10.0)
+
+    start = time.monotonic()
+    with hedger.bounded(0.2):
+        # An inner block cannot extend the outer one
+        with hedger.bounded(5.0):
+            with pytest.raises(UpstreamTimeout):
+                hedger.call(Upstream(fast=2.0), kind="bounded", deadline=10.0)
+    assert time.monotonic() - start < 1.0
+    assert hedge._SCOPE_DEADLINE.get() is None
+
+
+def test_bounded_is_scoped_to_its_own_thread():
+    hedger = Hedger(enabled=False, deadline=5.0)
+    results = []
+
+    with hedger.bounded(0.05):
+        worker = threading.Thread(target=lambda: results.append(hedger.call(Upstream(fast=0.3), kind="other")))
+        worker.start()
+        worker.join()
+
+    assert results == [0]
@@ -0,0 +1,51 @@
+import pytest
+
+from conftest import daily_bars, minute_bars
+from lookback import extension, indicator_bars, plan_period, required_bars
+
+
+def test_required_bars_is_the_slowest_scored_indicator():
+    assert required_bars() == 208
+    assert required_bars() == max(indicator_bars()[c] for c in ("MACD_SIGNAL", "MACD_HIST"))
+    assert required_bars(["RSI"]) < required_bars()
+    # Grouped columns share their indicator's lookback
+    assert required_bars(["BBL"]) == required_bars(["BBU"]) == indicator_bars()["BBANDS"]
+    assert required_bars([]) == 1
+
+
+@pytest.mark.parametrize("interval, period", [
+    ("1m", "2d"), ("5m", "4d"), ("15m", "10d"), ("1h", "31d"), ("1d", "1y"), ("1wk", "5y"), ("1mo", "max"),
+])
+def test_plan_period_for_the_scoring_lookback(interval, period):
+    assert plan_period(interval, 208) == period
+
+
+def test_plan_period_at_a_thinner_bar_density():
+    # 20 bars a session: 11 whole sessions plus today's
+    assert plan_period("5m", 208, per_session=20) == "12d"
+
+
+def test_plan_period_beyond_the_session_table():
+    assert plan_period("1d", 2000) == "10y"
+    assert plan_period("1d", 5000) == "max"
+
+
+def test_extension_widens_a_thin_intraday_frame():
+    df = minute_bars(2, 20, minutes=5)
+    assert extension("5m", "2d", df, 208) == ("5m", "12d")
+
+
+def test_extension_moves_to_daily_past_the_intraday_limit():
+    # 3 one-minute bars a session would need ~70 sessions, beyond Yahoo's 7 days of 1m bars
+    df = minute_bars(2, 3)
+    assert extension("1m", "2d", df, 208) == ("1d", "1y")
+
+
+def test_extension_when_no_download_can_help():
+    full = minute_bars(2, 375)
+    assert extension("1m", "2d", full, 208) is None  # already long enough
+    assert extension("1m", "2d", full.iloc[:0], 208) is None  # nothing came back
+    # A full-density frame over fewer sessions than requested: the ticker has no older bars
+    assert extension("5m", "10d", minute_bars(2, 75, minutes=5), 208) is None
+    # Daily frames planned for the lookback that are still short are recent listings
+    assert extension("1d", "1y", daily_bars(40), 208) is None
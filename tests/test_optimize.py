@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+
+from optimize import WEIGHT_NAMES, Optimizer, current_params, save_feature_matrix
+
+
+def _matrix(seed, bars=500):
+    rng = np.random.default_rng(seed)
+    return {"features": rng.normal(size=(len(WEIGHT_NAMES), bars)), "adx": rng.uniform(5, 50, bars),
+            "forward": rng.normal(0, 0.01, bars)}
+
+
+def test_checkpoint_resumes_on_the_same_matrix(tmp_path):
+    matrix_path, checkpoint = str(tmp_path / "m.npz"), str(tmp_path / "ckpt.json")
+    save_feature_matrix(_matrix(0), matrix_path)
+    with Optimizer(matrix_path, checkpoint=checkpoint, processes=1) as opt:
+        first = opt.evaluate([current_params()])
+
+    # Rebuilt with the same data: same digest, results reused
+    save_feature_matrix(_matrix(0), matrix_path)
+    with Optimizer(matrix_path, checkpoint=checkpoint, processes=1) as opt:
+        assert len(opt.results) == 1
+        assert opt.evaluate([current_params()]) == first
+
+
+def test_checkpoint_from_another_matrix_is_discarded(tmp_path):
+    matrix_path, checkpoint = str(tmp_path / "m.npz"), str(tmp_path / "ckpt.json")
+    save_feature_matrix(_matrix(0), matrix_path)
+    with Optimizer(matrix_path, checkpoint=checkpoint, processes=1) as opt:
+        stale = opt.evaluate([current_params()])
+
+    save_feature_matrix(_matrix(1), matrix_path)
+    with Optimizer(matrix_path, checkpoint=checkpoint, processes=1) as opt:
+        assert opt.results == {}
+        fresh = opt.evaluate([current_params()])
+
+    assert fresh != stale
+    with open(checkpoint) as f:
+        assert json.load(f)["matrix"] == opt.matrix_digest
+
+
+def test_checkpoint_without_a_digest_is_discarded(tmp_path):
+    matrix_path, checkpoint = str(tmp_path / "m.npz"), str(tmp_path / "ckpt.json")
+    save_feature_matrix(_matrix(0), matrix_path)
+    with open(checkpoint, "w") as f:
+        json.dump({"results": {"{}": 1.0}}, f)
+
+    assert Optimizer(matrix_path, checkpoint=checkpoint, processes=1).results == {}
@@ -0,0 +1,33 @@
+import threading
+
+import data_fetch
+import parallel
+from conftest import daily_bars
+from hedge import HEDGER
+
+MODE = (False, "1d", "1y", "HISTORICAL (1d)")
+
+
+def test_a_failing_ticker_is_retried_only_by_the_hedger(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def download(tickers, **kwargs):
+        with lock:
+            calls.append(tickers)
+        if tickers == ["BAD.NS"]:
+            raise ConnectionError("upstream unavailable")
+        return daily_bars(300)
+
+    monkeypatch.setattr(data_fetch.yf, "download", download)
+    monkeypatch.setattr(data_fetch, "default_store", lambda: None)
+    monkeypatch.setattr(HEDGER, "enabled", False)
+    monkeypatch.setattr(HEDGER, "backoff", 0.0)
+    data_fetch.PRICE_CACHE.clear()
+
+    _, records = parallel.run_index(["GOOD.NS", "BAD.NS"], workers=2, timeout=5.0, mode=MODE)
+
+    good, bad = records
+    assert good["status"] == "ok"
+    assert bad["status"] == "error" and "upstream unavailable" in bad["error"]
+    assert calls.count(["BAD.NS"]) == 1 + HEDGER.retries
@@ -0,0 +1,34 @@
+import asyncio
+import os
+
+import pipeline
+from conftest import daily_bars
+
+MODE = (False, "1d", "1y", "HISTORICAL (1d)")
+TICKERS = [f"T{i}.NS" for i in range(12)]
+
+
+def _dying_worker(ticker, df, mode):
+    os._exit(1)
+
+
+def test_a_broken_process_pool_is_recorded_per_ticker(monkeypatch):
+    monkeypatch.setattr(pipeline, "pull_history", lambda ticker, interval, period: daily_bars(300))
+    monkeypatch.setattr(pipeline, "_score_frame", _dying_worker)
+
+    # A queue smaller than the universe: before the fix the fetchers blocked on it forever
+    summary, records, _ = asyncio.run(asyncio.wait_for(
+        pipeline.scan(TICKERS, mode=MODE, compute_workers=2, queue_size=2, compute_executor="process"), 60))
+
+    assert [r["status"] for r in records] == ["error"] * len(TICKERS)
+    assert all("Scoring worker failed" in r["error"] for r in records)
+    assert summary.get("total_stocks_analyzed", 0) == 0
+
+
+def test_scan_scores_every_ticker(monkeypatch):
+    monkeypatch.setattr(pipeline, "pull_history", lambda ticker, interval, period: daily_bars(300))
+
+    summary, records, timings = pipeline.scan_index(TICKERS, mode=MODE, compute_workers=2, compute_executor="thread")
+
+    assert [r["status"] for r in records] == ["ok"] * len(TICKERS)
+    assert timings["compute"]["items"] == len(TICKERS)
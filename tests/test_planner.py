@@ -0,0 +1,51 @@
+import pytest
+
+import data_fetch
+import main
+from conftest import StubProvider, daily_bars
+from planner import IndexPlanner
+
+MODE = (False, "1d", "1y", "HISTORICAL (1d)")
+FIRST = ["AAA.NS", "BBB.NS", "CCC.NS", "DDD.NS"]
+SECOND = ["CCC.NS", "DDD.NS", "EEE.NS"]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    stub = StubProvider({t: daily_bars(300, seed=i) for i, t in enumerate(dict.fromkeys(FIRST + SECOND))})
+    monkeypatch.setattr(data_fetch, "yf_provider", stub)
+    monkeypatch.setattr(data_fetch, "default_store", lambda: None)
+    monkeypatch.setattr(main, "select_data_mode", lambda: MODE)
+    data_fetch.PRICE_CACHE.clear()
+    yield stub
+    data_fetch.PRICE_CACHE.clear()
+
+
+def assert_same_summary(summary, expected):
+    # Equal to float rounding: the batched panel sums in a different order than analyze_stock
+    assert summary.pop("average_score") == pytest.approx(expected.pop("average_score"), rel=1e-9)
+    assert summary == expected
+
+
+@pytest.mark.parametrize("method", ["batched", "parallel"])
+def test_index_summaries_match_analyze_index(upstream, method):
+    planner = IndexPlanner(mode=MODE, map_bo=False, method=method)
+    planner.add_index("first", FIRST)
+    planner.add_index("second", SECOND)
+
+    summaries = planner.run()
+
+    for name, tickers in [("first", FIRST), ("second", SECOND)]:
+        assert summaries[name]["total_stocks_analyzed"] == len(tickers)
+        assert_same_summary(summaries[name], main.analyze_index(tickers))
+
+
+def test_shared_tickers_are_scored_once(upstream):
+    planner = IndexPlanner(mode=MODE, map_bo=False)
+    planner.add_index("first", FIRST)
+    planner.run()
+    planner.add_index("second", SECOND)
+
+    assert planner.pending() == ["EEE.NS"]
+    planner.run()
+    assert [call["tickers"] for call in upstream.calls] == [FIRST, ["EEE.NS"]]
@@ -0,0 +1,64 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from conftest import daily_bars
+from indicators import compute_indicators
+from precompute import SERIES_COLUMNS, Snapshot, SnapshotBuffer, load_snapshot, save_snapshot
+
+MODE = (False, "1d", "1y", "HISTORICAL (1d)")
+
+
+def snapshot(version, tickers=("AAA.NS", "M&M.NS")):
+    series = {t: compute_indicators(daily_bars(300, seed=i), columns=SERIES_COLUMNS)[["Close"] + SERIES_COLUMNS]
+              for i, t in enumerate(tickers)}
+    records = {t: {"ticker": t, "score": 61.5, "signal": "BUY", "features": {"RSI": 0.25, "OBV": float("nan")}}
+               for t in tickers}
+    return Snapshot(version, 1_700_000_000.0 + version, MODE, records, series, {"BAD.NS": "No data"}, 1.25)
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "snapshot" / "technical.npz")
+    saved = snapshot(3)
+
+    save_snapshot(saved, path)
+    loaded = load_snapshot(path)
+
+    assert (loaded.version, loaded.built_at, loaded.mode) == (saved.version, saved.built_at, saved.mode)
+    assert loaded.errors == saved.errors and loaded.elapsed == saved.elapsed
+    assert loaded.records["AAA.NS"]["signal"] == "BUY" and np.isnan(loaded.records["AAA.NS"]["features"]["OBV"])
+    assert loaded.series.keys() == saved.series.keys()
+    for ticker, df in saved.series.items():
+        pd.testing.assert_frame_equal(loaded.series[ticker], df, check_freq=False, check_index_type=False)
+    assert [f for f in os.listdir(tmp_path / "snapshot")] == ["technical.npz"]
+
+
+def test_readers_pick_up_newer_snapshots(tmp_path):
+    path = str(tmp_path / "technical.npz")
+    writer, reader = SnapshotBuffer(path), SnapshotBuffer(path)
+    assert reader.current() is None
+
+    writer.publish(snapshot(1))
+    reader._checked = 0.0
+    assert reader.current().version == 1
+
+    writer.publish(snapshot(2, tickers=("AAA.NS",)))
+    reader._checked = 0.0
+    assert reader.current().version == 2 and list(reader.current().series) == ["AAA.NS"]
+
+
+class Planted:
+    ran = False
+
+    def __reduce__(self):
+        return (setattr, (Planted, "ran", True))
+
+
+def test_a_planted_pickle_is_never_unpickled(tmp_path):
+    path = tmp_path / "technical.npz"
+    path.write_bytes(pickle.dumps(Planted()))
+
+    assert SnapshotBuffer(str(path)).current() is None
+    assert not Planted.ran
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from Analytics.services.singleflight import SingleFlight
+
+CALLERS = 8
+
+
+class Stop(BaseException):
+    """Stands in for cancellation or KeyboardInterrupt in the leader."""
+
+
+def _run_concurrently(flight, fn):
+    outcomes = [None] * CALLERS
+
+    def caller(i):
+        try:
+            outcomes[i] = ("ok", flight.do("key", fn))
+        except BaseException as e:
+            outcomes[i] = ("raised", e)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return outcomes
+
+
+def _upstream(flight, calls, outcome):
+    """Counts its calls; answers (or raises) once every other caller is waiting on it."""
+    def fn():
+        calls.append(1)
+        deadline = time.monotonic() + 5
+        while flight.coalesced < CALLERS - 1 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+    return fn
+
+
+def test_concurrent_callers_share_one_upstream_call():
+    flight, calls = SingleFlight(), []
+
+    outcomes = _run_concurrently(flight, _upstream(flight, calls, {"price": 1}))
+
+    assert len(calls) == 1
+    assert outcomes == [("ok", {"price": 1})] * CALLERS
+    assert flight.stats() == {"in_flight": 0, "calls": 1, "coalesced": CALLERS - 1}
+
+
+@pytest.mark.parametrize("error", [RuntimeError("upstream down"), Stop()])
+def test_the_leaders_exception_reaches_every_waiter(error):
+    flight, calls = SingleFlight(), []
+
+    outcomes = _run_concurrently(flight, _upstream(flight, calls, error))
+
+    assert len(calls) == 1
+    assert all(kind == "raised" and e is error for kind, e in outcomes)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_the_next_call_after_a_failure_starts_fresh():
+    flight = SingleFlight()
+
+    def interrupted():
+        raise Stop()
+
+    with pytest.raises(Stop):
+        flight.do("key", interrupted)
+    assert flight.do("key", lambda: 42) == 42
+    assert flight.stats()["calls"] == 2
@@ -0,0 +1,43 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from conftest import daily_bars
+from store import OHLCVStore
+
+BARS = daily_bars(80)
+
+
+def _merge_slices(root, worker, workers):
+    store = OHLCVStore(root)
+    for i in range(worker, len(BARS), workers):
+        store.merge("AAA.NS", "1d", BARS.iloc[i:i + 1])
+
+
+def test_merge_keeps_newer_bars_and_round_trips(store):
+    store.merge("AAA.NS", "1d", BARS.iloc[:50], period="3mo")
+    newer = BARS.iloc[40:].copy()
+    newer["Close"] += 1.0
+    merged = store.merge("AAA.NS", "1d", newer)
+
+    loaded = store.load("AAA.NS", "1d")
+    assert len(loaded) == len(BARS) and loaded.index.is_unique
+    assert (loaded["Close"].iloc[40:].to_numpy() == newer["Close"].to_numpy()).all()
+    pd.testing.assert_frame_equal(loaded, merged, check_freq=False, check_index_type=False)
+
+
+def test_concurrent_merges_from_threads_keep_every_bar(store):
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda w: _merge_slices(store.root, w, 4), range(4)))
+
+    assert len(store.load("AAA.NS", "1d")) == len(BARS)
+
+
+def test_concurrent_merges_from_processes_keep_every_bar(store):
+    with ProcessPoolExecutor(4) as pool:
+        list(pool.map(_merge_slices, [store.root] * 4, range(4), [4] * 4))
+
+    assert len(store.load("AAA.NS", "1d")) == len(BARS)
+    leftovers = [f for f in os.listdir(os.path.join(store.root, "1d")) if f.endswith(".tmp")]
+    assert leftovers == []
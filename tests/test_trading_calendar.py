@@ -0,0 +1,71 @@
+import datetime as dt
+
+import pytest
+
+from config import MARKET_TIMEZONE
+from trading_calendar import NSE, TradingCalendar
+
+
+def at(text):
+    return MARKET_TIMEZONE.localize(dt.datetime.fromisoformat(text))
+
+
+@pytest.mark.parametrize("day", ["2024-01-26", "2025-08-15", "2026-10-02", "2026-12-25"])
+def test_listed_holidays_do_not_trade(day):
+    assert NSE.session(dt.date.fromisoformat(day)) is None
+    assert not NSE.is_open(at(f"{day} 11:00"))
+
+
+def test_regular_session_hours():
+    assert NSE.session(dt.date(2026, 10, 16)) == (at("2026-10-16 09:15"), at("2026-10-16 15:30"))
+    assert NSE.session(dt.date(2026, 10, 17)) is None  # Saturday
+    assert NSE.is_open(at("2026-10-16 09:15"))
+    assert not NSE.is_open(at("2026-10-16 15:30"))
+
+
+def test_special_sessions_override_holidays_and_weekends():
+    # Muhurat trading on a Diwali holiday, and a Saturday session
+    assert NSE.session(dt.date(2025, 10, 21)) == (at("2025-10-21 13:45"), at("2025-10-21 14:45"))
+    assert NSE.is_open(at("2025-10-21 14:00"))
+    assert not NSE.is_open(at("2025-10-21 10:00"))
+    assert NSE.session(dt.date(2024, 1, 20)) == (at("2024-01-20 09:15"), at("2024-01-20 15:30"))
+
+
+def test_next_open_skips_weekends_and_holidays():
+    # Friday after the close -> Monday; Monday after the close -> Wednesday (Tuesday 2026-10-20 is a holiday)
+    assert NSE.next_open(at("2026-10-16 16:00")) == at("2026-10-19 09:15")
+    assert NSE.next_open(at("2026-10-19 15:45")) == at("2026-10-21 09:15")
+    assert NSE.previous_close(at("2026-10-21 09:00")) == at("2026-10-19 15:30")
+
+
+def test_next_bar_boundary():
+    assert NSE.next_bar_boundary(5, at("2026-10-16 09:17")) == at("2026-10-16 09:20")
+    # Hourly bars are aligned to the 9:15 open; the last one is cut at the close
+    assert NSE.next_bar_boundary(60, at("2026-10-16 15:00")) == at("2026-10-16 15:15")
+    assert NSE.next_bar_boundary(60, at("2026-10-16 15:20")) == at("2026-10-16 15:30")
+    assert NSE.next_bar_boundary(None, at("2026-10-16 10:00:30")) == at("2026-10-16 10:01")
+    assert NSE.next_bar_boundary(1, at("2026-10-17 10:00")) == at("2026-10-19 09:15")
+
+
+def test_sessions_back_counts_sessions_that_have_opened():
+    assert NSE.sessions_back(1, at("2026-10-21 10:00")) == dt.date(2026, 10, 21)
+    assert NSE.sessions_back(2, at("2026-10-21 10:00")) == dt.date(2026, 10, 19)
+    # Before the open today's session does not count yet
+    assert NSE.sessions_back(1, at("2026-10-21 08:00")) == dt.date(2026, 10, 19)
+
+
+def test_table_edges_raise():
+    with pytest.raises(ValueError):
+        NSE.session(dt.date(2023, 12, 29))
+    with pytest.raises(ValueError):
+        NSE.is_open(at("2027-01-04 10:00"))
+    with pytest.raises(ValueError):
+        NSE.next_open(at("2026-12-31 16:00"))
+    with pytest.raises(ValueError):
+        NSE.previous_close(at("2024-01-01 08:00"))
+
+
+def test_years_without_holiday_data_are_refused():
+    with pytest.raises(ValueError, match="2027"):
+        TradingCalendar(years=(2024, 2027))
+    assert TradingCalendar(years=(2025, 2025)).session(dt.date(2025, 12, 25)) is None